@@ -0,0 +1,219 @@
+"""
+Daily profit accrual for Cashup deposits and Cashup owing deposits.
+
+Each day a deposit has been held earns:
+
+- `daily_profit`: simple profit on the deposit balance, `balance * CASHUP_DAILY_PROFIT_RATE`;
+- `daily_compounding_profit`: profit on the balance plus the compounded profit kept so far,
+  `(balance + compounding_profit - compounding_withdraw) * CASHUP_COMPOUNDING_DAILY_RATE`,
+  which is then added to `compounding_profit`.
+
+`monthly_profit` and `monthly_compounding_profit` add up the days accrued in the current
+calendar month. A deposit earns from the day after it was made, and `profit_accrued_on`
+records the last day it earned for, so running the accrual again for a day it already
+covered changes nothing, and a run after a gap catches up the days in between.
+
+Days are not accrued one at a time: the profit compounded over `n` days is worked out in
+closed form by `compound()`, `base * ((1 + rate) ** n - 1)`, with intermediate results
+held to `PRECISION` and only the stored amounts rounded, half up to the cent. A catch-up
+therefore costs the same for one day or a hundred and carries no rounding from the days
+in between.
+
+`accrue_chunk()` accrues the deposits in one primary key range in a single transaction,
+writes them back with `bulk_update()` and records what each earned as a `ProfitSnapshot`
+per day (see myapi.profits); a catch-up is split into its days by `by_day()`, so profit
+history credits every missed day with what it earned. The `accrue_profits` command
+spreads the ranges over a process pool.
+"""
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+from decimal import ROUND_HALF_EVEN, ROUND_HALF_UP, Context, Decimal, localcontext
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min, Q
+from django.utils import timezone
+
+CENT = Decimal('0.01')
+ZERO = Decimal('0.00')
+# Working precision for compounding; amounts are rounded to cents only when stored
+PRECISION = Context(prec=40, rounding=ROUND_HALF_EVEN)
+CHUNK_SIZE = 5000
+BATCH_SIZE = 500
+
+Accrual = namedtuple('Accrual', ['model_name', 'balance_field'])
+Compounded = namedtuple('Compounded', ['profit', 'last_day_profit'])
+# `by_day` holds `(day, profit, compounding_profit)` for each day accrued, oldest first
+Earned = namedtuple('Earned', ['days', 'profit', 'compounding_profit', 'by_day'])
+
+ACCRUALS = {
+    'cashup': Accrual('CashupDeposit', 'cashup_main_balance'),
+    'cashup-owing': Accrual('CashupOwingDeposit', 'cashup_owing_main_balance'),
+}
+
+KIND_CHOICES = [
+    ('cashup', 'Cashup deposit'),
+    ('cashup-owing', 'Cashup owing deposit'),
+]
+
+PROFIT_FIELDS = [
+    'daily_profit', 'monthly_profit', 'compounding_profit', 'daily_compounding_profit', 'monthly_compounding_profit',
+]
+
+
+def daily_rates():
+    """`(simple, compounding)` daily profit rates."""
+    return (
+        Decimal(str(getattr(settings, 'CASHUP_DAILY_PROFIT_RATE', '0.001'))),
+        Decimal(str(getattr(settings, 'CASHUP_COMPOUNDING_DAILY_RATE', '0.001'))),
+    )
+
+
+def cents(amount):
+    return amount.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _model(kind):
+    from django.apps import apps
+
+    return apps.get_model('myapi', ACCRUALS[kind].model_name)
+
+
+def first_day(deposit):
+    """The first day `deposit` has not earned for yet, or None if it earns from `day` only."""
+    if deposit.profit_accrued_on is not None:
+        return deposit.profit_accrued_on + timedelta(days=1)
+    if deposit.created_at is not None:
+        return timezone.localdate(deposit.created_at) + timedelta(days=1)
+    return None
+
+
+def compound(base, rate, days):
+    """
+    Profit on `base` compounding daily at `rate` for `days` days, as
+    `Compounded(profit, last_day_profit)`, each rounded half up to the cent once:
+    `base * ((1 + rate) ** days - 1)` and `base * (1 + rate) ** (days - 1) * rate`.
+    """
+    if days <= 0 or base <= 0:
+        return Compounded(ZERO, ZERO)
+    with localcontext(PRECISION):
+        before_last_day = base * (1 + rate) ** (days - 1)
+        last_day_profit = before_last_day * rate
+        profit = before_last_day + last_day_profit - base
+    return Compounded(cents(profit), cents(last_day_profit))
+
+
+def by_day(last_day, days, daily_profit, base, rate, compounded):
+    """
+    Split `days` days of profit ending on `last_day` into `(day, profit, compounding_profit)`
+    for each day. The compounding amounts are the day-to-day differences of the running total
+    rounded to the cent, and the last total is `compounded.profit`, so they add up exactly to
+    what `compound(base, rate, days)` gave for the whole run.
+    """
+    first = last_day - timedelta(days=days - 1)
+    growth, before = Decimal(1), ZERO
+    split = []
+    with localcontext(PRECISION):
+        for offset in range(days):
+            if offset == days - 1:
+                total = compounded.profit
+            elif base > 0:
+                growth *= 1 + rate
+                total = cents(base * (growth - 1))
+            else:
+                total = ZERO
+            split.append((first + timedelta(days=offset), daily_profit, total - before))
+            before = total
+    return split
+
+
+def accrue(deposit, balance, day, rates):
+    """
+    Accrue, in memory and in one step, every day `deposit` has not earned for up to and
+    including `day`. Returns what those days earned as `Earned`, or None if there were none.
+    """
+    days = (day - (first_day(deposit) or day)).days + 1
+    if days <= 0:
+        return None
+    simple_rate, compounding_rate = rates
+    accrued_on = deposit.profit_accrued_on
+    if accrued_on is None or (accrued_on.year, accrued_on.month) != (day.year, day.month):
+        # The month changed during the gap: the monthly totals start again from its first day
+        deposit.monthly_profit = deposit.monthly_compounding_profit = ZERO
+    days_this_month = min(days, day.day)
+
+    deposit.daily_profit = cents(balance * simple_rate)
+    deposit.monthly_profit += deposit.daily_profit * days_this_month
+
+    base = balance + deposit.compounding_profit - deposit.compounding_withdraw
+    compounded = compound(base, compounding_rate, days)
+    before_this_month = compound(base, compounding_rate, days - days_this_month)
+    deposit.daily_compounding_profit = compounded.last_day_profit
+    deposit.compounding_profit += compounded.profit
+    deposit.monthly_compounding_profit += compounded.profit - before_this_month.profit
+    deposit.profit_accrued_on = day
+    return Earned(
+        days, deposit.daily_profit * days, compounded.profit,
+        by_day(day, days, deposit.daily_profit, base, compounding_rate, compounded),
+    )
+
+
+def due(kind, day):
+    """Deposits of `kind` that have not earned for `day` yet."""
+    start_of_day = timezone.make_aware(datetime.combine(day, time.min))
+    return _model(kind).objects.filter(
+        Q(profit_accrued_on__lt=day) | Q(profit_accrued_on__isnull=True),
+        Q(created_at__lt=start_of_day) | Q(created_at__isnull=True),
+    )
+
+
+def chunks(kind, day, chunk_size=CHUNK_SIZE):
+    """`(start_pk, end_pk)` ranges, end exclusive, covering the deposits due for `day`."""
+    bounds = due(kind, day).aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is None:
+        return []
+    return [(start, min(start + chunk_size, bounds['high'] + 1)) for start in range(bounds['low'], bounds['high'] + 1, chunk_size)]
+
+
+def accrue_chunk(kind, start_pk, end_pk, day):
+    """
+    Accrue the deposits of `kind` due for `day` with `start_pk <= pk < end_pk`, and record
+    what each earned. Returns how many.
+    """
+    from .models import ProfitSnapshot
+    from .profits import record_profits
+
+    balance_field = ACCRUALS[kind].balance_field
+    rates = daily_rates()
+    with transaction.atomic():
+        chunk = due(kind, day).filter(pk__gte=start_pk, pk__lt=end_pk)
+        deposits = list(chunk.select_for_update().only(
+            'buyer_id', balance_field, 'created_at', 'compounding_withdraw', 'profit_accrued_on', *PROFIT_FIELDS,
+        ))
+        snapshots = []
+        for deposit in deposits:
+            balance = getattr(deposit, balance_field)
+            earned = accrue(deposit, balance, day, rates)
+            if earned is None or deposit.buyer_id is None:
+                continue
+            total = deposit.compounding_profit - earned.compounding_profit
+            for earned_on, profit, compounding_profit in earned.by_day:
+                total += compounding_profit
+                snapshots.append(ProfitSnapshot(
+                    buyer_id=deposit.buyer_id, kind=kind, deposit_id=deposit.pk, day=earned_on, days=earned.days,
+                    balance=balance, profit=profit, compounding_profit=compounding_profit,
+                    total_compounding_profit=total,
+                ))
+        _model(kind).objects.bulk_update(deposits, PROFIT_FIELDS, batch_size=BATCH_SIZE)
+        # The same day for every row, so one plain UPDATE rather than a CASE per row
+        chunk.update(profit_accrued_on=day)
+        ProfitSnapshot.objects.bulk_create(snapshots, batch_size=BATCH_SIZE)
+        record_profits(snapshots)
+    return len(deposits)
+
+
+def setup_worker():
+    """Process pool initializer: workers started with `spawn` need Django set up."""
+    import django
+
+    django.setup()
@@ -1,12 +1,43 @@
-from django.contrib import admin
-from .models import Purchase, Buyer , Category ,Item ,CashupOwingDeposit , CashupDeposit , BuyerTransaction
+from decimal import Decimal
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from .models import Purchase, Buyer , Category ,Item ,CashupOwingDeposit , CashupDeposit , BuyerTransaction, BalanceEntry
 from .models import User
+from .pricing import reprice_items
 
 # Register your models here.
 class BuyerAdmin(admin.ModelAdmin):
     search_fields=['phone_number']
+    readonly_fields = ['main_balance']  # Moved through the ledger, see BalanceEntryAdmin
+class RepriceForm(forms.Form):
+    discount_rate = forms.DecimalField(required=False, min_value=Decimal('0'), max_value=Decimal('100'), decimal_places=2,
+                                       help_text="New discount rate (%)")
+    price_change_percent = forms.DecimalField(required=False, min_value=Decimal('-99.99'), decimal_places=2,
+                                              help_text="Raise or lower prices by this percentage")
+
+class RepriceActionForm(ActionForm, RepriceForm):
+    pass
+
 class ItemAdmin(admin.ModelAdmin):
     search_fields=['name']
+    list_filter = ['category', 'is_available']
+    action_form = RepriceActionForm
+    actions = ['reprice_selected']
+
+    @admin.action(description="Reprice selected items")
+    def reprice_selected(self, request, queryset):
+        form = RepriceForm(request.POST)
+        if not form.is_valid():
+            self.message_user(request, f"Invalid repricing values: {form.errors.as_text()}", messages.ERROR)
+            return
+        discount_rate = form.cleaned_data['discount_rate']
+        price_change_percent = form.cleaned_data['price_change_percent']
+        if discount_rate is None and price_change_percent is None:
+            self.message_user(request, "Enter a discount rate, a price change or both.", messages.ERROR)
+            return
+        updated = reprice_items(queryset, discount_rate=discount_rate, price_change_percent=price_change_percent)
+        self.message_user(request, f"Repriced {updated} items.", messages.SUCCESS)
 class PurchaseAdmin(admin.ModelAdmin):
     search_fields=['phone_number']
     readonly_fields = ['total_price']
@@ -18,6 +49,21 @@ class CategoryAdmin(admin.ModelAdmin):
     search_fields=['name']
 class BuyerTransactionAdmin(admin.ModelAdmin):
     search_fields=['phone_number']
+class BalanceEntryAdmin(admin.ModelAdmin):
+    list_display = ['buyer', 'kind', 'amount', 'reference', 'created_at']
+    list_filter = ['kind']
+    search_fields = ['buyer__phone_number', 'reference']
+    raw_id_fields = ['buyer']
+
+    # The ledger is append-only; money moves through myapi.ledger, not the admin
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
 
 
 admin.site.register(Purchase,PurchaseAdmin)
@@ -27,6 +73,7 @@ admin.site.register(Item,ItemAdmin)
 admin.site.register(CashupOwingDeposit,CashupOwingAdmin)
 admin.site.register(CashupDeposit,CashupAdmin)
 admin.site.register(BuyerTransaction,BuyerTransactionAdmin)
+admin.site.register(BalanceEntry,BalanceEntryAdmin)
 
 
 
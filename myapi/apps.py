@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class MyapiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'myapi'
+
+    def ready(self):
+        from .search import ensure_triggers
+
+        def restore_search_triggers(using, **kwargs):
+            ensure_triggers(using)
+
+        post_migrate.connect(restore_search_triggers, sender=self, weak=False)
@@ -0,0 +1,137 @@
+"""
+Read-through cache for catalog reads (items, categories and serialized catalog pages).
+
+Entries live in a small in-process LRU in front of a configurable Django cache backend.
+Every key is prefixed with a catalog version stored in the backend; changing any Item or
+Category bumps the version, which invalidates every entry read through that backend. Only
+a backend shared between processes (Redis, Memcached) carries an invalidation from one
+process to the others; with the per-process LocMem default each process sees its own
+version, and another process's writes reach it only when its entries expire.
+
+If the backend loses the version key (evicted, flushed or restarted), it is reseeded from
+the clock rather than from 1, so it never comes back as a version whose entries are still
+cached somewhere.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+VERSION_KEY = 'catalog:version'
+_MISSING = object()
+
+
+class LRUCache:
+    """A thread-safe, size-bounded least-recently-used mapping."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def _seed():
+    # Nanoseconds since the epoch: larger than any version handed out by an earlier seed
+    return time.time_ns()
+
+
+class CatalogCache:
+    def __init__(self):
+        self.local = LRUCache(getattr(settings, 'CATALOG_CACHE_LRU_SIZE', 1024))
+        self._counter_lock = threading.Lock()
+        self.reset_stats()
+
+    @property
+    def backend(self):
+        return caches[getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')]
+
+    def version(self):
+        version = self.backend.get(VERSION_KEY)
+        if version is None:
+            seed = _seed()
+            self.backend.add(VERSION_KEY, seed, timeout=None)
+            version = self.backend.get(VERSION_KEY, seed)
+        return version
+
+    def bump_version(self):
+        try:
+            self.backend.incr(VERSION_KEY)
+        except ValueError:
+            self.backend.set(VERSION_KEY, _seed(), timeout=None)
+
+    def invalidate(self):
+        """Invalidate every catalog entry once the current transaction commits."""
+        transaction.on_commit(self.bump_version)
+
+    def get_or_set(self, key, producer):
+        versioned_key = f'catalog:{self.version()}:{key}'
+
+        value = self.local.get(versioned_key, _MISSING)
+        if value is not _MISSING:
+            self._count('local_hits')
+            return value
+
+        value = self.backend.get(versioned_key, _MISSING)
+        if value is not _MISSING:
+            self._count('backend_hits')
+            self.local.set(versioned_key, value)
+            return value
+
+        self._count('misses')
+        value = producer()
+        self.backend.set(versioned_key, value)
+        self.local.set(versioned_key, value)
+        return value
+
+    def get_item(self, pk):
+        from .models import Item
+        return self.get_or_set(f'item:{pk}', lambda: Item.objects.filter(pk=pk).first())
+
+    def get_category(self, pk):
+        from .models import Category
+        return self.get_or_set(f'category:{pk}', lambda: Category.objects.filter(pk=pk).first())
+
+    def _count(self, name):
+        with self._counter_lock:
+            self._stats[name] += 1
+
+    def reset_stats(self):
+        self._stats = {'local_hits': 0, 'backend_hits': 0, 'misses': 0}
+
+    def stats(self):
+        """Hit/miss counters for this process."""
+        stats = dict(self._stats)
+        lookups = sum(stats.values())
+        stats['hit_rate'] = (stats['local_hits'] + stats['backend_hits']) / lookups if lookups else 0.0
+        stats['local_entries'] = len(self.local)
+        stats['version'] = self.version()
+        return stats
+
+
+catalog_cache = CatalogCache()
@@ -0,0 +1,92 @@
+"""
+Cashup owing deposits, and each buyer's owing total.
+
+`Buyer.owing_total` holds the sum of the buyer's `CashupOwingDeposit.cashup_owing_main_balance`.
+It moves by the difference whenever an owing deposit is created, changed or deleted, in the
+same transaction as the deposit row, so nothing has to add the deposits up again to know
+what a buyer owes.
+
+`transfer_to_owing()` moves money from the main balance onto an owing deposit in one short
+transaction: the conditional debit of the buyer's row (which also moves `owing_total`)
+comes first and locks it, so concurrent transfers for the same buyer queue there and each
+then touches a single deposit row.
+"""
+from collections import namedtuple
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum
+
+from . import ledger
+
+OwingValues = namedtuple('OwingValues', ['buyer_id', 'cashup_owing_main_balance'])
+
+
+def apply_owing_change(old, new):
+    """
+    Move the buyers' owing totals from a deposit's `old` values to its `new` ones
+    (either may be None for create/delete). Must run after the deposit row is written.
+    """
+    from .models import Buyer
+
+    deltas = {}
+    for values, sign in ((old, -1), (new, 1)):
+        if values is not None and values.buyer_id is not None:
+            amount = Decimal(values.cashup_owing_main_balance or 0)
+            deltas[values.buyer_id] = deltas.get(values.buyer_id, 0) + sign * amount
+    for buyer_id, delta in deltas.items():
+        if delta:
+            Buyer.objects.filter(pk=buyer_id).update(owing_total=F('owing_total') + delta)
+
+
+def rebuild_owing_totals(buyer_ids=None):
+    """
+    Recompute `Buyer.owing_total` from the owing deposits, for all buyers or just
+    `buyer_ids`. Returns the number of buyers whose total was wrong.
+    """
+    from .models import Buyer, CashupOwingDeposit
+
+    buyers = Buyer.objects.all()
+    if buyer_ids is not None:
+        buyers = buyers.filter(pk__in=buyer_ids)
+
+    totals = dict(
+        CashupOwingDeposit.objects.filter(buyer__in=buyers.values('pk')).values('buyer_id').annotate(
+            total=Sum('cashup_owing_main_balance'),
+        ).order_by().values_list('buyer_id', 'total')
+    )
+    fixed = 0
+    for buyer_id, current in buyers.values_list('pk', 'owing_total'):
+        expected = totals.get(buyer_id) or Decimal('0')
+        if current != expected:
+            Buyer.objects.filter(pk=buyer_id).update(owing_total=expected)
+            fixed += 1
+    return fixed
+
+
+def transfer_to_owing(buyer_id, amount):
+    """
+    Move `amount` from the buyer's main balance to their oldest Cashup owing deposit,
+    creating one on the first transfer. Returns the deposit's new balance, or None, moving
+    nothing, when the main balance does not cover `amount`.
+    """
+    from .models import CashupOwingDeposit
+
+    with transaction.atomic():
+        if not ledger.move(buyer_id, -amount, ledger.CASHUP_OWING_DEPOSIT, require_funds=True,
+                           owing_total=F('owing_total') + amount):
+            return None
+        deposit = (
+            CashupOwingDeposit.objects.filter(buyer_id=buyer_id).order_by('id')
+            .select_for_update().only('cashup_owing_main_balance').first()
+        )
+        if deposit is None:
+            # bulk_create() skips save(), which would move owing_total a second time
+            deposit, = CashupOwingDeposit.objects.bulk_create([
+                CashupOwingDeposit(buyer_id=buyer_id, cashup_owing_main_balance=amount),
+            ])
+            return deposit.cashup_owing_main_balance
+        CashupOwingDeposit.objects.filter(pk=deposit.pk).update(
+            cashup_owing_main_balance=F('cashup_owing_main_balance') + amount,
+        )
+    return deposit.cashup_owing_main_balance + amount
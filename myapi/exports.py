@@ -0,0 +1,72 @@
+"""
+Streaming exports of purchases and Cashup deposits for finance.
+
+Rows are read with `.values_list().iterator(chunk_size=...)` and encoded as they arrive,
+so an export holds one chunk of rows in memory however many it covers. The same
+generators feed the admin export endpoint and the `export_data` command.
+"""
+from collections import namedtuple
+
+from .streaming import buffered, csv_lines, json_lines
+
+CHUNK_SIZE = 2000
+
+Export = namedtuple('Export', ['model_name', 'columns', 'date_field'])
+
+EXPORTS = {
+    'purchases': Export('Purchase', [
+        'id', 'buyer_id', 'buyer__phone_number', 'item_id', 'item__name', 'quantity', 'total_price',
+        'discount_rate', 'discount_total_price', 'confirmed', 'paid', 'created_at', 'confirmed_at',
+    ], 'created_at'),
+    'cashup-deposits': Export('CashupDeposit', [
+        'id', 'buyer_id', 'buyer__phone_number', 'cashup_main_balance', 'created_at', 'daily_profit',
+        'compounding_profit', 'monthly_profit', 'withdraw', 'product_profit', 'compounding_withdraw',
+        'daily_compounding_profit', 'monthly_compounding_profit',
+    ], 'created_at'),
+    'cashup-owing-deposits': Export('CashupOwingDeposit', [
+        'id', 'buyer_id', 'buyer__phone_number', 'cashup_owing_main_balance', 'created_at', 'daily_profit',
+        'compounding_profit', 'monthly_profit', 'withdraw', 'product_profit', 'compounding_withdraw',
+        'daily_compounding_profit', 'monthly_compounding_profit',
+    ], 'created_at'),
+}
+
+FORMATS = {
+    'csv': (csv_lines, 'text/csv; charset=utf-8'),
+    'jsonl': (json_lines, 'application/x-ndjson'),
+}
+
+
+class ExportError(ValueError):
+    pass
+
+
+def export_rows(name, start=None, end=None, buyer_id=None, chunk_size=CHUNK_SIZE):
+    """
+    `(columns, rows)` for the export called `name`, where `rows` lazily yields value tuples
+    in id order. `start`/`end` bound the export's date field, `[start, end)`.
+    """
+    from django.apps import apps
+
+    try:
+        export = EXPORTS[name]
+    except KeyError:
+        raise ExportError(f"Unknown export {name!r}; choose from {', '.join(EXPORTS)}.")
+
+    queryset = apps.get_model('myapi', export.model_name).objects.order_by('id')
+    if start is not None:
+        queryset = queryset.filter(**{f'{export.date_field}__gte': start})
+    if end is not None:
+        queryset = queryset.filter(**{f'{export.date_field}__lt': end})
+    if buyer_id is not None:
+        queryset = queryset.filter(buyer_id=buyer_id)
+
+    return export.columns, queryset.values_list(*export.columns).iterator(chunk_size=chunk_size)
+
+
+def encode(export_format, columns, rows):
+    """`(chunks, content_type)` encoding `rows` as `export_format`."""
+    try:
+        lines, content_type = FORMATS[export_format]
+    except KeyError:
+        raise ExportError(f"Unknown format {export_format!r}; choose from {', '.join(FORMATS)}.")
+    return buffered(lines(columns, rows)), content_type
@@ -0,0 +1,139 @@
+"""
+Fast read-only serialization for hot list endpoints.
+
+A `ModelSerializer` over a few thousand rows spends most of its time building model
+instances and walking DRF's per-field machinery. `RowPlan` looks at a (possibly
+sparse) serializer once per request, works out which `.values()` column feeds each field
+and how to convert it, and then turns plain value dicts into the same dicts the serializer
+would produce. The renderer encodes those in one pass, so responses are byte-for-byte the
+same as the serializer's.
+"""
+from operator import itemgetter
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import DecimalField, FileField
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .storage import media_url
+
+
+# Fields whose to_representation() is the identity for what the database returns
+PASSTHROUGH_FIELDS = (serializers.IntegerField, serializers.CharField, serializers.BooleanField)
+
+
+def _file_converter(field, model_field):
+    if getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+        request = field.context.get('request')
+
+        def convert(name):
+            return media_url(request, name, model_field.storage) if name else None
+    else:
+        def convert(name):
+            return field.to_representation(model_field.attr_class(None, model_field, name))
+    return convert
+
+
+def _is_plain_decimal(field, model_field):
+    """
+    Whether the column already comes back quantized the way the field would quantize it,
+    so formatting it is all to_representation() would do.
+    """
+    return (
+        isinstance(field, serializers.DecimalField)
+        and isinstance(model_field, DecimalField)
+        and field.decimal_places == model_field.decimal_places
+        and getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+        and not field.localize
+        and not field.normalize_output
+    )
+
+
+def _resolve(model, path):
+    """The concrete model field at the end of a `__` lookup path, or None."""
+    *relations, name = path.split(LOOKUP_SEP)
+    try:
+        for relation in relations:
+            model = model._meta.get_field(relation).related_model
+        model_field = model._meta.get_field(name)
+    except (FieldDoesNotExist, AttributeError):
+        return None
+    return model_field if model_field.concrete else None
+
+
+class RowPlan:
+    """
+    Field-to-column map for one serializer. `RowPlan.build()` returns None when a field
+    cannot be fed from a plain column (nested serializers, method fields, `source='*'`).
+    """
+    def __init__(self, columns, steps):
+        self.columns = columns
+        self.steps = steps
+
+    @classmethod
+    def build(cls, serializer):
+        model = serializer.Meta.model
+        columns = [model._meta.pk.name]
+        steps = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+
+            # Fields that read through a relation can name the lookup to join instead
+            path = getattr(field, 'values_path', None)
+            if path is None:
+                if isinstance(field, serializers.BaseSerializer) or field.source == '*' or len(field.source_attrs) != 1:
+                    return None
+                path = field.source
+            model_field = _resolve(model, path)
+            if model_field is None:
+                return None
+
+            if isinstance(field, serializers.PrimaryKeyRelatedField):
+                if field.pk_field is not None:
+                    return None
+                convert = None  # `.values()` already holds the related pk
+            elif isinstance(model_field, FileField):
+                convert = _file_converter(field, model_field)
+            elif _is_plain_decimal(field, model_field):
+                convert = '{:f}'.format
+            elif isinstance(field, PASSTHROUGH_FIELDS):
+                convert = None
+            else:
+                convert = field.to_representation
+            columns.append(path)
+            steps.append((name, itemgetter(path), convert))
+        return cls(list(dict.fromkeys(columns)), steps)
+
+    def rows(self, values):
+        steps = self.steps
+        data = []
+        for row in values:
+            item = {}
+            for name, get, convert in steps:
+                value = get(row)
+                # Like Serializer.to_representation, None is never passed to the field
+                item[name] = value if value is None or convert is None else convert(value)
+            data.append(item)
+        return data
+
+
+class FastListMixin:
+    """
+    Opt-in `.values()` based `list()` for read-only list endpoints. Falls back to the
+    serializer when the (possibly sparse) serializer has a field the plan cannot feed.
+    """
+    fast_list = True
+
+    def list(self, request, *args, **kwargs):
+        plan = RowPlan.build(self.get_serializer()) if self.fast_list else None
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset()).values(*plan.columns)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(plan.rows(page))
+        return Response(plan.rows(queryset))
@@ -0,0 +1,130 @@
+"""
+Sparse fieldsets: `?fields=id,name` keeps only the listed fields and `?omit=description`
+drops fields. Nested serializers take dotted names, e.g. `?fields=id,buyer.name`.
+
+`SparseFieldsetMixin` prunes the serializer; `SparseQuerysetMixin` narrows the view's
+queryset with `only()` to the columns the remaining fields read, and drops joins for
+nested serializers that were left out.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def parse_names(value):
+    return {name.strip() for name in (value or '').split(',') if name.strip()}
+
+
+def split_names(names):
+    """Split `{'id', 'buyer.name'}` into top-level names and `{'buyer': {'name'}}`."""
+    top, nested = set(), {}
+    for name in names:
+        head, _, rest = name.partition('.')
+        top.add(head)
+        if rest:
+            nested.setdefault(head, set()).add(rest)
+    return top, nested
+
+
+def _unwrap(field):
+    return field.child if isinstance(field, serializers.ListSerializer) else field
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin honoring `?fields=` / `?omit=` on reads. The names can also be passed
+    directly as `fields=` / `omit=` keyword arguments.
+    """
+    def __init__(self, *args, fields=None, omit=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if fields is None and omit is None and request is not None and request.method in SAFE_METHODS:
+            fields = parse_names(request.query_params.get('fields'))
+            omit = parse_names(request.query_params.get('omit'))
+        if fields or omit:
+            self.restrict_fields(fields or set(), omit or set())
+
+    def restrict_fields(self, fields, omit):
+        keep, keep_nested = split_names(fields)
+        drop, drop_nested = split_names(omit)
+        drop -= set(drop_nested)
+
+        unknown = (keep | drop) - set(self.fields)
+        if unknown:
+            raise serializers.ValidationError({'fields': f"Unknown fields: {', '.join(sorted(unknown))}."})
+
+        for name in list(self.fields):
+            if (keep and name not in keep) or name in drop:
+                self.fields.pop(name)
+
+        for name in set(keep_nested) | set(drop_nested):
+            child = _unwrap(self.fields.get(name))
+            if not isinstance(child, SparseFieldsetMixin):
+                raise serializers.ValidationError({'fields': f"{name} has no nested fields."})
+            child.restrict_fields(keep_nested.get(name, set()), drop_nested.get(name, set()))
+
+
+def _field_columns(model, serializer):
+    """
+    The `only()` paths the serializer's fields read and the relations they traverse,
+    or None when some field reads something other than a plain column.
+    """
+    columns, relations = {model._meta.pk.name}, set()
+    for field in serializer.fields.values():
+        sources = getattr(field, 'model_fields', None)
+        if sources is None:
+            if field.source == '*' or len(field.source_attrs) != 1:
+                return None
+            sources = field.source_attrs
+        for source in sources:
+            try:
+                model_field = model._meta.get_field(source)
+            except FieldDoesNotExist:
+                return None
+            if not model_field.concrete:
+                return None
+            columns.add(source)
+
+            nested = _unwrap(field)
+            if isinstance(nested, serializers.BaseSerializer) and getattr(model_field, 'many_to_one', False):
+                nested_columns = _field_columns(model_field.related_model, nested)
+                if nested_columns is None or nested_columns[1]:
+                    return None
+                columns.update(f'{source}__{column}' for column in nested_columns[0])
+                relations.add(source)
+    return columns, relations
+
+
+def narrow_queryset(queryset, serializer):
+    """Restrict `queryset` to the columns and joins `serializer` needs."""
+    found = _field_columns(queryset.model, serializer)
+    if found is None:
+        return queryset
+    columns, relations = found
+
+    select_related = queryset.query.select_related
+    if isinstance(select_related, dict):
+        # A join for a nested serializer the client left out is pure overhead
+        queryset = queryset.select_related(None)
+        kept = [name for name in select_related if name in relations]
+        if kept:
+            queryset = queryset.select_related(*kept)
+        relations &= set(kept)
+    else:
+        relations = set()
+    columns = {column for column in columns if '__' not in column or column.split('__')[0] in relations}
+    return queryset.only(*columns)
+
+
+class SparseQuerysetMixin:
+    """
+    View mixin that narrows the list/detail queryset to what the (possibly pruned) serializer
+    reads. Hooks `filter_queryset()` so views with their own `get_queryset()` are covered.
+    Only applies to reads that asked for a sparse fieldset.
+    """
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        request = self.request
+        if request.method in SAFE_METHODS and ('fields' in request.query_params or 'omit' in request.query_params):
+            queryset = narrow_queryset(queryset, self.get_serializer())
+        return queryset
@@ -0,0 +1,52 @@
+from decimal import Decimal, InvalidOperation
+
+from rest_framework import serializers
+
+
+TRUE_VALUES = {'1', 'true', 'yes'}
+FALSE_VALUES = {'0', 'false', 'no'}
+
+
+def _parse_decimal(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        number = Decimal(value)
+    except InvalidOperation:
+        number = None
+    # NaN and Infinity parse, but cannot be compared with a price column
+    if number is None or not number.is_finite():
+        raise serializers.ValidationError({name: "A valid number is required."})
+    return number
+
+
+def filter_items(queryset, params):
+    """
+    Apply the catalog filters (`category`, `is_available`, `min_price`, `max_price`)
+    from `params` to an Item queryset.
+    """
+    category = params.get('category')
+    if category not in (None, ''):
+        if not category.isdigit():
+            raise serializers.ValidationError({'category': "A valid category id is required."})
+        queryset = queryset.filter(category_id=int(category))
+
+    is_available = params.get('is_available')
+    if is_available not in (None, ''):
+        if is_available.lower() in TRUE_VALUES:
+            queryset = queryset.filter(is_available=True)
+        elif is_available.lower() in FALSE_VALUES:
+            queryset = queryset.filter(is_available=False)
+        else:
+            raise serializers.ValidationError({'is_available': "Must be true or false."})
+
+    min_price = _parse_decimal(params, 'min_price')
+    if min_price is not None:
+        queryset = queryset.filter(price__gte=min_price)
+
+    max_price = _parse_decimal(params, 'max_price')
+    if max_price is not None:
+        queryset = queryset.filter(price__lte=max_price)
+
+    return queryset
@@ -0,0 +1,160 @@
+"""
+Resized and WebP variants of uploaded item and buyer images.
+
+Variants are rendered with Pillow in a process pool after the upload's transaction commits,
+so requests never wait on image work. The result is stored on the row as
+`{"source": name, "width": w, "height": h, "variants": [{"width", "src", "webp"}, ...]}`.
+"""
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import F
+
+from .storage import media_url
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WIDTHS = (160, 320, 640, 1024)
+WEBP_QUALITY = 80
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def variant_widths():
+    return tuple(getattr(settings, 'IMAGE_VARIANT_WIDTHS', DEFAULT_WIDTHS))
+
+
+def _encode(image, fmt):
+    buffer = io.BytesIO()
+    if fmt == 'WEBP':
+        image.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=4)
+    elif fmt == 'JPEG':
+        image.convert('RGB').save(buffer, 'JPEG', quality=85, optimize=True, progressive=True)
+    else:
+        image.save(buffer, 'PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def build_variants(name):
+    """
+    Render every configured width (never upscaling) as WebP plus a JPEG/PNG fallback.
+
+    Runs in a worker process and only touches storage, never the database.
+    """
+    from PIL import Image, ImageOps
+
+    with default_storage.open(name, 'rb') as source:
+        image = Image.open(source)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+    fallback_format, fallback_ext = ('PNG', 'png') if has_alpha else ('JPEG', 'jpg')
+
+    directory, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    widths = [width for width in variant_widths() if width < image.width] or [image.width]
+
+    variants = []
+    for width in widths:
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS) if width != image.width else image
+        base = os.path.join(directory, 'variants', f'{stem}_{width}w')
+        variants.append({
+            'width': width,
+            'src': default_storage.save(f'{base}.{fallback_ext}', ContentFile(_encode(resized, fallback_format))),
+            'webp': default_storage.save(f'{base}.webp', ContentFile(_encode(resized, 'WEBP'))),
+        })
+
+    return {'source': name, 'width': image.width, 'height': image.height, 'variants': variants}
+
+
+def setup_worker():
+    import django
+    django.setup()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # `spawn` keeps workers from inheriting the server's threads and DB connections
+            _executor = ProcessPoolExecutor(
+                max_workers=getattr(settings, 'IMAGE_VARIANT_WORKERS', 2),
+                mp_context=get_context('spawn'),
+                initializer=setup_worker,
+            )
+        return _executor
+
+
+def store_variants(model, pk, field_name, result):
+    """
+    Save `result` unless the image was replaced while it was being rendered. With `pk` None,
+    every row still showing the image gets it. Returns the number of rows updated.
+    """
+    changes = {f'{field_name}_variants': result}
+    if model._meta.model_name == 'item':
+        # An item loaded before the variants were stored must not save its old ones back
+        changes['version'] = F('version') + 1
+    rows = model.objects.filter(**{field_name: result['source']})
+    if pk is not None:
+        rows = rows.filter(pk=pk)
+    updated = rows.update(**changes)
+    if updated and model._meta.model_name == 'item':
+        from .cache import catalog_cache
+        catalog_cache.bump_version()
+    return updated
+
+
+def _on_done(model, pk, field_name):
+    def callback(future):
+        try:
+            store_variants(model, pk, field_name, future.result())
+        except Exception:
+            logger.exception("Could not build image variants for %s %s", model.__name__, pk)
+        finally:
+            # Callbacks run on the pool's management thread; don't leak its connection
+            connection.close()
+    return callback
+
+
+def schedule_variants(instance, field_name):
+    """
+    Queue variant rendering for `instance.<field_name>` once the current transaction commits,
+    if the stored variants do not already belong to that file.
+    """
+    name = getattr(instance, field_name).name
+    current = getattr(instance, f'{field_name}_variants') or {}
+    if not name or current.get('source') == name:
+        return
+
+    model, pk = type(instance), instance.pk
+
+    def submit():
+        if not getattr(settings, 'IMAGE_VARIANTS_ASYNC', True):
+            store_variants(model, pk, field_name, build_variants(name))
+            return
+        get_executor().submit(build_variants, name).add_done_callback(_on_done(model, pk, field_name))
+
+    transaction.on_commit(submit)
+
+
+def srcset(request, variants, key):
+    """Build an HTML `srcset` value from stored variants, or None if they are not ready."""
+    if not variants or not variants.get('variants'):
+        return None
+    entries = []
+    for variant in variants['variants']:
+        entries.append(f"{media_url(request, variant[key])} {variant['width']}w")
+    return ', '.join(entries)
@@ -0,0 +1,230 @@
+"""
+Streaming bulk import/upsert of catalog items from CSV or JSON Lines.
+
+Rows are read lazily and written in fixed-size chunks with a single
+`INSERT ... ON CONFLICT(sku) DO UPDATE` per chunk, so memory stays bounded by the chunk
+size no matter how large the file is. A second `UPDATE` per chunk bumps the rows' `version`
+and keeps `is_available` following the stock of stock-tracked items, as `Item.save()` does.
+"""
+import csv
+import json
+import time
+from dataclasses import dataclass, field
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+
+from .cache import catalog_cache
+from .filters import FALSE_VALUES, TRUE_VALUES
+from .models import Category, Item
+from .summaries import rebuild_summaries
+
+
+UPDATE_FIELDS = [
+    'name', 'description', 'is_available', 'price', 'discount_rate',
+    'discount_price', 'members_price', 'category',
+]
+CENT = Decimal('0.01')
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    skipped: int = 0
+    errors: list = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'skipped': self.skipped,
+            'errors': self.errors,
+            'seconds': round(self.seconds, 3),
+            'rows_per_sec': round(self.rows_per_sec, 1),
+        }
+
+
+def read_rows(stream, fmt):
+    """Yield one dict per record from a text stream in `csv` or `jsonl` format."""
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+    elif fmt == 'jsonl':
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _decimal(row, name, default=None):
+    value = row.get(name)
+    if value in (None, ''):
+        if default is None:
+            raise ImportRowError(f"{name} is required")
+        return default
+    try:
+        number = Decimal(str(value))
+    except InvalidOperation:
+        raise ImportRowError(f"{name} is not a number: {value!r}")
+    if not number.is_finite():
+        raise ImportRowError(f"{name} is not a number: {value!r}")
+    if number < 0:
+        raise ImportRowError(f"{name} cannot be negative: {value!r}")
+    # Round to the column's places here, so a value that does not fit is reported as a bad
+    # row instead of failing the whole chunk when the database adapts it
+    column = Item._meta.get_field(name)
+    if number.adjusted() < column.max_digits:
+        number = number.quantize(Decimal(1).scaleb(-column.decimal_places), rounding=ROUND_HALF_UP)
+        if len(number.as_tuple().digits) <= column.max_digits:
+            return number
+    raise ImportRowError(f"{name} has more than {column.max_digits - column.decimal_places} digits before the point: {value!r}")
+
+
+def _discount_rate(row):
+    rate = _decimal(row, 'discount_rate', Decimal('0'))
+    if rate > 100:
+        raise ImportRowError(f"discount_rate cannot exceed 100: {row['discount_rate']!r}")
+    return rate
+
+
+def _bool(row, name, default=True):
+    value = row.get(name)
+    if value in (None, ''):
+        return default
+    if isinstance(value, bool):
+        return value
+    if str(value).lower() in TRUE_VALUES:
+        return True
+    if str(value).lower() in FALSE_VALUES:
+        return False
+    raise ImportRowError(f"{name} must be true or false: {value!r}")
+
+
+def parse_row(row):
+    sku = str(row.get('sku') or '').strip()
+    name = str(row.get('name') or '').strip()
+    if not sku:
+        raise ImportRowError("sku is required")
+    if not name:
+        raise ImportRowError("name is required")
+    return {
+        'sku': sku,
+        'name': name,
+        'description': row.get('description') or '',
+        'is_available': _bool(row, 'is_available'),
+        'price': _decimal(row, 'price'),
+        'discount_rate': _discount_rate(row),
+        'members_price': _decimal(row, 'members_price', Decimal('0')),
+        'category': str(row.get('category') or '').strip(),
+    }
+
+
+def discount_prices(prices, rates):
+    """Compute `discount_price` for a whole batch, with the same rule as `Item.save`."""
+    return [Item.discount_price_for(price, rate).quantize(CENT, rounding=ROUND_HALF_UP) for price, rate in zip(prices, rates)]
+
+
+class CategoryResolver:
+    """Map category names to ids, creating missing categories in one query per chunk."""
+
+    def __init__(self):
+        self.ids = dict(Category.objects.values_list('name', 'id'))
+
+    def resolve(self, names):
+        missing = {name for name in names if name and name not in self.ids}
+        if missing:
+            for category in Category.objects.bulk_create([Category(name=name) for name in sorted(missing)]):
+                self.ids[category.name] = category.pk
+        return [self.ids.get(name) for name in names]
+
+
+def import_items(rows, chunk_size=1000, progress=None):
+    """
+    Upsert items keyed on `sku` from an iterable of raw row dicts.
+
+    `progress(result)` is called after every chunk. Invalid rows are skipped and reported in
+    `result.errors` instead of aborting the import.
+    """
+    result = ImportResult()
+    categories = CategoryResolver()
+    start = time.perf_counter()
+    line = 0
+
+    for chunk in chunked(rows, chunk_size):
+        parsed = []
+        for raw in chunk:
+            line += 1
+            try:
+                parsed.append(parse_row(raw))
+            except ImportRowError as exc:
+                result.skipped += 1
+                if len(result.errors) < MAX_REPORTED_ERRORS:
+                    result.errors.append({'row': line, 'error': str(exc)})
+
+        # Later rows win when a chunk repeats a sku; ON CONFLICT cannot touch a row twice
+        parsed = list({row['sku']: row for row in parsed}.values())
+        if parsed:
+            category_ids = categories.resolve([row['category'] for row in parsed])
+            prices = discount_prices([row['price'] for row in parsed], [row['discount_rate'] for row in parsed])
+            items = [
+                Item(
+                    sku=row['sku'],
+                    name=row['name'],
+                    description=row['description'],
+                    is_available=row['is_available'],
+                    price=row['price'],
+                    discount_rate=row['discount_rate'],
+                    discount_price=discount_price,
+                    members_price=row['members_price'],
+                    category_id=category_id,
+                )
+                for row, category_id, discount_price in zip(parsed, category_ids, prices)
+            ]
+            with transaction.atomic():
+                Item.objects.bulk_create(
+                    items,
+                    update_conflicts=True,
+                    unique_fields=['sku'],
+                    update_fields=UPDATE_FIELDS,
+                )
+                # An instance loaded before the import must not save over it, and a file
+                # cannot put a tracked item that is out of stock back on sale
+                Item.objects.filter(sku__in=[item.sku for item in items]).update(
+                    version=F('version') + 1,
+                    is_available=Case(
+                        When(stock__gt=0, then=Value(True)),
+                        When(stock__isnull=False, then=Value(False)),
+                        default=F('is_available'),
+                    ),
+                )
+            result.rows += len(items)
+
+        result.seconds = time.perf_counter() - start
+        if progress:
+            progress(result)
+
+    # bulk_create skips Item.save(), so bring the category summaries and the catalog cache
+    # up to date here; upserts can move items between categories, so recount all of them
+    if result.rows:
+        rebuild_summaries()
+    catalog_cache.invalidate()
+    result.seconds = time.perf_counter() - start
+    return result
@@ -0,0 +1,156 @@
+"""
+Append-only ledger of main balance movements.
+
+Every change to `Buyer.main_balance` goes through `post()`, which moves the balance with one
+conditional `UPDATE` and appends a `BalanceEntry` per line in the same transaction, so the
+entries always add up to the balance. `take_snapshots()` periodically records each buyer's
+balance in a `BalanceSnapshot`; `balance_at()` starts from the latest snapshot before the
+requested time and only adds up the entries after it, a range scan on
+`(buyer, created_at)`.
+
+Times are half-open throughout: a snapshot or balance "as of" a time covers the entries
+created before it, so `balance_at(start) + statement(start, end) == balance_at(end)`.
+"""
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+ZERO = Decimal('0.00')
+# Stands in for "no snapshot yet", earlier than any entry
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+# Snapshots stay this far behind now, so an entry still being committed with an earlier
+# timestamp is never left out of one
+SNAPSHOT_LAG = timedelta(minutes=5)
+
+OPENING = 'opening'
+DEPOSIT = 'deposit'
+PURCHASE = 'purchase'
+CASHUP_DEPOSIT = 'cashup_deposit'
+CASHUP_OWING_DEPOSIT = 'cashup_owing_deposit'
+ADJUSTMENT = 'adjustment'
+
+KIND_CHOICES = [
+    (OPENING, 'Opening balance'),
+    (DEPOSIT, 'Deposit'),
+    (PURCHASE, 'Purchase'),
+    (CASHUP_DEPOSIT, 'Transfer to Cashup deposit'),
+    (CASHUP_OWING_DEPOSIT, 'Transfer to Cashup owing deposit'),
+    (ADJUSTMENT, 'Adjustment'),
+]
+
+Line = namedtuple('Line', ['amount', 'kind', 'reference'])
+
+
+def post(buyer_id, lines, require_funds=False, **changes):
+    """
+    Apply `lines` (`Line(amount, kind, reference)`, negative amounts take money out) to the
+    buyer's main balance as one `UPDATE`, and append an entry for each. `changes` are other
+    Buyer columns to set in the same `UPDATE`.
+
+    With `require_funds`, every line must be a debit, and nothing happens unless the
+    balance covers the net amount. Returns whether the balance moved.
+    """
+    from .models import BalanceEntry, Buyer
+
+    lines = [Line(*line) for line in lines]
+    if require_funds and any(line.amount >= 0 for line in lines):
+        # A "debit" of zero or less would pass the funds check and credit the balance
+        raise ValueError("require_funds only takes negative amounts.")
+    amount = sum((line.amount for line in lines), ZERO)
+    buyers = Buyer.objects.filter(pk=buyer_id)
+    if require_funds and amount < 0:
+        buyers = buyers.filter(main_balance__gte=-amount)
+
+    with transaction.atomic():
+        if not buyers.update(main_balance=F('main_balance') + amount, **changes):
+            return False
+        now = timezone.now()
+        BalanceEntry.objects.bulk_create([
+            BalanceEntry(buyer_id=buyer_id, amount=line.amount, kind=line.kind,
+                         reference=line.reference or '', created_at=now)
+            for line in lines if line.amount
+        ])
+    return True
+
+
+def move(buyer_id, amount, kind, reference='', require_funds=False, **changes):
+    """`post()` for a single line."""
+    return post(buyer_id, [Line(amount, kind, reference)], require_funds, **changes)
+
+
+def latest_snapshot(buyer_id, when):
+    from .models import BalanceSnapshot
+
+    return BalanceSnapshot.objects.filter(buyer_id=buyer_id, as_of__lte=when).order_by('-as_of').first()
+
+
+def balance_at(buyer_id, when):
+    """The buyer's main balance as of `when`, from the entries created before it."""
+    from .models import BalanceEntry
+
+    snapshot = latest_snapshot(buyer_id, when)
+    entries = BalanceEntry.objects.filter(buyer_id=buyer_id, created_at__lt=when)
+    if snapshot is not None:
+        entries = entries.filter(created_at__gte=snapshot.as_of)
+    since = entries.aggregate(total=Sum('amount'))['total'] or ZERO
+    return (snapshot.balance if snapshot is not None else ZERO) + since
+
+
+def statement(buyer_id, start, end):
+    """Entries in `[start, end)`, oldest first."""
+    from .models import BalanceEntry
+
+    return BalanceEntry.objects.filter(
+        buyer_id=buyer_id, created_at__gte=start, created_at__lt=end,
+    ).order_by('created_at', 'id')
+
+
+def take_snapshots(as_of=None):
+    """
+    Snapshot, as of `as_of` (default `SNAPSHOT_LAG` ago), the balance of every buyer with entries since
+    their last snapshot, in one query plus the insert. Returns the number written.
+    """
+    from .models import BalanceEntry, BalanceSnapshot, Buyer
+
+    as_of = as_of or timezone.now() - SNAPSHOT_LAG
+    previous = BalanceSnapshot.objects.filter(buyer=OuterRef('pk'), as_of__lte=as_of).order_by('-as_of')
+    since = BalanceEntry.objects.filter(
+        buyer=OuterRef('pk'), created_at__gte=OuterRef('previous_as_of'), created_at__lt=as_of,
+    ).order_by().values('buyer').annotate(total=Sum('amount')).values('total')
+    buyers = Buyer.objects.annotate(
+        previous_balance=Coalesce(Subquery(previous.values('balance')[:1]), ZERO, output_field=MONEY),
+        previous_as_of=Coalesce(Subquery(previous.values('as_of')[:1]), Value(EPOCH)),
+    ).annotate(
+        since_total=Subquery(since, output_field=MONEY),
+    ).filter(since_total__isnull=False)
+
+    snapshots = [
+        BalanceSnapshot(buyer_id=buyer_id, as_of=as_of, balance=previous_balance + since_total)
+        for buyer_id, previous_balance, since_total
+        in buyers.values_list('pk', 'previous_balance', 'since_total').iterator()
+    ]
+    BalanceSnapshot.objects.bulk_create(snapshots, batch_size=1000)
+    return len(snapshots)
+
+
+def drift(buyer_ids=None):
+    """`{buyer_id: (main_balance, ledger_total)}` for buyers whose ledger disagrees with the balance."""
+    from .models import BalanceEntry, Buyer
+
+    totals = BalanceEntry.objects.filter(buyer=OuterRef('pk')).order_by().values('buyer').annotate(
+        total=Sum('amount'),
+    ).values('total')
+    buyers = Buyer.objects.annotate(ledger_total=Coalesce(Subquery(totals, output_field=MONEY), ZERO, output_field=MONEY))
+    if buyer_ids is not None:
+        buyers = buyers.filter(pk__in=buyer_ids)
+    return {
+        buyer_id: (balance, total)
+        for buyer_id, balance, total in buyers.values_list('pk', 'main_balance', 'ledger_total')
+        if balance != total
+    }
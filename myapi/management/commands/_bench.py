@@ -0,0 +1,33 @@
+import time
+from contextlib import contextmanager
+from statistics import median
+
+from django.db import transaction
+
+
+class _Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back():
+    """
+    Run the block inside a transaction that is always rolled back, so benchmark
+    fixtures never leak into the database the command is pointed at.
+    """
+    try:
+        with transaction.atomic():
+            yield
+            raise _Rollback
+    except _Rollback:
+        pass
+
+
+def timed(func, repeat=5):
+    """Return the median wall time of `func()` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return median(samples)
@@ -0,0 +1,57 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from myapi.accrual import ACCRUALS, CHUNK_SIZE, accrue_chunk, chunks, setup_worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Accrue daily, compounding and monthly profit on Cashup and Cashup owing deposits up to "
+        "a day (default today), catching up any days missed. Safe to run again for the same day."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=parse_date, help="Day to accrue up to (YYYY-MM-DD)")
+        parser.add_argument('--kind', choices=list(ACCRUALS), action='append',
+                            help="Only accrue these deposits (default all)")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help="Worker processes; 1 runs in this process")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Primary keys per chunk")
+
+    def handle(self, *args, **options):
+        day = options['date'] or timezone.localdate()
+        jobs = [
+            (kind, start_pk, end_pk, day)
+            for kind in options['kind'] or ACCRUALS
+            for start_pk, end_pk in chunks(kind, day, options['chunk_size'])
+        ]
+
+        workers = options['workers']
+        if workers > 1 and connection.vendor == 'sqlite':
+            # SQLite takes one writer at a time; parallel chunks would only wait on each other
+            self.stdout.write(self.style.WARNING("SQLite allows a single writer, running the chunks in this process."))
+            workers = 1
+
+        start = time.perf_counter()
+        accrued = 0
+        if workers <= 1 or len(jobs) <= 1:
+            for job in jobs:
+                accrued += accrue_chunk(*job)
+        else:
+            # Workers open their own connections; forked ones must not share ours
+            connections.close_all()
+            with ProcessPoolExecutor(workers, initializer=setup_worker) as pool:
+                for future in as_completed([pool.submit(accrue_chunk, *job) for job in jobs]):
+                    accrued += future.result()
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Accrued profit to {day} on {accrued:,} deposits in {len(jobs)} chunks, {elapsed:.2f}s "
+            f"({accrued / elapsed if elapsed else 0:,.0f} deposits/sec)"
+        ))
@@ -0,0 +1,59 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from django.core.management.base import BaseCommand
+
+from myapi.images import build_variants, setup_worker, store_variants
+from myapi.models import Buyer, Item
+
+
+TARGETS = {
+    'item': (Item, 'item_image'),
+    'buyer': (Buyer, 'buyer_image'),
+}
+
+
+class Command(BaseCommand):
+    help = "Render resized and WebP variants for existing item and buyer images."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', choices=sorted(TARGETS), action='append',
+                            help="Limit to item or buyer images (repeatable)")
+        parser.add_argument('--force', action='store_true', help="Re-render images that already have variants")
+        parser.add_argument('--workers', type=int, default=None)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        rendered = 0
+        with ProcessPoolExecutor(options['workers'], mp_context=get_context('spawn'), initializer=setup_worker) as pool:
+            for target in options['model'] or sorted(TARGETS):
+                rendered += self.backfill(pool, *TARGETS[target], force=options['force'])
+        self.stdout.write(self.style.SUCCESS(f"Rendered {rendered} images in {time.perf_counter() - start:.1f}s"))
+
+    def backfill(self, pool, model, field_name, force):
+        variants_field = f'{field_name}_variants'
+        rows = model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+        names = set()
+        for name, variants in rows.values_list(field_name, variants_field).iterator():
+            if force or (variants or {}).get('source') != name:
+                names.add(name)
+
+        # Rows sharing a file are rendered once and updated together
+        done = 0
+        for name, result in zip(sorted(names), pool.map(_render, sorted(names))):
+            if result is None:
+                self.stderr.write(f"  could not render {name}")
+                continue
+            # Bumps the items' version and the catalog cache, as for a freshly uploaded image
+            store_variants(model, None, field_name, result)
+            done += 1
+            self.stdout.write(f"  {model.__name__} {name}: {len(result['variants'])} variants")
+        return done
+
+
+def _render(name):
+    try:
+        return build_variants(name)
+    except Exception:
+        return None
@@ -0,0 +1,91 @@
+from decimal import Decimal
+from urllib.parse import urlparse
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.pagination import Cursor
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from myapi.models import Category, Item
+from myapi.pagination import ItemCursorPagination
+from myapi.serializers import ItemSerializer
+from myapi.views import ItemView
+
+from ._bench import rolled_back, timed
+
+
+class Command(BaseCommand):
+    help = "Compare the unpaginated item list with the cursor paginated catalog at several catalog sizes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[10_000, 100_000])
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        for size in options['sizes']:
+            with rolled_back():
+                self.bench(size, options['categories'], options['repeat'])
+
+    def seed(self, size, n_categories):
+        categories = Category.objects.bulk_create(
+            [Category(name=f"Bench category {i}") for i in range(n_categories)]
+        )
+        batch = []
+        for i in range(size):
+            price = Decimal(100 + i % 900)
+            batch.append(Item(
+                name=f"Bench item {i}",
+                description="Benchmark item",
+                is_available=i % 3 != 0,
+                price=price,
+                discount_price=price,
+                category=categories[i % n_categories],
+            ))
+            if len(batch) == 5000:
+                Item.objects.bulk_create(batch)
+                batch = []
+        Item.objects.bulk_create(batch)
+        return categories
+
+    def bench(self, size, n_categories, repeat):
+        categories = self.seed(size, n_categories)
+        factory = APIRequestFactory()
+        view = ItemView.as_view({'get': 'list'})
+        renderer = JSONRenderer()
+
+        def full_list():
+            request = factory.get('/api/items/')
+            data = ItemSerializer(Item.objects.all(), many=True, context={'request': request}).data
+            renderer.render(data)
+
+        def page(query):
+            def run():
+                response = view(factory.get('/api/items/' + query))
+                response.render()
+            return run
+
+        # A cursor pointing close to the end of the catalog
+        paginator = ItemCursorPagination()
+        paginator.base_url = 'http://testserver/api/items/'
+        deep_id = Item.objects.order_by('-id').values_list('id', flat=True)[100]
+        deep_cursor = urlparse(paginator.encode_cursor(Cursor(offset=0, reverse=False, position=str(deep_id)))).query
+        category_filter = f'category={categories[-1].pk}&is_available=true'
+
+        results = [
+            ('before: full list', timed(full_list, repeat=1)),
+            ('after: first page', timed(page('?'), repeat)),
+            ('after: deep page', timed(page('?' + deep_cursor), repeat)),
+            ('after: filtered deep page', timed(page(f'?{category_filter}&{deep_cursor}'), repeat)),
+        ]
+
+        # Same filtered page without the composite indexes, to show what they buy us
+        with connection.cursor() as cursor:
+            for index in Item._meta.indexes:
+                cursor.execute(f'DROP INDEX "{index.name}"')
+        results.append(('after, no indexes: filtered deep page', timed(page(f'?{category_filter}&{deep_cursor}'), repeat)))
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{size} items"))
+        for label, ms in results:
+            self.stdout.write(f"  {label:<40} {ms:10.2f} ms")
@@ -0,0 +1,108 @@
+import threading
+import time
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Sum
+
+from myapi.deposits import transfer_to_owing
+from myapi.models import Buyer, CashupOwingDeposit
+
+PREFIX = 'bench-owing-transfers'
+START_BALANCE = Decimal('1000000')
+AMOUNT = Decimal('10.00')
+
+
+def legacy_transfer(buyer_id, amount):
+    """What the view used to do: add the amount to every owing deposit, saving each, without a debit."""
+    with transaction.atomic():
+        deposits = CashupOwingDeposit.objects.filter(buyer_id=buyer_id)
+        if deposits.exists():
+            for deposit in deposits:
+                deposit.cashup_owing_main_balance = deposit.cashup_owing_main_balance + amount
+                deposit.save()
+        else:
+            CashupOwingDeposit.objects.create(cashup_owing_main_balance=amount, buyer_id=buyer_id)
+
+
+def service_transfer(buyer_id, amount):
+    transfer_to_owing(buyer_id, amount)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run concurrent owing-deposit transfers for one buyer through the old per-deposit save "
+        "loop and the single locked transfer. Reports transfers/sec and whether the money that "
+        "arrived on the deposits matches what left the main balance."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=20)
+        parser.add_argument('--transfers', type=int, default=25, help="Transfers per thread")
+        parser.add_argument('--deposits', type=int, default=3, help="Owing deposits the buyer already has")
+
+    def handle(self, *args, **options):
+        # Threads use their own connections, so the fixtures have to be committed
+        # rather than wrapped in rolled_back(); they are deleted again at the end
+        try:
+            for label, transfer in [
+                ('before: save every deposit', legacy_transfer),
+                ('after: one locked transfer', service_transfer),
+            ]:
+                self.seed(options['deposits'])
+                self.bench(label, transfer, options['threads'], options['transfers'])
+                self.cleanup()
+        finally:
+            self.cleanup()
+
+    def seed(self, n_deposits):
+        # bulk_create skips the signal that would create a second buyer for the user
+        user = User.objects.bulk_create([User(username=PREFIX)])[0]
+        self.buyer = Buyer.objects.bulk_create([
+            Buyer(user=user, name="Bench buyer", phone_number=PREFIX, main_balance=START_BALANCE),
+        ])[0]
+        CashupOwingDeposit.objects.bulk_create([
+            CashupOwingDeposit(buyer=self.buyer, cashup_owing_main_balance=Decimal('0.00')) for _ in range(n_deposits)
+        ])
+
+    def cleanup(self):
+        CashupOwingDeposit.objects.filter(buyer__phone_number=PREFIX).delete()
+        Buyer.objects.filter(phone_number=PREFIX).delete()
+        User.objects.filter(username=PREFIX).delete()
+
+    def bench(self, label, transfer, n_threads, per_thread):
+        barrier = threading.Barrier(n_threads)
+        errors = []
+
+        def run():
+            try:
+                barrier.wait()
+                for _ in range(per_thread):
+                    transfer(self.buyer.pk, AMOUNT)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run) for _ in range(n_threads)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        transfers = n_threads * per_thread
+        expected = AMOUNT * transfers
+        owing = CashupOwingDeposit.objects.filter(buyer=self.buyer).aggregate(total=Sum('cashup_owing_main_balance'))['total']
+        self.buyer.refresh_from_db(fields=['main_balance', 'owing_total'])
+
+        self.stdout.write(self.style.MIGRATE_HEADING(label))
+        self.stdout.write(f"  {'transfers/sec':<28} {transfers / elapsed:12,.0f}")
+        self.stdout.write(f"  {'owing added (transferred)':<28} {owing:12,} ({expected:,})")
+        self.stdout.write(f"  {'main balance debited':<28} {START_BALANCE - self.buyer.main_balance:12,}")
+        self.stdout.write(f"  {'owing_total':<28} {self.buyer.owing_total:12,}")
+        if errors:
+            self.stdout.write(self.style.ERROR(f"  {len(errors)} threads failed: {errors[0]!r}"))
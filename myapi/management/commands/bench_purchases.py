@@ -0,0 +1,114 @@
+import threading
+import time
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from myapi.models import Buyer, Item, Purchase
+from myapi.purchases import purchase_item
+
+PREFIX = 'bench-purchases'
+START_BALANCE = Decimal('1000000')
+
+
+def legacy_purchase(buyer_id, item, quantity, idempotency_key):
+    """What the purchase serializer used to do: read the balance, subtract, save the buyer."""
+    buyer = Buyer.objects.get(pk=buyer_id)
+    total_price, _ = Purchase.prices_for(item.price, quantity, 0)
+    if buyer.main_balance < total_price:
+        raise CommandError("Insufficient funds.")
+    buyer.main_balance -= total_price
+    buyer.save(update_fields=['main_balance'])
+    Purchase.objects.create(item=item, buyer_id=buyer_id, quantity=quantity)
+
+
+def service_purchase(buyer_id, item, quantity, idempotency_key):
+    purchase_item(buyer_id, item, quantity=quantity, idempotency_key=idempotency_key)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run purchases from concurrent buyers, each request sent twice as a client retry would, "
+        "through the old read-modify-write path and the conditional-update service. Reports "
+        "purchases/sec and how far balances drifted from what was actually bought."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--buyers', type=int, default=50)
+        parser.add_argument('--purchases', type=int, default=20, help="Purchases per buyer")
+
+    def handle(self, *args, **options):
+        # Threads use their own connections, so the fixtures have to be committed
+        # rather than wrapped in rolled_back(); they are deleted again at the end
+        try:
+            for label, purchase in [
+                ('before: read-modify-write', legacy_purchase),
+                ('after: conditional UPDATE', service_purchase),
+            ]:
+                self.seed(options['buyers'])
+                self.bench(label, purchase, options['purchases'])
+                self.cleanup()
+        finally:
+            self.cleanup()
+
+    def seed(self, n_buyers):
+        # bulk_create skips the signal that would create a second buyer per user
+        users = User.objects.bulk_create([User(username=f'{PREFIX}-{i}') for i in range(n_buyers)])
+        self.buyer_ids = [
+            buyer.pk for buyer in Buyer.objects.bulk_create([
+                Buyer(user=user, name=f"Bench buyer {i}", phone_number=f'{PREFIX}-{i}', main_balance=START_BALANCE)
+                for i, user in enumerate(users)
+            ])
+        ]
+        self.item = Item.objects.create(name=f"{PREFIX} item", price=Decimal('10.00'))
+
+    def cleanup(self):
+        Purchase.objects.filter(buyer__phone_number__startswith=PREFIX).delete()
+        Buyer.objects.filter(phone_number__startswith=PREFIX).delete()
+        User.objects.filter(username__startswith=PREFIX).delete()
+        Item.objects.filter(name=f"{PREFIX} item").delete()
+
+    def bench(self, label, purchase, per_buyer):
+        barrier = threading.Barrier(len(self.buyer_ids))
+        errors = []
+
+        def run(buyer_id):
+            try:
+                barrier.wait()
+                for n in range(per_buyer):
+                    key = f'{buyer_id}-{n}'
+                    purchase(buyer_id, self.item, 1, key)
+                    purchase(buyer_id, self.item, 1, key)  # the retry
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run, args=(buyer_id,)) for buyer_id in self.buyer_ids]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        requests = len(self.buyer_ids) * per_buyer * 2
+        bought = Purchase.objects.filter(buyer_id__in=self.buyer_ids).count()
+        expected = len(self.buyer_ids) * per_buyer
+        spent = sum(
+            START_BALANCE - balance
+            for balance in Buyer.objects.filter(pk__in=self.buyer_ids).values_list('main_balance', flat=True)
+        )
+        charged_for = sum(
+            self.item.price * quantity
+            for quantity in Purchase.objects.filter(buyer_id__in=self.buyer_ids).values_list('quantity', flat=True)
+        )
+
+        self.stdout.write(self.style.MIGRATE_HEADING(label))
+        self.stdout.write(f"  {'requests/sec':<28} {requests / elapsed:12,.0f}")
+        self.stdout.write(f"  {'purchases (expected)':<28} {bought:12,} ({expected:,})")
+        self.stdout.write(f"  {'debited (for purchases)':<28} {spent:12,} ({charged_for:,})")
+        if errors:
+            self.stdout.write(self.style.ERROR(f"  {len(errors)} buyers failed: {errors[0]!r}"))
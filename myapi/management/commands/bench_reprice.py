@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from myapi.models import Category, Item
+from myapi.pricing import reprice_items
+
+from ._bench import rolled_back, timed
+
+
+class Command(BaseCommand):
+    help = "Time set-based repricing against saving each item, at several catalog sizes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[10_000, 100_000])
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--per-row-sample', type=int, default=1000,
+                            help="Items saved one by one for the per-row estimate")
+
+    def handle(self, *args, **options):
+        for size in options['sizes']:
+            with rolled_back():
+                self.bench(size, options['categories'], options['per_row_sample'])
+
+    def seed(self, size, n_categories):
+        categories = Category.objects.bulk_create(
+            [Category(name=f"Bench category {i}") for i in range(n_categories)]
+        )
+        batch = []
+        for i in range(size):
+            price = Decimal(100 + i % 900)
+            batch.append(Item(
+                name=f"Bench item {i}",
+                price=price,
+                discount_price=price,
+                discount_rate=Decimal(i % 4 * 5),
+                category=categories[i % n_categories],
+            ))
+            if len(batch) == 5000:
+                Item.objects.bulk_create(batch)
+                batch = []
+        Item.objects.bulk_create(batch)
+        return categories
+
+    def bench(self, size, n_categories, sample):
+        categories = self.seed(size, n_categories)
+        everything = Item.objects.all()
+        one_category = Item.objects.filter(category=categories[0])
+
+        def per_row():
+            for item in Item.objects.all()[:sample]:
+                item.discount_rate = Decimal('15')
+                item.save()
+
+        results = [
+            ('before: save() per item (extrapolated)', timed(per_row, repeat=1) * size / sample),
+            ('after: catalog discount rate', timed(lambda: reprice_items(everything, discount_rate=Decimal('15')), 3)),
+            ('after: catalog price +5%', timed(
+                lambda: reprice_items(everything, price_change_percent=Decimal('5'), rebuild_indexes=True), 3)),
+            ('after: one category, rate and price', timed(
+                lambda: reprice_items(one_category, discount_rate=Decimal('20'), price_change_percent=Decimal('-5')), 3)),
+        ]
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{size} items"))
+        for label, ms in results:
+            self.stdout.write(f"  {label:<42} {ms:10.2f} ms")
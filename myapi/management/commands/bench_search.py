@@ -0,0 +1,65 @@
+import random
+import time
+from decimal import Decimal
+from statistics import median, quantiles
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from myapi.models import Item
+from myapi.search import search_items
+
+from ._bench import rolled_back
+
+
+SYLLABLES = "ka lo mi ne ru sa ti vo ba de fi go hu ja ke lu ma no pi re".split()
+
+
+class Command(BaseCommand):
+    help = "Measure item search latency (FTS5 vs LIKE) on a synthetic catalog."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=100_000)
+        parser.add_argument('--queries', type=int, default=200)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            self.bench(options['size'], options['queries'])
+
+    def seed(self, size, rng):
+        # A few thousand made-up words with a skewed frequency, like real product text
+        words = sorted({''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(5000)})
+        weights = [1 / (rank + 1) for rank in range(len(words))]
+        batch = []
+        for i in range(size):
+            batch.append(Item(
+                name=' '.join(rng.choices(words, weights, k=3)),
+                description=' '.join(rng.choices(words, weights, k=25)),
+                price=Decimal(100 + i % 900),
+                discount_price=Decimal(100 + i % 900),
+            ))
+            if len(batch) == 5000:
+                Item.objects.bulk_create(batch)
+                batch = []
+        Item.objects.bulk_create(batch)
+        return words
+
+    def bench(self, size, n_queries, page_size=20):
+        rng = random.Random(42)
+        words = self.seed(size, rng)
+        queries = [' '.join(rng.sample(words, rng.choice([1, 2]))) for _ in range(n_queries)]
+
+        def like(query):
+            condition = Q()
+            for word in query.split():
+                condition &= Q(name__icontains=word) | Q(description__icontains=word)
+            return list(Item.objects.filter(condition).values_list('id', flat=True)[:page_size])
+
+        for label, run in (('fts5', lambda q: search_items(q, page_size)), ('like', like)):
+            samples = []
+            for query in queries:
+                start = time.perf_counter()
+                run(query)
+                samples.append((time.perf_counter() - start) * 1000)
+            p95 = quantiles(samples, n=20)[-1]
+            self.stdout.write(f"{label:>5} @ {size} items: p50 {median(samples):8.2f} ms   p95 {p95:8.2f} ms")
@@ -0,0 +1,104 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from myapi.cache import catalog_cache
+from myapi.fastpath import RowPlan
+from myapi.models import Buyer, Category, Item, Purchase
+from myapi.serializers import ItemSerializer, PurchaseSerializer
+from myapi.views import CartedProductsList, ConfirmedProductsList, ItemView
+
+from ._bench import rolled_back, timed
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare rows/sec of the .values() fast path with the DRF serializers, and check the "
+        "rendered responses are byte-for-byte identical."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            self.seed(options['rows'])
+            self.check_responses()
+            self.bench(options['repeat'])
+
+    def seed(self, rows):
+        category = Category.objects.create(name="Bench category")
+        Item.objects.bulk_create([
+            Item(
+                name=f"Bench item {i}",
+                description="Benchmark item",
+                price=Decimal(100 + i % 900),
+                discount_price=Decimal(100 + i % 900),
+                discount_rate=Decimal(i % 4 * 5),
+                category=category,
+                item_image='item_images/bench.png' if i % 2 else None,
+                item_image_variants={'variants': [{'width': 160, 'src': 'v/a.png', 'webp': 'v/a.webp'}]} if i % 3 else {},
+            )
+            for i in range(rows)
+        ])
+        # bulk_create skips signals, so the user needs no buyer from Buyer.save()
+        user = User.objects.bulk_create([User(username='bench-serializers')])[0]
+        buyer = Buyer.objects.bulk_create([Buyer(user=user, name="Bench buyer", phone_number='bench-0')])[0]
+        item_ids = list(Item.objects.values_list('id', flat=True))
+        Purchase.objects.bulk_create([
+            Purchase(item_id=item_ids[i % len(item_ids)], buyer=buyer, quantity=1 + i % 3,
+                     total_price=Decimal(100 + i % 900), confirmed=i % 2 == 0)
+            for i in range(rows)
+        ])
+        self.user = user
+        catalog_cache.bump_version()
+
+    def render(self, view, path, **initkwargs):
+        request = APIRequestFactory().get(path)
+        force_authenticate(request, user=self.user)
+        actions = {'get': 'list'} if hasattr(view, 'get_extra_actions') else None
+        callback = view.as_view(actions, **initkwargs) if actions else view.as_view(**initkwargs)
+        catalog_cache.bump_version()
+        response = callback(request)
+        response.render()
+        return response.content
+
+    def check_responses(self):
+        for view, path in [
+            (ItemView, '/api/items/?page_size=100'),
+            (ItemView, '/api/items/?page_size=100&fields=id,price,item_image'),
+            (ConfirmedProductsList, '/api/confirmed-products/'),
+            (CartedProductsList, '/api/carted-products/?omit=item_image'),
+        ]:
+            fast = self.render(view, path)
+            slow = self.render(view, path, fast_list=False)
+            if fast != slow:
+                raise CommandError(f"{path}: fast path output differs from the serializer")
+            self.stdout.write(f"  {path:<55} identical ({len(fast)} bytes)")
+
+    def bench(self, repeat):
+        request = Request(APIRequestFactory().get('/'))
+        renderer = JSONRenderer()
+        for label, serializer_class, queryset in [
+            ('items', ItemSerializer, Item.objects.order_by('id')),
+            ('purchases', PurchaseSerializer, Purchase.objects.order_by('id')),
+        ]:
+            count = queryset.count()
+            context = {'request': request}
+
+            def serializer():
+                renderer.render(serializer_class(queryset, many=True, context=context).data)
+
+            def fast():
+                plan = RowPlan.build(serializer_class(context=context))
+                renderer.render(plan.rows(queryset.values(*plan.columns)))
+
+            before, after = timed(serializer, repeat), timed(fast, repeat)
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{count} {label}"))
+            self.stdout.write(f"  {'before: ModelSerializer':<30} {count / before * 1000:12,.0f} rows/s")
+            self.stdout.write(f"  {'after: values() fast path':<30} {count / after * 1000:12,.0f} rows/s")
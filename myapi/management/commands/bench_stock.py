@@ -0,0 +1,110 @@
+import threading
+import time
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Sum
+
+from myapi.models import Buyer, Item, Purchase
+from myapi.purchases import purchase_item
+from myapi.stock import OutOfStock
+
+PREFIX = 'bench-stock'
+START_BALANCE = Decimal('1000000')
+
+
+def legacy_purchase(buyer_id, item):
+    """Check the stock that was read, then write back one less: a read-modify-write."""
+    current = Item.objects.values_list('stock', flat=True).get(pk=item.pk)
+    if current < 1:
+        raise OutOfStock
+    Item.objects.filter(pk=item.pk).update(stock=current - 1)
+    Purchase.objects.create(item=item, buyer_id=buyer_id, quantity=1, confirmed=True, paid=True)
+
+
+def service_purchase(buyer_id, item):
+    purchase_item(buyer_id, item, quantity=1)
+
+
+class Command(BaseCommand):
+    help = (
+        "Have many buyers race for the last units of one item, through a read-modify-write of "
+        "the stock and through the conditional-update reservations. Reports attempts/sec and "
+        "how many units were sold against how many there were."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--buyers', type=int, default=100)
+        parser.add_argument('--stock', type=int, default=20, help="Units on sale")
+        parser.add_argument('--attempts', type=int, default=3, help="Purchases each buyer tries")
+
+    def handle(self, *args, **options):
+        # Threads use their own connections, so the fixtures have to be committed
+        # rather than wrapped in rolled_back(); they are deleted again at the end
+        try:
+            for label, purchase in [
+                ('before: read-modify-write', legacy_purchase),
+                ('after: conditional UPDATE', service_purchase),
+            ]:
+                self.seed(options['buyers'], options['stock'])
+                self.bench(label, purchase, options['stock'], options['attempts'])
+                self.cleanup()
+        finally:
+            self.cleanup()
+
+    def seed(self, n_buyers, units):
+        # bulk_create skips the signal that would create a second buyer per user
+        users = User.objects.bulk_create([User(username=f'{PREFIX}-{i}') for i in range(n_buyers)])
+        self.buyer_ids = [
+            buyer.pk for buyer in Buyer.objects.bulk_create([
+                Buyer(user=user, name=f"Bench buyer {i}", phone_number=f'{PREFIX}-{i}', main_balance=START_BALANCE)
+                for i, user in enumerate(users)
+            ])
+        ]
+        self.item = Item.objects.create(name=f"{PREFIX} item", price=Decimal('10.00'), stock=units)
+
+    def cleanup(self):
+        Purchase.objects.filter(buyer__phone_number__startswith=PREFIX).delete()
+        Buyer.objects.filter(phone_number__startswith=PREFIX).delete()
+        User.objects.filter(username__startswith=PREFIX).delete()
+        Item.objects.filter(name=f"{PREFIX} item").delete()
+
+    def bench(self, label, purchase, units, attempts):
+        barrier = threading.Barrier(len(self.buyer_ids))
+        sold_out, errors = [], []
+
+        def run(buyer_id):
+            try:
+                barrier.wait()
+                for _ in range(attempts):
+                    try:
+                        purchase(buyer_id, self.item)
+                    except OutOfStock:
+                        sold_out.append(buyer_id)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run, args=(buyer_id,)) for buyer_id in self.buyer_ids]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        requests = len(self.buyer_ids) * attempts
+        sold = Purchase.objects.filter(item=self.item).aggregate(units=Sum('quantity'))['units'] or 0
+        self.item.refresh_from_db(fields=['stock', 'is_available'])
+
+        self.stdout.write(self.style.MIGRATE_HEADING(label))
+        self.stdout.write(f"  {'attempts/sec':<28} {requests / elapsed:12,.0f}")
+        self.stdout.write(f"  {'units sold (on sale)':<28} {sold:12,} ({units:,})")
+        self.stdout.write(f"  {'oversold':<28} {max(sold - units, 0):12,}")
+        self.stdout.write(f"  {'stock left, available':<28} {self.item.stock:12,} {self.item.is_available}")
+        self.stdout.write(f"  {'sold out responses':<28} {len(sold_out):12,}")
+        if errors:
+            self.stdout.write(self.style.ERROR(f"  {len(errors)} buyers failed: {errors[0]!r}"))
@@ -0,0 +1,95 @@
+from collections import defaultdict
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+
+from myapi.cache import catalog_cache
+from myapi.models import Buyer, Item
+from myapi.storage import ContentAddressedStorage, is_hashed_name
+
+
+IMAGE_FIELDS = [
+    (Item, 'item_image'),
+    (Buyer, 'buyer_image'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Move existing uploads to content-addressed names, merge duplicate files and "
+        "rewrite the image fields that point at them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report what would change without touching anything")
+        parser.add_argument('--keep-originals', action='store_true', help="Do not delete the old files")
+
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, ContentAddressedStorage):
+            raise CommandError("The default storage is not ContentAddressedStorage; nothing to migrate to.")
+
+        # Every row and variant that points at a file, so a file shared by several rows
+        # (or by an item and a buyer) is moved once and all references are rewritten
+        references = defaultdict(list)
+        for model, field_name in IMAGE_FIELDS:
+            rows = model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+            for pk, name in rows.values_list('pk', field_name).iterator():
+                references[name].append((model, field_name, pk))
+
+        moved = merged = 0
+        renamed = {}
+        for name in sorted(references):
+            if is_hashed_name(name):
+                continue
+            if not default_storage.exists(name):
+                self.stderr.write(f"  missing file {name}, left as is")
+                continue
+
+            if options['dry_run']:
+                self.stdout.write(f"  would move {name} ({len(references[name])} rows)")
+                continue
+
+            with default_storage.open(name, 'rb') as source:
+                new_name = default_storage.save(name, source)
+            merged += new_name in renamed.values()
+            renamed[name] = new_name
+            moved += 1
+            self.stdout.write(f"  {name} -> {new_name}")
+
+        if options['dry_run'] or not renamed:
+            self.stdout.write(self.style.SUCCESS(f"{len(references)} files referenced, nothing changed"))
+            return
+
+        with transaction.atomic():
+            for old_name, new_name in renamed.items():
+                for model, field_name, pk in references[old_name]:
+                    _update(model, pk, **{field_name: new_name})
+            self.rewrite_variants(renamed)
+            # Cached items still name the old files, which are about to be deleted
+            catalog_cache.invalidate()
+
+        if not options['keep_originals']:
+            for old_name in renamed:
+                default_storage.delete(old_name)
+
+        self.stdout.write(self.style.SUCCESS(f"Moved {moved} files, {merged} of them were duplicates"))
+
+    def rewrite_variants(self, renamed):
+        """Point stored variants at the new source name so they are not rendered again."""
+        for model, field_name in IMAGE_FIELDS:
+            variants_field = f'{field_name}_variants'
+            rows = model.objects.filter(**{f'{field_name}__in': set(renamed.values())})
+            for pk, variants in rows.values_list('pk', variants_field):
+                source = (variants or {}).get('source')
+                if source in renamed:
+                    variants['source'] = renamed[source]
+                    _update(model, pk, **{variants_field: variants})
+
+
+def _update(model, pk, **changes):
+    if model is Item:
+        # As in store_variants: an item loaded before the rewrite must not save the old name back
+        changes['version'] = F('version') + 1
+    model.objects.filter(pk=pk).update(**changes)
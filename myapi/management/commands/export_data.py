@@ -0,0 +1,45 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from myapi.exports import EXPORTS, FORMATS, ExportError, encode, export_rows
+
+
+def _datetime(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(value)
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+class Command(BaseCommand):
+    help = "Stream purchases or Cashup deposits to a CSV or JSON lines file, in bounded memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', choices=list(EXPORTS))
+        parser.add_argument('--format', dest='export_format', choices=list(FORMATS), default='csv')
+        parser.add_argument('--output', '-o', help="File to write; standard output by default")
+        parser.add_argument('--start', type=_datetime, help="Only rows created at or after this time")
+        parser.add_argument('--end', type=_datetime, help="Only rows created before this time")
+        parser.add_argument('--buyer', type=int, help="Only this buyer's rows")
+
+    def handle(self, *args, **options):
+        try:
+            columns, rows = export_rows(
+                options['name'], start=options['start'], end=options['end'], buyer_id=options['buyer'],
+            )
+            chunks, _ = encode(options['export_format'], columns, rows)
+        except ExportError as exc:
+            raise CommandError(exc)
+
+        output = open(options['output'], 'wb') if options['output'] else sys.stdout.buffer
+        try:
+            for chunk in chunks:
+                output.write(chunk)
+        finally:
+            if options['output']:
+                output.close()
+            else:
+                output.flush()
@@ -0,0 +1,36 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from myapi.importers import import_items, read_rows
+
+
+class Command(BaseCommand):
+    help = "Stream a CSV or JSON Lines catalog file into Item, upserting on sku."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or - for stdin")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="Defaults to the file extension")
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+
+        def progress(result):
+            self.stdout.write(f"  {result.rows} rows, {result.skipped} skipped, {result.rows_per_sec:,.0f} rows/sec")
+
+        try:
+            stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        except OSError as exc:
+            raise CommandError(exc)
+
+        with stream:
+            result = import_items(read_rows(stream, fmt), chunk_size=options['chunk_size'], progress=progress)
+
+        for error in result.errors:
+            self.stderr.write(f"  row {error['row']}: {error['error']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.rows} rows ({result.skipped} skipped) in {result.seconds:.2f}s, "
+            f"{result.rows_per_sec:,.0f} rows/sec"
+        ))
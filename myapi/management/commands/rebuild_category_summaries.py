@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from myapi.cache import catalog_cache
+from myapi.summaries import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-category item counts and price ranges from the item table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('category_ids', nargs='*', type=int, help="Only rebuild these categories")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        with transaction.atomic():
+            fixed = rebuild_summaries(options['category_ids'] or None)
+        if fixed:
+            catalog_cache.bump_version()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt category summaries in {time.perf_counter() - start:.2f}s, {fixed} rows were out of date"
+        ))
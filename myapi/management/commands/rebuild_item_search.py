@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from myapi.cache import catalog_cache
+from myapi.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index over item name and description."
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("Item search uses SQLite FTS5 and is not available on this database.")
+
+        start = time.perf_counter()
+        rebuild_index()
+        catalog_cache.bump_version()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt item search index in {time.perf_counter() - start:.2f}s"))
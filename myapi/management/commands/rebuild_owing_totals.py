@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from myapi.deposits import rebuild_owing_totals
+
+
+class Command(BaseCommand):
+    help = "Recompute each buyer's owing total from their Cashup owing deposits."
+
+    def add_arguments(self, parser):
+        parser.add_argument('buyer_ids', nargs='*', type=int, help="Only rebuild these buyers")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        with transaction.atomic():
+            fixed = rebuild_owing_totals(options['buyer_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt owing totals in {time.perf_counter() - start:.2f}s, {fixed} buyers were out of date"
+        ))
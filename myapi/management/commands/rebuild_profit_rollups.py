@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from myapi.profits import rebuild_profit_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the day, week and month profit rollups from the profit snapshots."
+
+    def add_arguments(self, parser):
+        parser.add_argument('buyer_ids', nargs='*', type=int, help="Only rebuild these buyers")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        written = rebuild_profit_rollups(options['buyer_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {written} profit rollup rows in {time.perf_counter() - start:.2f}s"
+        ))
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from myapi.purchases import rebuild_purchase_totals
+
+
+class Command(BaseCommand):
+    help = "Recompute each buyer's running total of confirmed, paid purchases from the purchase table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('buyer_ids', nargs='*', type=int, help="Only rebuild these buyers")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        with transaction.atomic():
+            fixed = rebuild_purchase_totals(options['buyer_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt purchase totals in {time.perf_counter() - start:.2f}s, {fixed} buyers were out of date"
+        ))
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_date
+
+from myapi.sales import rebuild_sales
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily item and category sales rollups from confirmed purchases."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=parse_date, help="First day to rebuild (YYYY-MM-DD)")
+        parser.add_argument('--end', type=parse_date, help="Day after the last one to rebuild")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        written = rebuild_sales(options['start'], options['end'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {written} daily item sales rows in {time.perf_counter() - start:.2f}s"
+        ))
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from myapi.stock import release_expired
+
+
+class Command(BaseCommand):
+    help = (
+        "Hand the stock held by expired cart reservations back to their items. "
+        "Run it every minute or so, e.g. from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Lines released per transaction")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        released = release_expired(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Released {released} expired reservations in {time.perf_counter() - start:.2f}s"
+        ))
@@ -0,0 +1,39 @@
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+
+from myapi.models import Item
+from myapi.pricing import reprice_items
+
+
+class Command(BaseCommand):
+    help = (
+        "Set the discount rate and/or change the price of every item, or of the items in some "
+        "categories. Large price changes rebuild the price indexes instead of updating them, "
+        "which the API and admin never do on a request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--discount-rate', type=str, help="New discount rate, in percent")
+        parser.add_argument('--price-change-percent', type=str, help="Move prices by this percentage, e.g. -5")
+        parser.add_argument('--category', type=int, action='append', help="Only reprice these category ids")
+
+    def handle(self, *args, **options):
+        try:
+            discount_rate, price_change_percent = (
+                None if options[name] is None else Decimal(options[name])
+                for name in ('discount_rate', 'price_change_percent')
+            )
+        except InvalidOperation as exc:
+            raise CommandError(f"Not a number: {exc}")
+        if discount_rate is None and price_change_percent is None:
+            raise CommandError("Give --discount-rate, --price-change-percent or both.")
+
+        items = Item.objects.all()
+        if options['category']:
+            items = items.filter(category_id__in=options['category'])
+
+        start = time.perf_counter()
+        updated = reprice_items(items, discount_rate, price_change_percent, rebuild_indexes=True)
+        self.stdout.write(self.style.SUCCESS(f"Repriced {updated} items in {time.perf_counter() - start:.2f}s"))
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from myapi.ledger import drift, take_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Snapshot each buyer's main balance from the ledger, so balance-at-time queries only "
+        "sum the entries since. Run periodically, e.g. nightly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help="Also report buyers whose balance disagrees with their ledger")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        with transaction.atomic():
+            written = take_snapshots()
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {written} balance snapshots in {time.perf_counter() - start:.2f}s"
+        ))
+
+        if options['check']:
+            mismatched = drift()
+            for buyer_id, (balance, total) in sorted(mismatched.items()):
+                self.stdout.write(self.style.WARNING(f"  buyer {buyer_id}: balance {balance}, ledger {total}"))
+            self.stdout.write(f"{len(mismatched)} buyers disagree with their ledger")
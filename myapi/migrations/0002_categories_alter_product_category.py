@@ -1,25 +0,0 @@
-# Generated by Django 5.1.3 on 2025-02-24 08:45
-
-from django.db import migrations, models
-
-
-class Migration(migrations.Migration):
-
-    dependencies = [
-        ('myapi', '0001_initial'),
-    ]
-
-    operations = [
-        migrations.CreateModel(
-            name='Categories',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('name', models.CharField(max_length=200)),
-            ],
-        ),
-        migrations.AlterField(
-            model_name='product',
-            name='category',
-            field=models.CharField(default='Others', max_length=255),
-        ),
-    ]
@@ -1,33 +0,0 @@
-# Generated by Django 5.1.3 on 2025-02-24 09:03
-
-import django.db.models.deletion
-from django.db import migrations, models
-
-
-class Migration(migrations.Migration):
-
-    dependencies = [
-        ('myapi', '0003_rename_category_product_categories'),
-    ]
-
-    operations = [
-        migrations.CreateModel(
-            name='Category',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('name', models.CharField(max_length=255)),
-            ],
-        ),
-        migrations.DeleteModel(
-            name='Categories',
-        ),
-        migrations.RemoveField(
-            model_name='product',
-            name='Categories',
-        ),
-        migrations.AddField(
-            model_name='product',
-            name='category',
-            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='products', to='myapi.category'),
-        ),
-    ]
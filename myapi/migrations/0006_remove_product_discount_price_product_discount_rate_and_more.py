@@ -1,27 +0,0 @@
-# Generated by Django 5.1.3 on 2025-02-24 18:29
-
-from django.db import migrations, models
-
-
-class Migration(migrations.Migration):
-
-    dependencies = [
-        ('myapi', '0005_product_confirmed'),
-    ]
-
-    operations = [
-        migrations.RemoveField(
-            model_name='product',
-            name='discount_price',
-        ),
-        migrations.AddField(
-            model_name='product',
-            name='discount_rate',
-            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=5),
-        ),
-        migrations.AddField(
-            model_name='product',
-            name='quantity',
-            field=models.IntegerField(default=0),
-        ),
-    ]
@@ -1,41 +0,0 @@
-# Generated by Django 5.1.3 on 2025-02-25 04:45
-
-import django.db.models.deletion
-from django.db import migrations, models
-
-
-class Migration(migrations.Migration):
-
-    dependencies = [
-        ('myapi', '0008_buyer_membership_status'),
-    ]
-
-    operations = [
-        migrations.CreateModel(
-            name='Item',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('name', models.CharField(help_text='Name of the product', max_length=255)),
-                ('description', models.TextField(blank=True, help_text='Description of the product')),
-                ('price', models.DecimalField(decimal_places=2, help_text='Price of the product', max_digits=10)),
-                ('is_available', models.BooleanField(default=True, help_text='Availability status of the product')),
-            ],
-        ),
-        migrations.CreateModel(
-            name='Purchase',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('original_price', models.DecimalField(decimal_places=2, max_digits=10)),
-                ('discount_rate', models.DecimalField(decimal_places=2, default=0.0, max_digits=5)),
-                ('members_price', models.DecimalField(decimal_places=2, max_digits=10, null=True)),
-                ('confirmed', models.BooleanField(default=False)),
-                ('quantity', models.IntegerField(default=0)),
-                ('buyer', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='purchase', to='myapi.buyer')),
-                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='purchase', to='myapi.category')),
-                ('item', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='purchase', to='myapi.item')),
-            ],
-        ),
-        migrations.DeleteModel(
-            name='Product',
-        ),
-    ]
@@ -1,35 +0,0 @@
-# Generated by Django 5.1.3 on 2025-02-25 18:59
-
-import django.db.models.deletion
-from django.conf import settings
-from django.db import migrations, models
-
-
-class Migration(migrations.Migration):
-
-    dependencies = [
-        ('myapi', '0012_alter_buyer_id'),
-        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
-    ]
-
-    operations = [
-        migrations.RemoveField(
-            model_name='buyer',
-            name='email',
-        ),
-        migrations.AddField(
-            model_name='buyer',
-            name='user',
-            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='buyer', to=settings.AUTH_USER_MODEL),
-        ),
-        migrations.AlterField(
-            model_name='buyer',
-            name='id',
-            field=models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID'),
-        ),
-        migrations.AlterField(
-            model_name='buyer',
-            name='phone_number',
-            field=models.CharField(max_length=20, unique=True),
-        ),
-    ]
@@ -1,18 +0,0 @@
-# Generated by Django 5.1.3 on 2025-02-26 11:06
-
-from django.db import migrations, models
-
-
-class Migration(migrations.Migration):
-
-    dependencies = [
-        ('myapi', '0019_purchase_discount_rate'),
-    ]
-
-    operations = [
-        migrations.AlterField(
-            model_name='purchase',
-            name='total_price',
-            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=10),
-        ),
-    ]
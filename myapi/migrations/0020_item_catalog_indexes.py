@@ -0,0 +1,34 @@
+# Generated by Django 5.1.6 on 2026-10-18 15:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapi', '0019_buyertransaction_method'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='buyertransaction',
+            name='method',
+            field=models.CharField(choices=[('Bkash', 'BKash'), ('Nagad', 'Nagad')], default='Bkash', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['category', 'is_available', 'id'], name='item_cat_avail_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['is_available', 'id'], name='item_avail_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['category', 'price'], name='item_cat_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['price'], name='item_price_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+from django.db import migrations
+
+
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS myapi_item_fts USING fts5(
+        name, description,
+        content='myapi_item', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS myapi_item_fts_ai AFTER INSERT ON myapi_item BEGIN
+        INSERT INTO myapi_item_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS myapi_item_fts_ad AFTER DELETE ON myapi_item BEGIN
+        INSERT INTO myapi_item_fts(myapi_item_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS myapi_item_fts_au AFTER UPDATE OF name, description ON myapi_item BEGIN
+        INSERT INTO myapi_item_fts(myapi_item_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO myapi_item_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    "INSERT INTO myapi_item_fts(myapi_item_fts) VALUES ('rebuild')",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS myapi_item_fts_au",
+    "DROP TRIGGER IF EXISTS myapi_item_fts_ad",
+    "DROP TRIGGER IF EXISTS myapi_item_fts_ai",
+    "DROP TABLE IF EXISTS myapi_item_fts",
+]
+
+
+def run(statements):
+    def forwards(apps, schema_editor):
+        # FTS5 is SQLite only; other backends skip the search index
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return forwards
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapi', '0020_item_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(CREATE_SQL), run(DROP_SQL)),
+    ]
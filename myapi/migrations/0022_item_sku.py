@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 15:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapi', '0021_item_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='sku',
+            field=models.CharField(blank=True, help_text='Stock keeping unit used by catalog imports', max_length=64, null=True, unique=True),
+        ),
+    ]
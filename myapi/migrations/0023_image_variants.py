@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-18 15:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapi', '0022_item_sku'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='buyer',
+            name='buyer_image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='item_image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.6 on 2026-10-18 15:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Q
+
+
+def populate_summaries(apps, schema_editor):
+    Category = apps.get_model('myapi', 'Category')
+    CategorySummary = apps.get_model('myapi', 'CategorySummary')
+    Item = apps.get_model('myapi', 'Item')
+
+    totals = {
+        row.pop('category_id'): row
+        for row in Item.objects.filter(category__isnull=False)
+        .values('category_id')
+        .annotate(
+            item_count=Count('id'),
+            available_count=Count('id', filter=Q(is_available=True)),
+            min_price=Min('price'),
+            max_price=Max('price'),
+        )
+        .order_by()
+    }
+    CategorySummary.objects.bulk_create(
+        CategorySummary(category_id=pk, **totals.get(pk, {}))
+        for pk in Category.objects.values_list('pk', flat=True)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapi', '0023_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategorySummary',
+            fields=[
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='myapi.category')),
+                ('item_count', models.PositiveIntegerField(default=0)),
+                ('available_count', models.PositiveIntegerField(default=0)),
+                ('min_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('max_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+            ],
+        ),
+        migrations.RunPython(populate_summaries, migrations.RunPython.noop),
+    ]
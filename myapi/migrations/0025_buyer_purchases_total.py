@@ -0,0 +1,32 @@
+# Generated by Django 5.1.6 on 2026-10-18 15:44
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_totals(apps, schema_editor):
+    Buyer = apps.get_model('myapi', 'Buyer')
+    Purchase = apps.get_model('myapi', 'Purchase')
+
+    # A line's discount_total_price is what it was charged, quantity included
+    totals = Purchase.objects.filter(confirmed=True, paid=True).values('buyer_id').annotate(
+        total=Sum('discount_total_price'),
+    ).order_by().values_list('buyer_id', 'total')
+    for buyer_id, total in totals:
+        Buyer.objects.filter(pk=buyer_id).update(purchases_total=total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapi', '0024_category_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='buyer',
+            name='purchases_total',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.6 on 2026-10-18 15:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapi', '0025_buyer_purchases_total'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchase',
+            name='idempotency_key',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='purchase',
+            constraint=models.UniqueConstraint(fields=('buyer', 'idempotency_key'), name='purchase_buyer_idempotency_key'),
+        ),
+    ]
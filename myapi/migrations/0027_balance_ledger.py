@@ -0,0 +1,57 @@
+# Generated by Django 5.1.6 on 2026-10-18 15:51
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def open_ledgers(apps, schema_editor):
+    # Existing balances predate the ledger; an opening entry makes each ledger add up to it
+    Buyer = apps.get_model('myapi', 'Buyer')
+    BalanceEntry = apps.get_model('myapi', 'BalanceEntry')
+
+    now = django.utils.timezone.now()
+    BalanceEntry.objects.bulk_create(
+        (
+            BalanceEntry(buyer_id=buyer_id, amount=balance, kind='opening', created_at=now)
+            for buyer_id, balance in Buyer.objects.exclude(main_balance=0).values_list('pk', 'main_balance').iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapi', '0026_purchase_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BalanceEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('kind', models.CharField(choices=[('opening', 'Opening balance'), ('deposit', 'Deposit'), ('purchase', 'Purchase'), ('cashup_deposit', 'Transfer to Cashup deposit'), ('adjustment', 'Adjustment')], max_length=20)),
+                ('reference', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('buyer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balance_entries', to='myapi.buyer')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['buyer', 'created_at'], name='balance_entry_buyer_time_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='BalanceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('as_of', models.DateTimeField()),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('buyer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balance_snapshots', to='myapi.buyer')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('buyer', 'as_of'), name='balance_snapshot_buyer_as_of')],
+            },
+        ),
+        migrations.RunPython(open_ledgers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.6 on 2026-10-18 15:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapi', '0027_balance_ledger'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='purchase',
+            index=models.Index(condition=models.Q(('confirmed', True)), fields=['id'], name='purchase_confirmed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchase',
+            index=models.Index(condition=models.Q(('confirmed', False)), fields=['id'], name='purchase_carted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchase',
+            index=models.Index(condition=models.Q(('confirmed', True), ('paid', True)), fields=['buyer', 'id'], name='purchase_buyer_paid_idx'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.1.6 on 2026-10-18 15:57
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapi', '0028_purchase_state_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyCategorySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('quantity', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyItemSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('quantity', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='purchase',
+            name='confirmed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        # Added without the default first, so purchases made before now stay undated
+        migrations.AddField(
+            model_name='purchase',
+            name='created_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='purchase',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='purchase',
+            index=models.Index(fields=['created_at'], name='purchase_created_at_idx'),
+        ),
+        migrations.AddField(
+            model_name='dailycategorysales',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='myapi.category'),
+        ),
+        migrations.AddField(
+            model_name='dailyitemsales',
+            name='item',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='myapi.item'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailycategorysales',
+            constraint=models.UniqueConstraint(fields=('day', 'category'), name='daily_category_sales_day_category'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyitemsales',
+            constraint=models.UniqueConstraint(fields=('day', 'item'), name='daily_item_sales_day_item'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.6 on 2026-10-18 16:00
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_owing_totals(apps, schema_editor):
+    Buyer = apps.get_model('myapi', 'Buyer')
+    CashupOwingDeposit = apps.get_model('myapi', 'CashupOwingDeposit')
+
+    totals = CashupOwingDeposit.objects.filter(buyer__isnull=False).values('buyer_id').annotate(
+        total=Sum('cashup_owing_main_balance'),
+    ).order_by().values_list('buyer_id', 'total')
+    for buyer_id, total in totals:
+        Buyer.objects.filter(pk=buyer_id).update(owing_total=total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapi', '0029_purchase_timestamps_sales_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='buyer',
+            name='owing_total',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.RunPython(backfill_owing_totals, migrations.RunPython.noop),
+    ]
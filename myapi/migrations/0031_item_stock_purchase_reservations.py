@@ -0,0 +1,42 @@
+# Generated by Django 5.1.6 on 2026-10-18 16:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapi', '0030_buyer_owing_total'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='stock',
+            field=models.PositiveIntegerField(blank=True, help_text='Units left to sell; empty if stock is not tracked', null=True),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='purchase',
+            name='reserved_quantity',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='purchase',
+            name='reserved_until',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='item',
+            name='is_available',
+            field=models.BooleanField(default=True, help_text='Availability status of the product; follows the stock when it is tracked'),
+        ),
+        migrations.AddIndex(
+            model_name='purchase',
+            index=models.Index(condition=models.Q(('confirmed', False)), fields=['reserved_until'], name='purchase_reserved_until_idx'),
+        ),
+    ]
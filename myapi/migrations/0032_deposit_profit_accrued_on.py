@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-18 16:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapi', '0031_item_stock_purchase_reservations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cashupdeposit',
+            name='profit_accrued_on',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='cashupowingdeposit',
+            name='profit_accrued_on',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+    ]
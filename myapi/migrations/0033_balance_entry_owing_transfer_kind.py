@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 16:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapi', '0032_deposit_profit_accrued_on'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='balanceentry',
+            name='kind',
+            field=models.CharField(choices=[('opening', 'Opening balance'), ('deposit', 'Deposit'), ('purchase', 'Purchase'), ('cashup_deposit', 'Transfer to Cashup deposit'), ('cashup_owing_deposit', 'Transfer to Cashup owing deposit'), ('adjustment', 'Adjustment')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.6 on 2026-10-18 16:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapi', '0033_balance_entry_owing_transfer_kind'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfitRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('day', 'Day'), ('week', 'Week'), ('month', 'Month')], max_length=5)),
+                ('start', models.DateField()),
+                ('profit', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('compounding_profit', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('buyer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='profit_rollups', to='myapi.buyer')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('buyer', 'period', 'start'), name='profit_rollup_buyer_period_start')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProfitSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('cashup', 'Cashup deposit'), ('cashup-owing', 'Cashup owing deposit')], max_length=20)),
+                ('deposit_id', models.PositiveIntegerField()),
+                ('day', models.DateField()),
+                ('days', models.PositiveIntegerField(default=1)),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('profit', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('compounding_profit', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('total_compounding_profit', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('buyer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='profit_snapshots', to='myapi.buyer')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['buyer', 'day'], name='profit_snapshot_buyer_day')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'deposit_id', 'day'), name='profit_snapshot_deposit_day')],
+            },
+        ),
+    ]
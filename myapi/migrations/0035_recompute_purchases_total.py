@@ -0,0 +1,33 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:05
+
+from django.db import migrations
+from django.db.models import Sum
+
+
+def recompute_totals(apps, schema_editor):
+    """
+    Earlier backfills multiplied each line's price by its quantity a second time; recount
+    every buyer's total from what their confirmed, paid lines were charged.
+    """
+    Buyer = apps.get_model('myapi', 'Buyer')
+    Purchase = apps.get_model('myapi', 'Purchase')
+
+    totals = dict(
+        Purchase.objects.filter(confirmed=True, paid=True).values('buyer_id').annotate(
+            total=Sum('discount_total_price'),
+        ).order_by().values_list('buyer_id', 'total')
+    )
+    Buyer.objects.exclude(pk__in=totals).exclude(purchases_total=0).update(purchases_total=0)
+    for buyer_id, total in totals.items():
+        Buyer.objects.filter(pk=buyer_id).update(purchases_total=total or 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapi', '0034_profit_snapshots_rollups'),
+    ]
+
+    operations = [
+        migrations.RunPython(recompute_totals, migrations.RunPython.noop),
+    ]
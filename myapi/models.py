@@ -1,12 +1,72 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, pre_delete
 from django.dispatch import receiver
-from decimal import Decimal
+from decimal import ROUND_HALF_UP, Decimal
 from django.db import models
 from django.utils import timezone
 from datetime import timedelta
-
+from .cache import catalog_cache
+from .images import schedule_variants
+from .summaries import SummaryValues, apply_item_change
+from .purchases import CENT, PurchaseValues, apply_purchase_change
+from .ledger import KIND_CHOICES, OPENING
+from .sales import SaleValues, apply_sale_change
+from .deposits import OwingValues, apply_owing_change
+from .stock import claim_version, release
+from .accrual import KIND_CHOICES as DEPOSIT_KIND_CHOICES
+from .profits import PERIOD_CHOICES
+
+
+def _pick(values_class, values):
+    """Build `values_class` from a dict of column values, or None."""
+    return values and values_class(*(values[field] for field in values_class._fields))
+
+
+class TrackedFieldsMixin:
+    """
+    Remember the column values a row was loaded (or last saved) with, so `save()` can tell
+    what changed without another query.
+    """
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def remember_saved_values(self):
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+        }
+
+    def loaded_values(self, *attnames):
+        """
+        The loaded values of `attnames`, read back from the database when this instance
+        was not loaded from a row or the fields were deferred. None for unsaved rows.
+        """
+        if self._state.adding or self.pk is None:
+            return None
+        loaded = getattr(self, '_loaded_values', {})
+        if all(attname in loaded for attname in attnames):
+            return tuple(loaded[attname] for attname in attnames)
+        return type(self)._base_manager.filter(pk=self.pk).values_list(*attnames).first()
+
+    def changed_fields(self, exclude=()):
+        """
+        Names of the concrete fields whose value differs from the loaded one; every field when
+        this instance was not loaded from a row. Deferred fields that were never set are unchanged.
+        """
+        fields = [field for field in self._meta.concrete_fields if not field.primary_key and field.name not in exclude]
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return [field.name for field in fields]
+        return [
+            field.name for field in fields
+            if field.attname in self.__dict__
+            and (field.attname not in loaded or self.__dict__[field.attname] != loaded[field.attname])
+        ]
 
 
 class Category(models.Model):
@@ -16,41 +76,86 @@ class Category(models.Model):
         return self.name
 
 
+class CategorySummary(models.Model):
+    """
+    Denormalized listing data for a category, kept current by Item writes
+    (see myapi.summaries) and rebuilt by `rebuild_category_summaries`.
+    """
+    category = models.OneToOneField(Category, on_delete=models.CASCADE, primary_key=True, related_name='summary')
+    item_count = models.PositiveIntegerField(default=0)
+    available_count = models.PositiveIntegerField(default=0)
+    min_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    max_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+
+    def __str__(self):
+        return f"Summary of {self.category_id}"
+
+
 from django.db import models
 
 from django.db import models
 
-class Item(models.Model):
+class Item(TrackedFieldsMixin, models.Model):
     name = models.CharField(max_length=255, help_text="Name of the product")
     description = models.TextField(blank=True, help_text="Description of the product")
-    is_available = models.BooleanField(default=True, help_text="Availability status of the product")
+    is_available = models.BooleanField(default=True, help_text="Availability status of the product; follows the stock when it is tracked")
     price = models.DecimalField(max_digits=10, decimal_places=2, default=0.0)  # Price of the product
     category = models.ForeignKey('Category', on_delete=models.SET_NULL, null=True, blank=True, related_name='items')
     discount_rate = models.DecimalField(max_digits=10, decimal_places=2, default=0.0, null=True, blank=True)
     discount_price = models.DecimalField(max_digits=10, decimal_places=2, default=0.0, null=True, blank=True, editable=False)
     members_price = models.DecimalField(max_digits=10, decimal_places=2, default=0.0)
     item_image = models.ImageField(upload_to='item_images/', blank=True, null=True, help_text="Image of the product")
+    sku = models.CharField(max_length=64, unique=True, null=True, blank=True, help_text="Stock keeping unit used by catalog imports")
+    item_image_variants = models.JSONField(default=dict, blank=True, editable=False)  # Filled in by myapi.images
+    # Reserved and sold through conditional updates in myapi.stock
+    stock = models.PositiveIntegerField(null=True, blank=True, help_text="Units left to sell; empty if stock is not tracked")
+    # Bumped by every stock change and save, so a save of a stale copy is refused
+    version = models.PositiveIntegerField(default=0, editable=False)
+
+    @staticmethod
+    def discount_price_for(price, discount_rate):
+        # If discount_rate is 0 or None, discount_price equals price
+        if discount_rate is not None and discount_rate > 0:
+            # Half a cent rounds away from zero, as SQL ROUND() does for bulk reprices
+            return (price - (price * discount_rate / 100)).quantize(CENT, rounding=ROUND_HALF_UP)
+        return price
+
+    def summary_values(self):
+        return SummaryValues(self.category_id, self.is_available, self.price)
 
     def save(self, *args, **kwargs):
         # Calculate discount_price based on price and discount_rate
         if self.price is not None:
-            if self.discount_rate is not None and self.discount_rate > 0:
-                self.discount_price = self.price - (self.price * self.discount_rate / 100)
-            else:
-                # If discount_rate is 0 or None, discount_price equals price
-                self.discount_price = self.price
-        
-
-        super().save(*args, **kwargs)
+            self.discount_price = self.discount_price_for(self.price, self.discount_rate)
+        if self.stock is not None:
+            self.is_available = self.stock > 0
+
+        with transaction.atomic():
+            previous = self.loaded_values('category_id', 'is_available', 'price')
+            if not self._state.adding and 'version' in getattr(self, '_loaded_values', {}):
+                claim_version(self)
+            super().save(*args, **kwargs)
+            # Keep the category listing counts and price bounds in step with this row
+            apply_item_change(previous and SummaryValues(*previous), self.summary_values())
+        self.remember_saved_values()
+        catalog_cache.invalidate()
+
+    class Meta:
+        indexes = [
+            # Back the catalog filters; `id` last so cursor pages are index range scans
+            models.Index(fields=['category', 'is_available', 'id'], name='item_cat_avail_id_idx'),
+            models.Index(fields=['is_available', 'id'], name='item_avail_id_idx'),
+            models.Index(fields=['category', 'price'], name='item_cat_price_idx'),
+            models.Index(fields=['price'], name='item_price_idx'),
+        ]
 
     def __str__(self):
         return self.name
 from decimal import Decimal
 from django.db import models
-from django.db.models import Sum
 
 
-class Buyer(models.Model):
+class Buyer(TrackedFieldsMixin, models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='buyer')
     name = models.CharField(max_length=255)
     phone_number = models.CharField(max_length=20, unique=True)
@@ -66,22 +171,27 @@ class Buyer(models.Model):
     gender = models.CharField(max_length=1, choices=GENDER_CHOICES, null=True, blank=True)
     address = models.CharField(max_length=255, blank=True, null=True)
     buyer_image = models.ImageField(upload_to='item_images/', blank=True, null=True, help_text="Image of the buyer")
+    buyer_image_variants = models.JSONField(default=dict, blank=True, editable=False)  # Filled in by myapi.images
+    # Running total of confirmed, paid purchase lines, see myapi.purchases
+    purchases_total = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
+    # Sum of the buyer's Cashup owing deposits, see myapi.deposits
+    owing_total = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
+
+    # Only ever moved with F() updates, so a save never writes back a stale copy. The main
+    # balance moves through myapi.ledger, which records every change
+    COUNTER_FIELDS = ('purchases_total', 'main_balance', 'owing_total')
 
     def save(self, *args, **kwargs):
-        # Save the instance to ensure it has a valid primary key
         if not self.pk:
             super(Buyer, self).save(*args, **kwargs)
-        
-        # Calculate the total cashup_owing_main_balance for this buyer
-        total_owing = CashupOwingDeposit.objects.filter(buyer=self).aggregate(
-            total_owing=Sum('cashup_owing_main_balance')
-        )['total_owing']
-
-        # If no owing balance exists, set it to 0
-        if total_owing is None:
-            total_owing = Decimal('0.0')
-        self.main_balance = Decimal(self.main_balance) - total_owing
-        super(Buyer, self).save(*args, **kwargs)
+            if self.main_balance:
+                BalanceEntry.objects.create(buyer=self, amount=self.main_balance, kind=OPENING)
+        else:
+            if kwargs.get('update_fields') is None:
+                # One UPDATE of the columns that changed since the row was loaded, none if nothing did
+                kwargs['update_fields'] = self.changed_fields(exclude=self.COUNTER_FIELDS)
+            super(Buyer, self).save(*args, **kwargs)
+        self.remember_saved_values()
 
     def __str__(self):
         return self.name
@@ -101,7 +211,7 @@ class BuyerOTP(models.Model):
         """Check if the OTP has expired (e.g., after 5 minutes)."""
         return timezone.now() > self.created_at + timedelta(minutes=5)
 
-class Purchase(models.Model):
+class Purchase(TrackedFieldsMixin, models.Model):
     item = models.ForeignKey(Item, on_delete=models.CASCADE, null=True)
     quantity = models.PositiveIntegerField()
     total_price = models.DecimalField(max_digits=10, decimal_places=2, default=0.0)
@@ -111,37 +221,76 @@ class Purchase(models.Model):
     confirmed = models.BooleanField(default=False)
     paid=models.BooleanField(default=False)
     membership_price = models.DecimalField(max_digits=10, decimal_places=2, default=0.0, null=True, blank=True)
+    # Client supplied key that makes retried purchase requests charge only once
+    idempotency_key = models.CharField(max_length=64, null=True, blank=True, editable=False)
+    # Null for purchases made before these were recorded
+    created_at = models.DateTimeField(default=timezone.now, null=True, editable=False)
+    confirmed_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Units of a stock-tracked item this line holds: reserved while carted, sold once confirmed
+    reserved_quantity = models.PositiveIntegerField(default=0, editable=False)
+    # When a carted line's reservation lapses, see myapi.stock
+    reserved_until = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['buyer', 'idempotency_key'], name='purchase_buyer_idempotency_key'),
+        ]
+        # Partial rather than (confirmed, ...) indexes: on SQLite Django filters booleans as a
+        # bare `WHERE "confirmed"`, which can use an index with that condition but cannot use
+        # one keyed on the column
+        indexes = [
+            # Confirmed and carted lists, read in id order
+            models.Index(fields=['id'], condition=models.Q(confirmed=True), name='purchase_confirmed_idx'),
+            models.Index(fields=['id'], condition=models.Q(confirmed=False), name='purchase_carted_idx'),
+            # A buyer's confirmed, paid lines: purchase history and running totals
+            models.Index(fields=['buyer', 'id'], condition=models.Q(confirmed=True, paid=True), name='purchase_buyer_paid_idx'),
+            # Date filtered exports
+            models.Index(fields=['created_at'], name='purchase_created_at_idx'),
+            # Expired cart reservations, for the sweeper
+            models.Index(fields=['reserved_until'], condition=models.Q(confirmed=False), name='purchase_reserved_until_idx'),
+        ]
 
     def __str__(self):
         return f"Purchase {self.id} by {self.buyer}"
-    
 
+    @staticmethod
+    def prices_for(item_price, quantity, discount_rate):
+        """`(total_price, discount_total_price)` of a line, rounded half up to cents like `Item.discount_price`."""
+        total_price = item_price * quantity
+        if discount_rate and discount_rate > 0:
+            discount_total_price = (item_price - (item_price * (discount_rate / 100))) * quantity
+        else:
+            discount_total_price = total_price
+        return (
+            total_price.quantize(CENT, rounding=ROUND_HALF_UP),
+            discount_total_price.quantize(CENT, rounding=ROUND_HALF_UP),
+        )
+
+    # Columns whose previous values save() needs for the running totals and sales rollups
+    TRACKED_FIELDS = tuple(dict.fromkeys(PurchaseValues._fields + SaleValues._fields))
 
     def save(self, *args, **kwargs):
+        # Balances are only ever debited by myapi.purchases, never as a side effect of saving
         if self.item:
-            item_price = self.item.price
-            self.total_price = item_price * self.quantity
-
-        if self.item:
-            item_price = self.item.price
-            self.total_price = item_price * self.quantity
-
-        if self.discount_rate > 0:
-            self.discount_price = item_price - (item_price * (self.discount_rate / 100))
-            self.discount_total_price = self.discount_price * self.quantity
-        else:
-            self.discount_price = item_price
-            self.discount_total_price = self.total_price
-
-        if self.confirmed and self.paid:
-            buyer = self.buyer
-        if self.discount_total_price <= buyer.main_balance:
-            buyer.main_balance -= self.discount_total_price  # Deduct the purchase amount from the main_balance
-            buyer.save()
-        else:
-            raise ValueError("Insufficient balance to complete the purchase.")
-
-        super().save(*args, **kwargs)
+            self.total_price, self.discount_total_price = self.prices_for(
+                self.item.price, self.quantity, self.discount_rate,
+            )
+        self.confirmed_at = (self.confirmed_at or timezone.now()) if self.confirmed else None
+
+        with transaction.atomic():
+            previous = self.loaded_values(*self.TRACKED_FIELDS)
+            super().save(*args, **kwargs)
+            previous = dict(zip(self.TRACKED_FIELDS, previous)) if previous else None
+            # Keep the buyer's running purchase total and the daily sales in step with this line
+            apply_purchase_change(_pick(PurchaseValues, previous), self.purchase_values())
+            apply_sale_change(_pick(SaleValues, previous), self.sale_values())
+        self.remember_saved_values()
+
+    def purchase_values(self):
+        return PurchaseValues(*(getattr(self, attname) for attname in PurchaseValues._fields))
+
+    def sale_values(self):
+        return SaleValues(*(getattr(self, attname) for attname in SaleValues._fields))
         
     
 
@@ -152,7 +301,7 @@ class Purchase(models.Model):
 
 
 
-class CashupOwingDeposit(models.Model):
+class CashupOwingDeposit(TrackedFieldsMixin, models.Model):
     cashup_owing_main_balance = models.DecimalField(max_digits=10, decimal_places=2)  # Owing deposit balance
     buyer = models.ForeignKey(Buyer, on_delete=models.SET_NULL, null=True, related_name='cashup_owing_deposits')
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)  # Timestamp of the deposit
@@ -164,6 +313,20 @@ class CashupOwingDeposit(models.Model):
     compounding_withdraw = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     daily_compounding_profit = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     monthly_compounding_profit=models.DecimalField(max_digits=10,decimal_places=2,default=0)
+    # Last day profit was accrued for, see myapi.accrual
+    profit_accrued_on = models.DateField(null=True, blank=True, editable=False)
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            previous = self.loaded_values(*OwingValues._fields)
+            super().save(*args, **kwargs)
+            # Keep the buyer's owing total in step with this deposit
+            apply_owing_change(previous and OwingValues(*previous), self.owing_values())
+        self.remember_saved_values()
+
+    def owing_values(self):
+        return OwingValues(self.buyer_id, self.cashup_owing_main_balance)
+
     def __str__(self):
         return f"Owing Deposit: {self.cashup_owing_main_balance} by {self.buyer.name if self.buyer else 'Unknown Buyer'}"
 
@@ -183,12 +346,125 @@ class CashupDeposit(models.Model):
     compounding_withdraw = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     daily_compounding_profit = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     monthly_compounding_profit=models.DecimalField(max_digits=10,decimal_places=2,default=0)
+    # Last day profit was accrued for, see myapi.accrual
+    profit_accrued_on = models.DateField(null=True, blank=True, editable=False)
 
     def __str__(self):
         return f"Deposit: {self.cashup_main_balance} by {self.buyer.name if self.buyer else 'Unknown Buyer'}"
 
 
+class DailyItemSales(models.Model):
+    """Confirmed sales of an item on one day, kept up to date by myapi.sales."""
+    day = models.DateField()
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='daily_sales')
+    quantity = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'item'], name='daily_item_sales_day_item'),
+        ]
+
+    def __str__(self):
+        return f"{self.item_id} on {self.day}: {self.quantity} sold"
+
+
+class DailyCategorySales(models.Model):
+    """Confirmed sales of a category's items on one day, kept up to date by myapi.sales."""
+    day = models.DateField()
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='daily_sales')
+    quantity = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'category'], name='daily_category_sales_day_category'),
+        ]
 
+    def __str__(self):
+        return f"{self.category_id} on {self.day}: {self.quantity} sold"
+
+
+class BalanceEntry(models.Model):
+    """
+    One movement of a buyer's main balance, written by myapi.ledger. Entries are never
+    changed once written; corrections are new entries.
+    """
+    buyer = models.ForeignKey(Buyer, on_delete=models.CASCADE, related_name='balance_entries')
+    amount = models.DecimalField(max_digits=12, decimal_places=2)  # Negative when money leaves the balance
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    reference = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Statements and balance-at-time sums are range scans on this
+            models.Index(fields=['buyer', 'created_at'], name='balance_entry_buyer_time_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise ValueError("Balance entries are append-only.")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.amount} for buyer {self.buyer_id}"
+
+
+class BalanceSnapshot(models.Model):
+    """A buyer's main balance as of a point in time, so balances at a time only sum the entries after it."""
+    buyer = models.ForeignKey(Buyer, on_delete=models.CASCADE, related_name='balance_snapshots')
+    as_of = models.DateTimeField()
+    balance = models.DecimalField(max_digits=12, decimal_places=2)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['buyer', 'as_of'], name='balance_snapshot_buyer_as_of'),
+        ]
+
+    def __str__(self):
+        return f"Balance of buyer {self.buyer_id} at {self.as_of}: {self.balance}"
+
+
+class ProfitSnapshot(models.Model):
+    """What one deposit earned on one day, written by myapi.accrual."""
+    buyer = models.ForeignKey(Buyer, on_delete=models.CASCADE, related_name='profit_snapshots')
+    kind = models.CharField(max_length=20, choices=DEPOSIT_KIND_CHOICES)
+    deposit_id = models.PositiveIntegerField()  # CashupDeposit or CashupOwingDeposit, by `kind`
+    day = models.DateField()  # Day earned for
+    days = models.PositiveIntegerField(default=1)  # Days the run that wrote this accrued, more than 1 when catching up
+    balance = models.DecimalField(max_digits=12, decimal_places=2)
+    profit = models.DecimalField(max_digits=12, decimal_places=2)
+    compounding_profit = models.DecimalField(max_digits=12, decimal_places=2)
+    total_compounding_profit = models.DecimalField(max_digits=12, decimal_places=2)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'deposit_id', 'day'], name='profit_snapshot_deposit_day'),
+        ]
+        indexes = [
+            models.Index(fields=['buyer', 'day'], name='profit_snapshot_buyer_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} deposit {self.deposit_id} on {self.day}: {self.profit} + {self.compounding_profit}"
+
+
+class ProfitRollup(models.Model):
+    """A buyer's profit over a day, week or month, kept up to date by myapi.profits."""
+    buyer = models.ForeignKey(Buyer, on_delete=models.CASCADE, related_name='profit_rollups')
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    start = models.DateField()
+    profit = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    compounding_profit = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['buyer', 'period', 'start'], name='profit_rollup_buyer_period_start'),
+        ]
+
+    def __str__(self):
+        return f"Profit of buyer {self.buyer_id} for the {self.period} from {self.start}"
 
 
 @receiver(post_save, sender=User)
@@ -203,6 +479,63 @@ def create_buyer(sender, instance, created, **kwargs):
             address='',  # Set a default or leave blank
             membership_status=False
         )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Item)
+def invalidate_catalog_cache(sender, **kwargs):
+    catalog_cache.invalidate()
+
+
+@receiver(post_save, sender=Category)
+def create_category_summary(sender, instance, created, **kwargs):
+    if created:
+        CategorySummary.objects.get_or_create(category=instance)
+
+
+@receiver(post_delete, sender=Purchase)
+def remove_purchase_from_totals(sender, instance, **kwargs):
+    previous = {field: getattr(instance, field) for field in Purchase.TRACKED_FIELDS}
+    previous.update(getattr(instance, '_loaded_values', {}))
+    apply_purchase_change(_pick(PurchaseValues, previous), None)
+    apply_sale_change(_pick(SaleValues, previous), None)
+
+
+@receiver(pre_delete, sender=Purchase)
+def release_purchase_reservation(sender, instance, **kwargs):
+    # release() re-reads the line under a lock, the sweeper may have got to it first
+    if not instance.confirmed and instance.reserved_quantity:
+        release(Purchase.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=CashupOwingDeposit)
+def remove_deposit_from_owing_total(sender, instance, **kwargs):
+    previous = instance.owing_values()._replace(
+        **{field: value for field, value in getattr(instance, '_loaded_values', {}).items() if field in OwingValues._fields}
+    )
+    apply_owing_change(previous, None)
+
+
+@receiver(post_delete, sender=Item)
+def remove_item_from_summary(sender, instance, **kwargs):
+    # Prefer the values the row was loaded with; unsaved edits never reached the summary
+    loaded = getattr(instance, '_loaded_values', {})
+    previous = instance.summary_values()._replace(
+        **{field: loaded[field] for field in SummaryValues._fields if field in loaded}
+    )
+    apply_item_change(previous, None)
+
+
+@receiver(post_save, sender=Item)
+def build_item_image_variants(sender, instance, **kwargs):
+    schedule_variants(instance, 'item_image')
+
+
+@receiver(post_save, sender=Buyer)
+def build_buyer_image_variants(sender, instance, **kwargs):
+    schedule_variants(instance, 'buyer_image')
+
 class BuyerTransaction(models.Model):
     buyer = models.ForeignKey(Buyer, on_delete=models.CASCADE)
     transaction_id = models.CharField(max_length=255, unique=True)
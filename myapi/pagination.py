@@ -0,0 +1,54 @@
+from rest_framework.pagination import CursorPagination
+
+
+class ItemCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the item catalog.
+
+    Pages are fetched with `WHERE id > <cursor> ORDER BY id LIMIT n`, so the cost of a
+    page does not grow with the size of the catalog the way OFFSET pagination does.
+    """
+    ordering = 'id'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class PurchaseLinePagination(CursorPagination):
+    """Newest first keyset pages over a buyer's purchase lines."""
+    ordering = '-id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class BalanceEntryPagination(CursorPagination):
+    """Oldest first keyset pages over a statement's ledger entries."""
+    ordering = ('created_at', 'id')
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class DepositPagination(CursorPagination):
+    """Newest first keyset pages over a buyer's deposits."""
+    ordering = '-id'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class SalesRollupPagination(CursorPagination):
+    """Keyset pages over daily sales rollup rows, oldest day first."""
+    ordering = ('day', 'id')
+    page_size = 500
+    page_size_query_param = 'page_size'
+    max_page_size = 2000
+
+
+class ProfitRollupPagination(CursorPagination):
+    """Keyset pages over a buyer's profit rollups, oldest period first."""
+    ordering = ('start', 'id')
+    page_size = 500
+    page_size_query_param = 'page_size'
+    max_page_size = 2000
@@ -0,0 +1,67 @@
+"""
+A buyer's wallet, everything the wallet screen shows, in one query.
+
+`portfolio()` selects the buyer row with its balances and, for Cashup deposits and Cashup
+owing deposits, a correlated aggregate subquery per total; each is a range scan of the
+deposits' `buyer_id` index, and the database returns them all in a single round trip.
+"""
+from django.apps import apps
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from .ledger import MONEY, ZERO
+
+# Response key: (model, balance column)
+DEPOSITS = {
+    'deposits': ('CashupDeposit', 'cashup_main_balance'),
+    'owing_deposits': ('CashupOwingDeposit', 'cashup_owing_main_balance'),
+}
+
+PROFIT_FIELDS = [
+    'daily_profit', 'monthly_profit', 'compounding_profit', 'daily_compounding_profit',
+    'monthly_compounding_profit', 'withdraw', 'compounding_withdraw',
+]
+
+
+def deposit_model(key):
+    return apps.get_model('myapi', DEPOSITS[key][0])
+
+
+def _totals(key):
+    balance_field = DEPOSITS[key][1]
+    rows = deposit_model(key).objects.filter(buyer=OuterRef('pk')).order_by().values('buyer')
+    annotations = {f'{key}__count': Coalesce(Subquery(rows.annotate(n=Count('pk')).values('n')), 0)}
+    for name, column in [('balance', balance_field)] + [(field, field) for field in PROFIT_FIELDS]:
+        annotations[f'{key}__{name}'] = Coalesce(
+            Subquery(rows.annotate(total=Sum(column)).values('total'), output_field=MONEY), ZERO, output_field=MONEY,
+        )
+    return annotations
+
+
+def portfolio(**lookup):
+    """
+    `(buyer_id, summary)` for the buyer matching `lookup` (e.g. `user=request.user`), or None.
+    `summary` holds the balances, the totals of each kind of deposit and the profit over both.
+    """
+    from .models import Buyer
+
+    annotations = {}
+    for key in DEPOSITS:
+        annotations.update(_totals(key))
+    row = Buyer.objects.filter(**lookup).annotate(**annotations).values(
+        'pk', 'main_balance', 'purchases_total', 'owing_total', *annotations,
+    ).first()
+    if row is None:
+        return None
+
+    summary = {
+        'main_balance': row['main_balance'],
+        'purchases_total': row['purchases_total'],
+        'owing_total': row['owing_total'],
+    }
+    for key in DEPOSITS:
+        summary[key] = {
+            name.partition('__')[2]: value for name, value in row.items() if name.startswith(f'{key}__')
+        }
+    summary['profit'] = {field: sum(summary[key][field] for key in DEPOSITS) for field in PROFIT_FIELDS}
+    return row['pk'], summary
@@ -0,0 +1,116 @@
+"""
+Set-based repricing of catalog items.
+
+A promotion touches every item in a category (or the whole catalog), so instead of loading
+each `Item` and letting `Item.save()` recompute `discount_price`, the new price, rate and
+discount price are written by a single `UPDATE` built from `F()` expressions.
+
+Moving every price also moves every entry of the price indexes, which on SQLite costs far
+more than the update itself. With `rebuild_indexes`, which only the `reprice_items`
+management command passes, large price changes therefore drop those indexes and build them
+again once inside the same transaction, which is several times cheaper. Requests never run
+that DDL; they update the indexes in place.
+"""
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.db import connections, transaction
+from django.db.models import Case, DecimalField, F, Value, When
+from django.db.models.functions import Round
+
+from .cache import catalog_cache
+from .summaries import rebuild_summaries
+
+
+MONEY = DecimalField(max_digits=10, decimal_places=2)
+CENT = Decimal('0.01')
+# Rows above which rebuilding the price indexes beats updating them in place
+REBUILD_INDEXES_OVER = 10_000
+
+
+def _money(value):
+    return Value(value, output_field=MONEY)
+
+
+def _discounted(price, rate):
+    # SQL twin of Item.discount_price_for; ROUND() takes half a cent away from zero, like its
+    # ROUND_HALF_UP. Multiplying by 0.01 rather than dividing by 100 keeps SQLite out of
+    # integer division for whole prices
+    return Round(price - price * rate * _money(CENT), 2, output_field=MONEY)
+
+
+@contextmanager
+def price_indexes_rebuilt(model, using):
+    """
+    Drop the indexes that cover `price` for the duration of the block, then recreate them.
+    SQLite only; the editor is used just to render the CREATE INDEX statements.
+    """
+    connection = connections[using]
+    editor = connection.schema_editor()
+    indexes = [index for index in model._meta.indexes if 'price' in index.fields]
+    with connection.cursor() as cursor:
+        for index in indexes:
+            cursor.execute(f'DROP INDEX {editor.quote_name(index.name)}')
+        yield
+        for index in indexes:
+            cursor.execute(str(index.create_sql(model, editor)))
+
+
+def reprice_items(queryset, discount_rate=None, price_change_percent=None, rebuild_indexes=False):
+    """
+    Set `discount_rate` and/or scale `price` by `price_change_percent` on every item in
+    `queryset`, recomputing `discount_price` in the same statement. `rebuild_indexes` lets
+    a price change over `REBUILD_INDEXES_OVER` rows on SQLite rebuild the price indexes
+    rather than update them; it takes DDL locks, so keep it off the request path.
+
+    Runs in one transaction and returns the number of rows updated.
+    """
+    if discount_rate is None and price_change_percent is None:
+        raise ValueError("Give a discount rate, a price change or both.")
+
+    changes = {}
+    # Every expression reads the row as it was before the UPDATE, so discount_price has
+    # to be derived from the new price and rate expressions rather than the columns
+    price = F('price')
+    if price_change_percent is not None:
+        price = Round(price * _money(1 + price_change_percent * CENT), 2, output_field=MONEY)
+        changes['price'] = price
+
+    if discount_rate is not None:
+        changes['discount_rate'] = _money(discount_rate)
+        changes['discount_price'] = _discounted(price, _money(discount_rate)) if discount_rate > 0 else price
+    else:
+        changes['discount_price'] = Case(
+            When(discount_rate__gt=0, then=_discounted(price, F('discount_rate'))),
+            default=price,
+            output_field=MONEY,
+        )
+
+    # update() skips Item.save(), so bump the version here: an instance loaded before the
+    # reprice then fails with StaleItem instead of saving the old prices back
+    changes['version'] = F('version') + 1
+
+    queryset = queryset.order_by()
+    with transaction.atomic(using=queryset.db):
+        category_ids = None
+        rebuild = False
+        if 'price' in changes:
+            category_ids = list(
+                queryset.exclude(category__isnull=True).values_list('category_id', flat=True).distinct()
+            )
+            # DDL is transactional on SQLite, so a failed update leaves the indexes intact
+            rebuild = (
+                rebuild_indexes and connections[queryset.db].vendor == 'sqlite'
+                and queryset.count() > REBUILD_INDEXES_OVER
+            )
+
+        if rebuild:
+            with price_indexes_rebuilt(queryset.model, queryset.db):
+                updated = queryset.update(**changes)
+        else:
+            updated = queryset.update(**changes)
+        # update() skips Item.save(), so keep the category price bounds and caches in step
+        if category_ids:
+            rebuild_summaries(category_ids)
+        catalog_cache.invalidate()
+    return updated
@@ -0,0 +1,109 @@
+"""
+Profit history: what each deposit earned on each accrual, and per-buyer rollups of it.
+
+The profit columns on a deposit are overwritten every day, so `accrue_chunk()` also writes
+a `ProfitSnapshot` for every day each deposit earned for: the balance it earned on and the
+simple and compounding profit of that day. A run that catches up missed days writes one
+for each of them, so every day, week and month is credited with what was earned in it
+rather than the day the run caught up to.
+
+`record_profits()` adds the snapshots into the buyer's `ProfitRollup` rows for the day,
+the week (starting Monday) and the month, in the same transaction, so a chart of two years
+reads at most 730 daily, 105 weekly or 24 monthly rows instead of the raw snapshots.
+`rebuild_profit_rollups()` recomputes the rollups from the snapshots.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+
+DAY = 'day'
+WEEK = 'week'
+MONTH = 'month'
+
+PERIOD_CHOICES = [
+    (DAY, 'Day'),
+    (WEEK, 'Week'),
+    (MONTH, 'Month'),
+]
+
+TRUNCATE = {DAY: TruncDay, WEEK: TruncWeek, MONTH: TruncMonth}
+
+
+def period_start(period, day):
+    """First day of the `period` containing `day`."""
+    if period == WEEK:
+        return day - timedelta(days=day.weekday())
+    if period == MONTH:
+        return day.replace(day=1)
+    return day
+
+
+def record_profits(snapshots):
+    """
+    Add `snapshots` (ProfitSnapshot instances) into their buyers' day, week and month
+    rollups. Must run in the transaction that writes the snapshots.
+    """
+    from .models import ProfitRollup
+
+    deltas = defaultdict(lambda: [Decimal('0'), Decimal('0')])
+    for snapshot in snapshots:
+        for period in TRUNCATE:
+            key = (snapshot.buyer_id, period, period_start(period, snapshot.day))
+            deltas[key][0] += snapshot.profit
+            deltas[key][1] += snapshot.compounding_profit
+    deltas = {key: delta for key, delta in deltas.items() if delta[0] or delta[1]}
+    if not deltas:
+        return
+
+    with transaction.atomic():
+        # Make sure every row exists, then lock them all in one order so concurrent
+        # accrual chunks touching the same buyers queue rather than deadlock
+        ProfitRollup.objects.bulk_create(
+            [ProfitRollup(buyer_id=buyer_id, period=period, start=start) for buyer_id, period, start in deltas],
+            ignore_conflicts=True,
+        )
+        rollups = list(
+            ProfitRollup.objects.filter(buyer_id__in={buyer_id for buyer_id, _, _ in deltas})
+            .filter(start__in={start for _, _, start in deltas})
+            .order_by('buyer_id', 'period', 'start').select_for_update()
+        )
+        changed = []
+        for rollup in rollups:
+            delta = deltas.get((rollup.buyer_id, rollup.period, rollup.start))
+            if delta is not None:
+                rollup.profit += delta[0]
+                rollup.compounding_profit += delta[1]
+                changed.append(rollup)
+        ProfitRollup.objects.bulk_update(changed, ['profit', 'compounding_profit'], batch_size=500)
+
+
+def rebuild_profit_rollups(buyer_ids=None):
+    """
+    Recompute the day, week and month rollups from the snapshots, for all buyers or just
+    `buyer_ids`. Returns the number of rollup rows written.
+    """
+    from .models import ProfitRollup, ProfitSnapshot
+
+    snapshots, rollups = ProfitSnapshot.objects.all(), ProfitRollup.objects.all()
+    if buyer_ids is not None:
+        snapshots, rollups = snapshots.filter(buyer_id__in=buyer_ids), rollups.filter(buyer_id__in=buyer_ids)
+
+    with transaction.atomic():
+        rollups.delete()
+        written = 0
+        for period, truncate in TRUNCATE.items():
+            written += len(ProfitRollup.objects.bulk_create(
+                (
+                    ProfitRollup(buyer_id=row['buyer_id'], period=period, start=row['start'], profit=row['profit'],
+                                 compounding_profit=row['compounding_profit'])
+                    for row in snapshots.values('buyer_id', start=truncate('day')).annotate(
+                        profit=Sum('profit'), compounding_profit=Sum('compounding_profit'),
+                    ).order_by().iterator()
+                ),
+                batch_size=500,
+            ))
+    return written
@@ -0,0 +1,290 @@
+"""
+Purchases: charging buyers, and purchase totals.
+
+`purchase_item()` and `checkout_cart()` are the only places a purchase debits `Buyer.main_balance`.
+The debit goes through the balance ledger (myapi.ledger) as a single conditional
+`UPDATE ... SET main_balance = main_balance - X WHERE main_balance >= X`,
+so concurrent checkouts cannot both spend the same money and there is no read-modify-write
+to lose. Requests carrying an idempotency key are charged at most once however often the
+client retries them. `checkout_cart()` pays for a whole cart the same way, with one debit
+for all of its lines. Units of stock-tracked items are reserved when a line is carted with
+`add_to_cart()` and taken for good at checkout (see myapi.stock).
+
+A buyer's paid purchase lines are annotated with their prices by `with_line_totals()`, and
+their grand total is kept on `Buyer.purchases_total`. That column moves by the line's
+`discount_total_price`, what the line was charged, whenever a purchase becomes (or stops
+being) confirmed and paid, so reading it costs the same for a buyer with three purchases
+or three thousand.
+"""
+from collections import namedtuple
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import ledger, stock
+from .sales import record_sales
+from .stock import OutOfStock
+
+CENT = Decimal('0.01')
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+# Most units of one item a single line may hold or buy
+MAX_QUANTITY = 100
+
+PurchaseValues = namedtuple('PurchaseValues', ['buyer_id', 'confirmed', 'paid', 'discount_total_price'])
+
+COUNTED = Q(confirmed=True, paid=True)
+
+
+class PurchaseError(Exception):
+    pass
+
+
+class InsufficientBalance(PurchaseError):
+    pass
+
+
+class IdempotencyConflict(PurchaseError):
+    """The idempotency key was already used for a different purchase."""
+
+
+class NothingToCharge(PurchaseError):
+    """The discounted total is not a positive amount, so there is nothing to debit."""
+
+
+class InvalidQuantity(PurchaseError):
+    """The quantity is not between 1 and MAX_QUANTITY."""
+
+
+def check_quantity(quantity):
+    if not 1 <= quantity <= MAX_QUANTITY:
+        raise InvalidQuantity(f"Quantity must be between 1 and {MAX_QUANTITY}.")
+
+
+def with_line_totals(queryset):
+    """
+    Annotate `discount_price`, the line's `total_price` (which already covers its quantity)
+    less the discount, and `line_total`, what the line was charged, on a Purchase queryset.
+    Multiplying by 0.01 keeps SQLite out of integer division for whole amounts.
+    """
+    return queryset.annotate(
+        discount_price=ExpressionWrapper(
+            F('total_price') - F('discount_rate') * F('total_price') * Value(CENT), output_field=MONEY,
+        ),
+    ).annotate(
+        line_total=Coalesce(F('discount_total_price'), Value(Decimal('0')), output_field=MONEY),
+    )
+
+
+def _contribution(values):
+    if values is None or not (values.confirmed and values.paid):
+        return Decimal('0')
+    return Decimal(values.discount_total_price or 0)
+
+
+def apply_purchase_change(old, new):
+    """
+    Move the buyers' running totals from a purchase's `old` values to its `new` ones
+    (either may be None for create/delete). Must run after the purchase row is written.
+    """
+    from .models import Buyer
+
+    deltas = {}
+    if old is not None:
+        deltas[old.buyer_id] = deltas.get(old.buyer_id, 0) - _contribution(old)
+    if new is not None:
+        deltas[new.buyer_id] = deltas.get(new.buyer_id, 0) + _contribution(new)
+    for buyer_id, delta in deltas.items():
+        if delta:
+            Buyer.objects.filter(pk=buyer_id).update(purchases_total=F('purchases_total') + delta)
+
+
+def rebuild_purchase_totals(buyer_ids=None):
+    """
+    Recompute `Buyer.purchases_total` from the purchase table, for all buyers or just
+    `buyer_ids`. Returns the number of buyers whose total was wrong.
+    """
+    from .models import Buyer, Purchase
+
+    buyers = Buyer.objects.all()
+    if buyer_ids is not None:
+        buyers = buyers.filter(pk__in=buyer_ids)
+
+    lines = Purchase.objects.filter(COUNTED, buyer__in=buyers.values('pk'))
+    totals = dict(
+        lines.values('buyer_id').annotate(total=Sum('discount_total_price')).order_by().values_list('buyer_id', 'total')
+    )
+    fixed = 0
+    for buyer_id, current in buyers.values_list('pk', 'purchases_total'):
+        expected = Decimal(totals.get(buyer_id) or 0).quantize(CENT, rounding=ROUND_HALF_UP)
+        if current != expected:
+            Buyer.objects.filter(pk=buyer_id).update(purchases_total=expected)
+            fixed += 1
+    return fixed
+
+
+def purchase_lines(buyer):
+    """The buyer's confirmed, paid purchases with their totals, item joined in."""
+    from .models import Purchase
+
+    return with_line_totals(
+        Purchase.objects.filter(COUNTED, buyer=buyer).select_related('item')
+    )
+
+
+def _reference(purchase):
+    return f'purchase:{purchase.pk}'
+
+
+def add_to_cart(buyer_id, item, quantity=1):
+    """
+    Put `quantity` of `item` in the buyer's cart at the item's discount rate, reserving
+    the units for `stock.RESERVATION_TTL` when the item's stock is tracked. Raises
+    InvalidQuantity and OutOfStock.
+    """
+    from .models import Purchase
+
+    check_quantity(quantity)
+    tracked = item.stock is not None
+    with transaction.atomic():
+        if tracked and not stock.take(item.pk, quantity):
+            raise OutOfStock("Not enough of this item is left in stock.")
+        return Purchase.objects.create(
+            item=item, buyer_id=buyer_id, quantity=quantity, discount_rate=item.discount_rate or Decimal('0'),
+            reserved_quantity=quantity if tracked else 0,
+            reserved_until=timezone.now() + stock.RESERVATION_TTL if tracked else None,
+        )
+
+
+def _replay(buyer_id, item, quantity, idempotency_key):
+    from .models import Purchase
+
+    purchase = Purchase.objects.filter(buyer_id=buyer_id, idempotency_key=idempotency_key).first()
+    if purchase is not None and (purchase.item_id != item.pk or purchase.quantity != quantity):
+        raise IdempotencyConflict("This idempotency key was already used for a different purchase.")
+    return purchase
+
+
+def purchase_item(buyer_id, item, quantity=1, idempotency_key=None):
+    """
+    Charge the buyer for `quantity` of `item` at the item's own discount rate and record
+    the purchase as confirmed and paid.
+
+    Returns `(purchase, created)`; `created` is False when `idempotency_key` matches an
+    earlier purchase, which is returned without charging again. Raises
+    InsufficientBalance when the balance does not cover the discounted total,
+    NothingToCharge when that total is not positive, InvalidQuantity, and OutOfStock when
+    too few units of a stock-tracked item are left.
+    """
+    from .models import Purchase
+
+    check_quantity(quantity)
+
+    if idempotency_key:
+        purchase = _replay(buyer_id, item, quantity, idempotency_key)
+        if purchase is not None:
+            return purchase, False
+
+    tracked = item.stock is not None
+    discount_rate = item.discount_rate or Decimal('0')
+    total_price, discount_total_price = Purchase.prices_for(item.price, quantity, discount_rate)
+    if discount_total_price <= 0:
+        raise NothingToCharge("This purchase has no positive amount to charge.")
+    purchase = Purchase(
+        item=item, buyer_id=buyer_id, quantity=quantity, discount_rate=discount_rate,
+        total_price=total_price, discount_total_price=discount_total_price,
+        confirmed=True, paid=True, idempotency_key=idempotency_key or None,
+        reserved_quantity=quantity if tracked else 0,
+    )
+    try:
+        with transaction.atomic():
+            if tracked and not stock.take(item.pk, quantity):
+                raise OutOfStock("Not enough of this item is left in stock.")
+            purchase.save()
+            if not ledger.move(buyer_id, -discount_total_price, ledger.PURCHASE, _reference(purchase), require_funds=True):
+                raise InsufficientBalance("Insufficient main balance to complete the purchase.")
+    except IntegrityError:
+        # A concurrent retry with the same key won; its debit stands and ours rolled back
+        existing = _replay(buyer_id, item, quantity, idempotency_key) if idempotency_key else None
+        if existing is None:
+            raise
+        return existing, False
+    return purchase, True
+
+
+def checkout_cart(buyer_id, purchase_ids=None):
+    """
+    Confirm and pay for the buyer's carted purchases, or just those in `purchase_ids`, with a
+    single debit. Lines are priced at the item's current price and discount rate; lines whose
+    item is gone or unavailable, whose total would not be positive, or whose reservation
+    lapsed and cannot be renewed, stay in the cart.
+
+    Returns `(results, charged)` with one result dict per line. Raises InsufficientBalance,
+    leaving every line in the cart, when the balance does not cover the payable lines.
+    """
+    from .models import Buyer, Purchase
+
+    with transaction.atomic():
+        # Locked so the reservation sweeper leaves these lines alone until they are paid for
+        lines = Purchase.objects.filter(buyer_id=buyer_id, confirmed=False).select_related('item').order_by('id')
+        lines = lines.select_for_update(of=('self',))
+        if purchase_ids is not None:
+            lines = lines.filter(pk__in=purchase_ids)
+
+        results, payable, delta = [], [], Decimal('0')
+        now = timezone.now()
+        for line in lines:
+            item = line.item
+            # A stock-tracked item is off sale once its last units are reserved, this line's among them
+            if item is None or (item.stock is None and not item.is_available):
+                results.append({'id': line.pk, 'item': line.item_id, 'status': 'unavailable', 'charged': None})
+                continue
+            discount_rate = item.discount_rate or Decimal('0')
+            total_price, discount_total_price = Purchase.prices_for(item.price, line.quantity, discount_rate)
+            if discount_total_price <= 0:
+                results.append({'id': line.pk, 'item': line.item_id, 'status': 'nothing_to_charge', 'charged': None})
+                continue
+            if item.stock is not None:
+                # Top the reservation up (or hand back the excess) to the line's current quantity
+                missing = line.quantity - line.reserved_quantity
+                if missing > 0 and not stock.take(item.pk, missing):
+                    results.append({'id': line.pk, 'item': line.item_id, 'status': 'out_of_stock', 'charged': None})
+                    continue
+                stock.give_back(item.pk, -missing)
+                line.reserved_quantity = line.quantity
+            line.reserved_until = None
+            previous = line.purchase_values()
+            line.discount_rate, line.total_price, line.discount_total_price = discount_rate, total_price, discount_total_price
+            line.confirmed = line.paid = True
+            line.confirmed_at = now
+            delta += _contribution(line.purchase_values()) - _contribution(previous)
+            payable.append(line)
+            results.append({
+                'id': line.pk, 'item': line.item_id, 'status': 'confirmed', 'charged': line.discount_total_price,
+            })
+
+        if purchase_ids is not None:
+            found = {result['id'] for result in results}
+            results.extend(
+                {'id': pk, 'item': None, 'status': 'not_in_cart', 'charged': None}
+                for pk in dict.fromkeys(purchase_ids) if pk not in found
+            )
+
+        charged = sum((line.discount_total_price for line in payable), Decimal('0'))
+        debits = [ledger.Line(-line.discount_total_price, ledger.PURCHASE, _reference(line)) for line in payable]
+        if not ledger.post(buyer_id, debits, require_funds=True):
+            raise InsufficientBalance("Insufficient main balance to check out the cart.")
+        if payable:
+            # bulk_update() skips Purchase.save(), so the running total and sales move here, once
+            Purchase.objects.bulk_update(
+                payable, ['discount_rate', 'total_price', 'discount_total_price', 'confirmed', 'paid', 'confirmed_at',
+                          'reserved_quantity', 'reserved_until'],
+            )
+            if delta:
+                Buyer.objects.filter(pk=buyer_id).update(purchases_total=F('purchases_total') + delta)
+            record_sales((None, line.sale_values()) for line in payable)
+    for line in payable:
+        line.remember_saved_values()
+    return results, charged
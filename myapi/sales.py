@@ -0,0 +1,112 @@
+"""
+Daily sales per item and per category, maintained incrementally.
+
+A purchase counts as a sale on the day it was confirmed. Whenever purchases are confirmed
+(or a confirmed one changes or is deleted), `record_sales()` moves the affected
+`DailyItemSales` and `DailyCategorySales` rows by the difference, so reports read a few
+pre-aggregated rows instead of scanning purchases. `rebuild_sales()` recomputes them from
+the purchase table.
+"""
+from collections import defaultdict, namedtuple
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+SaleValues = namedtuple('SaleValues', ['item_id', 'confirmed', 'confirmed_at', 'quantity', 'discount_total_price'])
+
+
+def _sale(values):
+    """`((day, item_id), quantity, revenue)` for a confirmed purchase, else None."""
+    if values is None or not values.confirmed or values.confirmed_at is None or values.item_id is None:
+        return None
+    day = timezone.localdate(values.confirmed_at)
+    return (day, values.item_id), values.quantity, Decimal(values.discount_total_price or 0)
+
+
+def _bump(model, key, quantity, revenue):
+    rows = model.objects.filter(**key)
+    if rows.update(quantity=F('quantity') + quantity, revenue=F('revenue') + revenue):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(quantity=quantity, revenue=revenue, **key)
+    except IntegrityError:
+        # Created by a concurrent sale since the update above
+        rows.update(quantity=F('quantity') + quantity, revenue=F('revenue') + revenue)
+
+
+def record_sales(changes):
+    """
+    Apply `(old, new)` SaleValues pairs (either may be None) to the daily rollups.
+    Must run after the purchase rows themselves have been written.
+    """
+    from .models import DailyCategorySales, DailyItemSales, Item
+
+    deltas = defaultdict(lambda: [0, Decimal('0')])
+    for old, new in changes:
+        for values, sign in ((old, -1), (new, 1)):
+            sale = _sale(values)
+            if sale is not None:
+                key, quantity, revenue = sale
+                deltas[key][0] += sign * quantity
+                deltas[key][1] += sign * revenue
+    deltas = {key: delta for key, delta in deltas.items() if delta[0] or delta[1]}
+    if not deltas:
+        return
+
+    categories = dict(
+        Item.objects.filter(pk__in={item_id for _, item_id in deltas}).values_list('pk', 'category_id')
+    )
+    category_deltas = defaultdict(lambda: [0, Decimal('0')])
+    with transaction.atomic():
+        for (day, item_id), (quantity, revenue) in deltas.items():
+            _bump(DailyItemSales, {'day': day, 'item_id': item_id}, quantity, revenue)
+            category_id = categories.get(item_id)
+            if category_id is not None:
+                category_deltas[day, category_id][0] += quantity
+                category_deltas[day, category_id][1] += revenue
+        for (day, category_id), (quantity, revenue) in category_deltas.items():
+            _bump(DailyCategorySales, {'day': day, 'category_id': category_id}, quantity, revenue)
+
+
+def apply_sale_change(old, new):
+    record_sales([(old, new)])
+
+
+def rebuild_sales(start=None, end=None):
+    """
+    Recompute the daily rollups from confirmed purchases, for every day or the days in
+    `[start, end)`. Returns the number of item rows written.
+    """
+    from .models import DailyCategorySales, DailyItemSales, Purchase
+
+    purchases = Purchase.objects.filter(confirmed=True, confirmed_at__isnull=False, item__isnull=False)
+    item_rows, category_rows = DailyItemSales.objects.all(), DailyCategorySales.objects.all()
+    if start is not None:
+        purchases = purchases.filter(confirmed_at__date__gte=start)
+        item_rows, category_rows = item_rows.filter(day__gte=start), category_rows.filter(day__gte=start)
+    if end is not None:
+        purchases = purchases.filter(confirmed_at__date__lt=end)
+        item_rows, category_rows = item_rows.filter(day__lt=end), category_rows.filter(day__lt=end)
+
+    daily = purchases.annotate(day=TruncDate('confirmed_at')).values('day').order_by()
+    with transaction.atomic():
+        item_rows.delete()
+        category_rows.delete()
+        items = DailyItemSales.objects.bulk_create(
+            DailyItemSales(day=row['day'], item_id=row['item_id'], quantity=row['quantity'], revenue=row['revenue'])
+            for row in daily.values('day', 'item_id').annotate(
+                quantity=Sum('quantity'), revenue=Sum('discount_total_price'),
+            ).iterator()
+        )
+        DailyCategorySales.objects.bulk_create(
+            DailyCategorySales(day=row['day'], category_id=row['item__category_id'], quantity=row['quantity'],
+                               revenue=row['revenue'])
+            for row in daily.filter(item__category__isnull=False).values('day', 'item__category_id').annotate(
+                quantity=Sum('quantity'), revenue=Sum('discount_total_price'),
+            ).iterator()
+        )
+    return len(items)
@@ -0,0 +1,118 @@
+"""
+Full-text search over Item name and description.
+
+Backed by the `myapi_item_fts` FTS5 table created in migration 0021, which triggers on
+`myapi_item` keep in sync with inserts, updates and deletes (including bulk writes).
+
+FTS5 is SQLite only. Other databases have no index, so `search_items()` falls back to
+matching every word with a case-insensitive `LIKE`; it scans the item table, ranks name
+matches before description matches and returns no snippets.
+"""
+import re
+from functools import reduce
+from operator import and_
+
+from django.db import connection, connections
+from django.db.models import Case, Q, Value, When
+
+
+FTS_TABLE = 'myapi_item_fts'
+
+# SQLite drops a table's triggers when a migration rebuilds it, so they are re-created
+# after every `migrate` (see MyapiConfig.ready)
+TRIGGERS = {
+    'myapi_item_fts_ai': f"""
+        CREATE TRIGGER IF NOT EXISTS myapi_item_fts_ai AFTER INSERT ON myapi_item BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+        END
+    """,
+    'myapi_item_fts_ad': f"""
+        CREATE TRIGGER IF NOT EXISTS myapi_item_fts_ad AFTER DELETE ON myapi_item BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+        END
+    """,
+    'myapi_item_fts_au': f"""
+        CREATE TRIGGER IF NOT EXISTS myapi_item_fts_au AFTER UPDATE OF name, description ON myapi_item BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+        END
+    """,
+}
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+SEARCH_SQL = f"""
+    SELECT rowid, bm25({FTS_TABLE}, 10.0, 1.0) AS rank,
+           snippet({FTS_TABLE}, -1, '<b>', '</b>', '...', 12) AS snippet
+    FROM {FTS_TABLE}
+    WHERE {FTS_TABLE} MATCH %s
+    ORDER BY rank
+    LIMIT %s OFFSET %s
+"""
+
+
+def build_match_query(query):
+    """
+    Turn free text into a safe FTS5 expression: every word must match, the last one as a prefix.
+
+    Words are quoted so FTS5 operators typed by the user (`OR`, `NEAR`, `*`, `"`) are taken
+    literally instead of raising a syntax error.
+    """
+    tokens = TOKEN_RE.findall(query or '')
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_items(query, limit, offset=0):
+    """
+    Return `(item_id, rank, snippet)` rows for `query`, best match first.
+
+    `rank` is the bm25 score (lower is better), with name matches weighted over description.
+    """
+    match = build_match_query(query)
+    if match is None:
+        return []
+    if connection.vendor != 'sqlite':
+        return _search_without_index(TOKEN_RE.findall(query), limit, offset)
+    with connection.cursor() as cursor:
+        cursor.execute(SEARCH_SQL, [match, limit, offset])
+        return cursor.fetchall()
+
+
+def _search_without_index(tokens, limit, offset):
+    from .models import Item
+
+    in_name = reduce(and_, [Q(name__icontains=token) for token in tokens])
+    matches = reduce(and_, [Q(name__icontains=token) | Q(description__icontains=token) for token in tokens])
+    rows = Item.objects.filter(matches).annotate(
+        rank=Case(When(in_name, then=Value(0.0)), default=Value(1.0)),
+    ).order_by('rank', 'pk').values_list('pk', 'rank')[offset:offset + limit]
+    return [(item_id, rank, None) for item_id, rank in rows]
+
+
+def rebuild_index(using='default'):
+    """Rebuild the FTS index from the item table and merge its segments."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+
+
+def ensure_triggers(using='default'):
+    """
+    Re-create any sync trigger that a table rebuild dropped, and rebuild the index if one was
+    missing since writes made while it was gone are not indexed.
+    """
+    db = connections[using]
+    if db.vendor != 'sqlite' or FTS_TABLE not in db.introspection.table_names():
+        return
+    with db.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'myapi_item'")
+        existing = {name for (name,) in cursor.fetchall()}
+        missing = [name for name in TRIGGERS if name not in existing]
+        for name in missing:
+            cursor.execute(TRIGGERS[name])
+    if missing:
+        rebuild_index(using)
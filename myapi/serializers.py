@@ -1,37 +1,114 @@
 import re  # Import the re module for regular expressions
 from rest_framework import serializers
-from .models import Purchase, Buyer, CashupOwingDeposit, Item, CashupDeposit ,BuyerTransaction
+from .models import Purchase, Buyer, CashupOwingDeposit, Item, CashupDeposit ,BuyerTransaction, Category, BalanceEntry
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.db import transaction
-from datetime import date
+from datetime import date, timedelta
+from django.utils import timezone
+from decimal import Decimal
+from .cache import catalog_cache
+from .images import srcset
+from .purchases import MAX_QUANTITY, add_to_cart
+from .stock import OutOfStock, StaleItem
+from .fieldsets import SparseFieldsetMixin
+from .portfolio import DEPOSITS as PORTFOLIO_DEPOSITS
+from .profits import PERIOD_CHOICES, WEEK
+
+_MONEY = serializers.DecimalField(max_digits=None, decimal_places=2)
+
+
+def money(value):
+    """An amount as the decimal string the model serializers give it, e.g. `'12.50'`."""
+    return None if value is None else _MONEY.to_representation(value)
 
 # Custom ValidationError
 class ValidationError(Exception):
     """Custom exception for validation errors."""
     pass
 
+class ImageSrcsetField(serializers.Field):
+    """
+    Read-only `srcset` string built from an image's stored variants (see myapi.images).
+    `variant` picks the JPEG/PNG fallback (`src`) or the WebP (`webp`) renditions.
+    """
+    def __init__(self, variant='src', **kwargs):
+        self.variant = variant
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return srcset(self.context.get('request'), value, self.variant)
+
+
 # Item Serializer
-class ItemSerializer(serializers.ModelSerializer):
+class ItemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    item_image_srcset = ImageSrcsetField(source='item_image_variants')
+    item_image_webp_srcset = ImageSrcsetField(source='item_image_variants', variant='webp')
+
     class Meta:
         model = Item
-        fields = ['id', 'name', 'description', 'is_available', 'price','members_price','item_image','discount_rate',]
+        fields = ['id', 'name', 'description', 'is_available', 'price','members_price','item_image','discount_rate',
+                  'item_image_srcset', 'item_image_webp_srcset']
+
+    def update(self, instance, validated_data):
+        try:
+            return super().update(instance, validated_data)
+        except StaleItem as exc:
+            raise serializers.ValidationError({'non_field_errors': [str(exc)]})
+
+# Category Serializer; the numbers come from the denormalized CategorySummary row
+class CategorySerializer(serializers.ModelSerializer):
+    item_count = serializers.IntegerField(source='summary.item_count', read_only=True)
+    available_count = serializers.IntegerField(source='summary.available_count', read_only=True)
+    min_price = serializers.DecimalField(source='summary.min_price', max_digits=10, decimal_places=2, read_only=True)
+    max_price = serializers.DecimalField(source='summary.max_price', max_digits=10, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = Category
+        fields = ['id', 'name', 'item_count', 'available_count', 'min_price', 'max_price']
 
 # Buyer Serializer
-class BuyerSerializer(serializers.ModelSerializer):
+class BuyerSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    buyer_image_srcset = ImageSrcsetField(source='buyer_image_variants')
+    buyer_image_webp_srcset = ImageSrcsetField(source='buyer_image_variants', variant='webp')
+
     class Meta:
         model = Buyer
-        fields = ['id', 'name', 'phone_number','main_balance','date_of_birth','gender', 'membership_status','address', 'main_balance','buyer_image']
+        fields = ['id', 'name', 'phone_number','main_balance','date_of_birth','gender', 'membership_status','address','buyer_image',
+                  'buyer_image_srcset', 'buyer_image_webp_srcset']
+        read_only_fields = ['main_balance']  # Only moved through myapi.ledger
 
 # Purchase Serializer
 from rest_framework import serializers
 from .models import Purchase, Buyer, Item
 
-class PurchaseSerializer(serializers.ModelSerializer):
-    item_image = serializers.ImageField(source='item.item_image', read_only=True)  # Getting the image from related Item
-    buyer = serializers.PrimaryKeyRelatedField(queryset=Buyer.objects.all())  # Allow buyer to be set via ID
+class CachedItemImageField(serializers.ImageField):
+    """
+    Read the related item's image through the catalog cache instead of loading `item` per row.
+    """
+    model_fields = ('item',)  # Columns read, for sparse fieldset querysets
+    values_path = 'item__item_image'  # myapi.fastpath joins the image in instead
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('read_only', True)
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        # Use the item if the query already joined it in
+        if type(instance).item.is_cached(instance):
+            item = instance.item
+        else:
+            item = catalog_cache.get_item(instance.item_id) if instance.item_id else None
+        return item.item_image if item else None
+
+
+class PurchaseSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    item_image = CachedItemImageField()  # Getting the image from related Item
+    buyer = serializers.PrimaryKeyRelatedField(read_only=True)  # The signed-in buyer, set by the view
     item = serializers.PrimaryKeyRelatedField(queryset=Item.objects.all())  # Allow item to be set via ID
+    quantity = serializers.IntegerField(min_value=1, max_value=MAX_QUANTITY, required=False)
 
     class Meta:
         model = Purchase
@@ -39,40 +116,10 @@ class PurchaseSerializer(serializers.ModelSerializer):
             'id', 'item', 'total_price', 'discount_rate', 'quantity', 'buyer', 
             'confirmed', 'discount_total_price', 'item_image'  # Add 'item_image' here
         ]
-    def create(self, validated_data):
-        # Extract the buyer and total price from the validated data
-        buyer = validated_data['buyer']
-        total_price = validated_data['total_price']
-
-        # Check if the buyer has sufficient main_balance
-        if buyer.main_balance < total_price:
-            raise serializers.ValidationError("Insufficient main balance to complete the purchase.")
-
-        # Deduct the total price from the buyer's main_balance
-        buyer.main_balance -= total_price
-        buyer.save()
-
-        # Create the purchase
-        purchase = Purchase.objects.create(**validated_data)
-        return purchase
-
-    def create(self, validated_data):
-        # Extract the buyer and total price from the validated data
-        buyer = validated_data['buyer']
-        total_price = validated_data['total_price']
-
-        # Check if the buyer has sufficient main_balance
-        if buyer.main_balance < total_price:
-            raise serializers.ValidationError("Insufficient main balance to complete the purchase.")
-
-        # Deduct the total price from the buyer's main_balance
-        buyer.main_balance -= total_price
-        buyer.save()
-
-        # Create the purchase
-        purchase = Purchase.objects.create(**validated_data)
-        return purchase
-
+        # Lines are priced at the item's discount, never at one the client sends, and only
+        # myapi.purchases confirms them, when it charges for them. `paid` and the reservation
+        # columns are not exposed at all.
+        read_only_fields = ['discount_rate', 'total_price', 'discount_total_price', 'confirmed']
     def get_members_price(self, obj):
         """
         Calculate the members price if the buyer has a membership.
@@ -83,52 +130,31 @@ class PurchaseSerializer(serializers.ModelSerializer):
 
     def validate(self, data):
         """
-        Validate the purchase data.
+        Validate the purchase data. Whether the balance covers it is decided atomically
+        when the purchase is charged (see myapi.purchases), not here.
         """
-        buyer = data.get('buyer')
-        item = data.get('item')
-        quantity = data.get('quantity', 1)
-
-        if not item:
+        if not data.get('item'):
             raise serializers.ValidationError("Item is required.")
-
-        total_price = item.price * quantity
-
-        if buyer.main_balance < total_price:
-            raise serializers.ValidationError("Insufficient funds.")
-
         return data
 
     def create(self, validated_data):
         """
-        Create a new purchase and deduct the total price from the buyer's main balance.
+        Cart a purchase line for the buyer passed to `save()`, reserving stock-tracked units.
+        Nothing is charged here; paying goes through myapi.purchases.
         """
-        buyer = validated_data['buyer']
-        item = validated_data['item']
-        quantity = validated_data.get('quantity', 1)
-        total_price = item.price * quantity
-
-        # Deduct the total price from the buyer's main balance
-        buyer.main_balance -= total_price
-        buyer.save()
-
-        # Create the purchase
-        purchase = Purchase.objects.create(
-            item=item,
-            total_price=item.price,
-            discount_rate=validated_data.get('discount_rate', 0),
-            quantity=quantity,
-            buyer=buyer,
-            
-
-        )
-
-        return purchase
+        try:
+            return add_to_cart(
+                validated_data['buyer'].pk,
+                validated_data['item'],
+                quantity=validated_data.get('quantity', 1),
+            )
+        except OutOfStock as exc:
+            raise serializers.ValidationError({'item': [str(exc)]})
 
 # CashupOwingDeposit Serializer
 
 
-class CashupOwingDepositSerializer(serializers.ModelSerializer):
+class CashupOwingDepositSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     buyer = BuyerSerializer(read_only=True)  # Nested serializer for buyer (read-only)
 
     class Meta:
@@ -151,7 +177,7 @@ class CashupOwingDepositSerializer(serializers.ModelSerializer):
 
         
 # CashupDeposit Serializer
-class CashupDepositSerializer(serializers.ModelSerializer):
+class CashupDepositSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     buyer = BuyerSerializer(read_only=True)  # Nested serializer for buyer (read-only)
 
     class Meta:
@@ -367,4 +393,82 @@ class TransferSerializer(serializers.Serializer):
     def validate_amount(self, value):
         if value <= 0:
             raise serializers.ValidationError("Amount must be greater than zero.")
-        return value
\ No newline at end of file
+        return value
+
+
+class RepriceSerializer(serializers.Serializer):
+    discount_rate = serializers.DecimalField(max_digits=5, decimal_places=2, required=False,
+                                             min_value=Decimal('0'), max_value=Decimal('100'))
+    price_change_percent = serializers.DecimalField(max_digits=6, decimal_places=2, required=False,
+                                                    min_value=Decimal('-99.99'))
+
+    def validate(self, data):
+        if data.get('discount_rate') is None and data.get('price_change_percent') is None:
+            raise serializers.ValidationError("Give a discount_rate, a price_change_percent or both.")
+        return data
+
+
+class CheckoutSerializer(serializers.Serializer):
+    purchases = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False,
+        help_text="Carted purchase ids to check out; the whole cart when left out.",
+    )
+
+class BalanceEntrySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BalanceEntry
+        fields = ['id', 'amount', 'kind', 'reference', 'created_at']
+
+
+class StatementRangeSerializer(serializers.Serializer):
+    start = serializers.DateTimeField(required=False, help_text="Defaults to 30 days before `end`.")
+    end = serializers.DateTimeField(required=False, help_text="Defaults to now.")
+
+    def validate(self, data):
+        end = data.setdefault('end', timezone.now())
+        start = data.setdefault('start', end - timedelta(days=30))
+        if start >= end:
+            raise serializers.ValidationError("start must be before end.")
+        return data
+
+
+class ExportFilterSerializer(serializers.Serializer):
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+    buyer = serializers.IntegerField(required=False, min_value=1)
+
+
+class SalesReportSerializer(serializers.Serializer):
+    start = serializers.DateField(required=False, help_text="First day; defaults to 30 days before `end`.")
+    end = serializers.DateField(required=False, help_text="Day after the last one; defaults to tomorrow.")
+    group = serializers.ChoiceField(choices=['item', 'category'], default='category')
+    item = serializers.IntegerField(required=False, min_value=1)
+    category = serializers.IntegerField(required=False, min_value=1)
+
+    def validate(self, data):
+        end = data.setdefault('end', timezone.localdate() + timedelta(days=1))
+        start = data.setdefault('start', end - timedelta(days=30))
+        if start >= end:
+            raise serializers.ValidationError("start must be before end.")
+        if data['group'] == 'category' and 'item' in data:
+            raise serializers.ValidationError("Filter by item with group=item.")
+        return data
+
+
+class PortfolioSerializer(serializers.Serializer):
+    rows = serializers.ChoiceField(
+        choices=list(PORTFOLIO_DEPOSITS), required=False, help_text="Also return a page of these deposit rows.",
+    )
+
+
+class ProfitHistorySerializer(serializers.Serializer):
+    period = serializers.ChoiceField(choices=PERIOD_CHOICES, default=WEEK)
+    start = serializers.DateField(required=False, help_text="First day; defaults to two years before `end`.")
+    end = serializers.DateField(required=False, help_text="Day after the last one; defaults to tomorrow.")
+
+    def validate(self, data):
+        end = data.setdefault('end', timezone.localdate() + timedelta(days=1))
+        start = data.setdefault('start', end - timedelta(days=730))
+        if start >= end:
+            raise serializers.ValidationError("start must be before end.")
+        return data
\ No newline at end of file
@@ -0,0 +1,121 @@
+"""
+Item stock and cart reservations.
+
+An item with a `stock` count (null means its stock is not tracked) only sells the units it
+has. Adding a line to a cart reserves its quantity straight away with a conditional
+`UPDATE ... SET stock = stock - n WHERE stock >= n`, so concurrent buyers can never both get
+the last unit and no lock is held past that one statement. A reservation lasts
+`RESERVATION_TTL`; `release_expired()` (the `release_reservations` command) hands expired
+ones back, and checkout turns the others into sales.
+
+Every stock change bumps `Item.version`, and `Item.save()` only writes a row whose version
+is still the one it loaded, so saving an item loaded before a reservation or sale fails with
+StaleItem instead of writing back a stale count. `is_available` follows the stock: the
+statement that takes the last units clears it and the one that returns units sets it again.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .cache import catalog_cache
+from .summaries import SummaryValues, apply_item_change
+
+RESERVATION_TTL = timedelta(minutes=15)
+
+
+class OutOfStock(Exception):
+    pass
+
+
+class StaleItem(Exception):
+    """The item row changed after the instance being saved was loaded."""
+
+
+def claim_version(item):
+    """Bump the version of `item`'s row, raising StaleItem if it is no longer the one `item` holds."""
+    from .models import Item
+
+    if not Item.objects.filter(pk=item.pk, version=item.version).update(version=F('version') + 1):
+        raise StaleItem(f"Item {item.pk} changed since it was loaded; reload it and try again.")
+    item.version += 1
+
+
+def _availability_changed(item_id, available):
+    from .models import Item
+
+    row = Item.objects.filter(pk=item_id).values_list('category_id', 'price').first()
+    if row is not None:
+        category_id, price = row
+        apply_item_change(SummaryValues(category_id, not available, price), SummaryValues(category_id, available, price))
+    catalog_cache.invalidate()
+
+
+def take(item_id, quantity):
+    """
+    Take `quantity` units from a stock-tracked item. Returns False, changing nothing, when
+    fewer are left. Run it in the transaction that records what the units are for.
+    """
+    from .models import Item
+
+    if quantity <= 0:
+        return True
+    items = Item.objects.filter(pk=item_id)
+    changes = {'stock': F('stock') - quantity, 'version': F('version') + 1}
+    if items.filter(stock__gt=quantity).update(**changes):
+        return True
+    # Exactly the last units: the same statement takes the item off sale
+    if items.filter(stock=quantity).update(is_available=False, **changes):
+        _availability_changed(item_id, False)
+        return True
+    return False
+
+
+def give_back(item_id, quantity):
+    """Return `quantity` units to a stock-tracked item, putting it back on sale if it had run out."""
+    from .models import Item
+
+    if quantity <= 0:
+        return
+    items = Item.objects.filter(pk=item_id)
+    changes = {'stock': F('stock') + quantity, 'version': F('version') + 1}
+    if not items.filter(stock__gt=0).update(**changes):
+        if items.filter(stock=0).update(is_available=True, **changes):
+            _availability_changed(item_id, True)
+
+
+def release(purchases, limit=None, skip_locked=False):
+    """
+    Hand back the units reserved by the carted lines among `purchases` (a Purchase queryset)
+    and clear their reservations; the lines stay in their carts. Returns how many were released.
+    """
+    from .models import Purchase
+
+    with transaction.atomic():
+        # Locked, so a line being checked out is not released under it
+        lines = purchases.filter(confirmed=False, reserved_quantity__gt=0).select_for_update(skip_locked=skip_locked)
+        lines = list(lines.values_list('pk', 'item_id', 'reserved_quantity')[:limit])
+        if not lines:
+            return 0
+        Purchase.objects.filter(pk__in=[pk for pk, _, _ in lines]).update(reserved_quantity=0, reserved_until=None)
+        units = defaultdict(int)
+        for _, item_id, quantity in lines:
+            units[item_id] += quantity
+        for item_id, quantity in units.items():
+            give_back(item_id, quantity)
+    return len(lines)
+
+
+def release_expired(now=None, batch_size=500):
+    """Release every reservation that lapsed before `now`, `batch_size` lines per transaction."""
+    from .models import Purchase
+
+    expired = Purchase.objects.filter(confirmed=False, reserved_until__lt=now or timezone.now()).order_by('reserved_until')
+    released = 0
+    while True:
+        batch = release(expired, limit=batch_size, skip_locked=True)
+        released += batch
+        if batch < batch_size:
+            return released
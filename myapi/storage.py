@@ -0,0 +1,100 @@
+"""
+Content-addressed media storage.
+
+Uploads are stored under the SHA-256 of their bytes, e.g. `item_images/3f/3f9a...c1.png`, so
+identical uploads share one file and a URL never changes meaning once issued. That makes
+it safe to serve media with `Cache-Control: immutable`.
+"""
+import hashlib
+import os
+import re
+import tempfile
+
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.views.static import serve
+
+
+HASHED_NAME_RE = re.compile(r'(^|/)[0-9a-f]{2}/[0-9a-f]{64}(\.[\w]+)?$')
+# Names that URL quoting leaves alone and that have no `.`/`..` segments to resolve
+PLAIN_NAME_RE = re.compile(r'[\w\-][\w.\-]*(/[\w\-][\w.\-]*)*', re.ASCII)
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def is_hashed_name(name):
+    return bool(HASHED_NAME_RE.search(name))
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    chunk_size = 64 * 1024
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is derived from the content in _save, and an existing file with
+        # that name already holds the same bytes, so there is never a collision to avoid
+        return name
+
+    def hashed_name(self, name, digest):
+        directory = os.path.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        return os.path.join(directory, digest[:2], digest + extension).replace('\\', '/')
+
+    def _save(self, name, content):
+        """
+        Stream the upload to a temporary file while hashing it, then move it into place
+        under its content hash. Nothing larger than one chunk is held in memory.
+        """
+        directory = self.path(os.path.dirname(name))
+        os.makedirs(directory, mode=self.directory_permissions_mode or 0o777, exist_ok=True)
+
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                for chunk in content.chunks(self.chunk_size):
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+
+            name = self.hashed_name(name, digest.hexdigest())
+            if self.exists(name):
+                os.remove(temp_path)
+                return name
+
+            full_path = self.path(name)
+            os.makedirs(os.path.dirname(full_path), mode=self.directory_permissions_mode or 0o777, exist_ok=True)
+            os.chmod(temp_path, self.file_permissions_mode or 0o644)
+            # Atomic, so a concurrent upload of the same bytes just replaces it with a twin
+            os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return name
+
+
+def media_url(request, name, storage=None):
+    """
+    `request.build_absolute_uri(storage.url(name))`, computed once per request for the
+    common case: plain names under a filesystem storage are just appended to the base URL.
+    """
+    storage = storage or default_storage
+    if request is None:
+        return storage.url(name)
+
+    prefixes = request.__dict__.setdefault('_media_url_prefixes', {})
+    prefix = prefixes.get(id(storage))
+    if prefix is None:
+        prefix = prefixes[id(storage)] = (
+            request.build_absolute_uri(storage.url('')) if isinstance(storage, FileSystemStorage) else ''
+        )
+    if not prefix or not PLAIN_NAME_RE.fullmatch(name):
+        return request.build_absolute_uri(storage.url(name))
+    return prefix + name
+
+
+def serve_media(request, path, document_root=None):
+    """`django.views.static.serve` that marks content-addressed files as immutable."""
+    response = serve(request, path, document_root=document_root)
+    if is_hashed_name(path):
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
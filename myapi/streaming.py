@@ -0,0 +1,66 @@
+"""
+Helpers for streaming large responses with `StreamingHttpResponse`.
+"""
+import csv
+import json
+from decimal import Decimal
+
+from rest_framework.utils.encoders import JSONEncoder
+
+
+def dumps(data):
+    # Same compact, non-ASCII-escaping output as DRF's JSONRenderer
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':'))
+
+
+def json_array(items):
+    """Encode an iterable as a JSON array, one element at a time."""
+    yield b'['
+    separator = b''
+    for item in items:
+        yield separator + dumps(item).encode()
+        separator = b','
+    yield b']'
+
+
+class _Echo:
+    """File-like object whose write() hands back the line, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def csv_lines(header, rows):
+    """Encode `header` and then each row tuple as a CSV line."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header).encode()
+    for row in rows:
+        yield writer.writerow([_csv_value(value) for value in row]).encode()
+
+
+def _json_value(value):
+    # Money stays exact, as the API's decimal strings rather than DRF's encoder's floats
+    return str(value) if isinstance(value, Decimal) else value
+
+
+def json_lines(header, rows):
+    """Encode each row tuple as a JSON object keyed by `header`, one per line."""
+    for row in rows:
+        yield dumps({name: _json_value(value) for name, value in zip(header, row)}).encode() + b'\n'
+
+
+def buffered(chunks, size=64 * 1024):
+    """Join small chunks into writes of about `size` bytes; one write per row is slow."""
+    buffer, length = [], 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield b''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield b''.join(buffer)
@@ -0,0 +1,108 @@
+"""
+Per-category item counts and price bounds, maintained incrementally.
+
+Each Item write applies a delta to its category's CategorySummary row: counts move by one,
+and price bounds widen with Least/Greatest. Only when an item holding a bound leaves it
+(price change, move or delete) are that category's bounds re-read, which is two index
+lookups on (category, price).
+"""
+from collections import namedtuple
+
+from django.db.models import Count, DecimalField, F, Max, Min, Q, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+
+
+SummaryValues = namedtuple('SummaryValues', ['category_id', 'is_available', 'price'])
+
+
+def _price(value):
+    return Value(value, output_field=DecimalField(max_digits=10, decimal_places=2))
+
+
+def _remove(values):
+    from .models import CategorySummary
+
+    summary = CategorySummary.objects.filter(pk=values.category_id)
+    summary.update(
+        item_count=F('item_count') - 1,
+        available_count=F('available_count') - int(bool(values.is_available)),
+    )
+    # Only a departing bound can shrink the range
+    if summary.filter(Q(min_price=values.price) | Q(max_price=values.price)).exists():
+        refresh_bounds(values.category_id)
+
+
+def _add(values):
+    from .models import CategorySummary
+
+    price = _price(values.price)
+    updated = CategorySummary.objects.filter(pk=values.category_id).update(
+        item_count=F('item_count') + 1,
+        available_count=F('available_count') + int(bool(values.is_available)),
+        min_price=Least(Coalesce('min_price', price), price),
+        max_price=Greatest(Coalesce('max_price', price), price),
+    )
+    if not updated:
+        rebuild_summaries([values.category_id])
+
+
+def apply_item_change(old, new):
+    """
+    Move an item's contribution from `old` to `new` (either may be None for create/delete).
+    Must run after the item row itself has been written.
+    """
+    if old == new:
+        return
+    if old is not None and old.category_id is not None:
+        _remove(old)
+    if new is not None and new.category_id is not None:
+        _add(new)
+
+
+def refresh_bounds(category_id):
+    from .models import CategorySummary, Item
+
+    bounds = Item.objects.filter(category_id=category_id).aggregate(min_price=Min('price'), max_price=Max('price'))
+    CategorySummary.objects.filter(pk=category_id).update(**bounds)
+
+
+def rebuild_summaries(category_ids=None):
+    """
+    Recompute summaries from the item table, for all categories or just `category_ids`.
+    Returns the number of summary rows that were wrong or missing.
+    """
+    from .models import Category, CategorySummary, Item
+
+    categories = Category.objects.all()
+    if category_ids is not None:
+        categories = categories.filter(pk__in=category_ids)
+    category_ids = list(categories.values_list('pk', flat=True))
+
+    totals = {
+        row['category_id']: row
+        for row in Item.objects.filter(category_id__in=category_ids)
+        .values('category_id')
+        .annotate(
+            item_count=Count('id'),
+            available_count=Count('id', filter=Q(is_available=True)),
+            min_price=Min('price'),
+            max_price=Max('price'),
+        )
+        .order_by()
+    }
+    existing = CategorySummary.objects.in_bulk(category_ids)
+
+    fields = ['item_count', 'available_count', 'min_price', 'max_price']
+    empty = {'item_count': 0, 'available_count': 0, 'min_price': None, 'max_price': None}
+    fixed = []
+    for category_id in category_ids:
+        expected = {field: totals.get(category_id, empty)[field] for field in fields}
+        summary = existing.get(category_id)
+        if summary is not None and all(getattr(summary, field) == expected[field] for field in fields):
+            continue
+        fixed.append(CategorySummary(category_id=category_id, **expected))
+
+    CategorySummary.objects.bulk_create(
+        fixed, update_conflicts=True, unique_fields=['category'], update_fields=fields,
+    )
+    return len(fixed)
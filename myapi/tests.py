@@ -1,3 +1,1237 @@
-from django.test import TestCase
+import csv
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+from datetime import date, timedelta
+from decimal import Decimal, localcontext
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import ledger
+from .accrual import PRECISION, accrue, accrue_chunk, chunks, cents, compound
+from .cache import VERSION_KEY, CatalogCache, catalog_cache
+from .deposits import transfer_to_owing
+from .fastpath import RowPlan
+from .fieldsets import narrow_queryset
+from .images import store_variants
+from .importers import import_items
+from .models import (
+    Buyer, CashupDeposit, CashupOwingDeposit, Category, CategorySummary, DailyCategorySales, DailyItemSales, Item, ProfitRollup,
+    ProfitSnapshot, Purchase,
+)
+from .pricing import reprice_items
+from .profits import rebuild_profit_rollups
+from .purchases import MAX_QUANTITY, InvalidQuantity, add_to_cart, checkout_cart, purchase_item, rebuild_purchase_totals
+from .search import ensure_triggers, search_items
+from .summaries import rebuild_summaries
+from .stock import StaleItem
+from .storage import is_hashed_name
+from .serializers import CashupDepositSerializer
+from .views import CartedProductsList, ConfirmedProductsList, ItemView
+
+
+class CatalogTestCase(TestCase):
+    """A signed-in buyer and a few items to buy."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('01700000000', password='secret', first_name='Test', last_name='Buyer')
+        self.buyer = self.user.buyer
+        category = Category.objects.create(name='Laptops')
+        self.items = [
+            Item.objects.create(name=f'Laptop {i}', price=Decimal('100.00'), category=category)
+            for i in range(3)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_purchases(self, count, **fields):
+        fields.setdefault('confirmed', True)
+        Purchase.objects.bulk_create(
+            Purchase(item=self.items[i % len(self.items)], buyer=self.buyer, quantity=1,
+                     total_price=Decimal('100.00'), **fields)
+            for i in range(count)
+        )
+
+
+class ConfirmedBuyersForProductsTests(CatalogTestCase):
+    url = '/api/confirmed-buyersforproduct/'
+
+    def fetch(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(b''.join(response.streaming_content))
+
+    def test_lists_confirmed_purchases_with_their_buyer(self):
+        self.add_purchases(2)
+        self.add_purchases(1, confirmed=False)
+
+        data = self.fetch()
+
+        self.assertEqual(len(data), 2)
+        self.assertEqual(data[0]['product']['item'], self.items[0].pk)
+        self.assertEqual(data[0]['confirmed_buyer']['id'], self.buyer.pk)
+        self.assertNotIn('gender', data[0]['confirmed_buyer'])
+        self.assertNotIn('date_of_birth', data[0]['confirmed_buyer'])
+
+    def test_query_count_does_not_grow_with_purchases(self):
+        self.add_purchases(2)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.fetch()), 2)
+
+        self.add_purchases(50)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.fetch()), 52)
+
+
+class BuyerPurchasesTests(CatalogTestCase):
+    def test_amounts_are_decimal_strings(self):
+        Purchase.objects.create(item=self.items[0], buyer=self.buyer, quantity=1, confirmed=True, paid=True,
+                                discount_rate=Decimal('12.50'))
+
+        data = self.client.get('/api/buyer-purchases/').json()
+
+        self.assertEqual(data['total_cost'], '87.50')
+        line = data['products'][0]
+        self.assertEqual((line['original_price'], line['discount_price'], line['total_cost']), ('100.00', '87.50', '87.50'))
+
+    def test_quantity_is_counted_once(self):
+        Purchase.objects.create(item=self.items[0], buyer=self.buyer, quantity=2, confirmed=True, paid=True)
+
+        data = self.client.get('/api/buyer-purchases/').json()
+
+        self.assertEqual(data['total_cost'], '200.00')
+        self.assertEqual(data['products'][0]['total_cost'], '200.00')
+        self.assertEqual(rebuild_purchase_totals(), 0)
+
+
+class BalanceStatementTests(CatalogTestCase):
+    def test_balances_and_amounts_are_decimal_strings(self):
+        ledger.move(self.buyer.pk, Decimal('120.50'), ledger.DEPOSIT)
+        ledger.move(self.buyer.pk, Decimal('-20.25'), ledger.PURCHASE, require_funds=True)
+
+        data = self.client.get('/api/balance/statement/').json()
+
+        self.assertEqual((data['opening_balance'], data['closing_balance']), ('0.00', '100.25'))
+        self.assertEqual([entry['amount'] for entry in data['entries']], ['120.50', '-20.25'])
+
+
+class SparseFieldsetTests(CatalogTestCase):
+    url = '/api/cashup-deposit/'
+
+    def setUp(self):
+        super().setUp()
+        CashupDeposit.objects.create(buyer=self.buyer, cashup_main_balance=Decimal('5.00'))
+
+    def rows(self, response):
+        data = response.json()
+        return data['results'] if isinstance(data, dict) else data
+
+    def test_fields_and_omit_select_fields(self):
+        self.assertEqual(self.rows(self.client.get(self.url, {'fields': 'id,buyer.name'}))[0].keys(), {'id', 'buyer'})
+        self.assertEqual(self.rows(self.client.get(self.url, {'fields': 'buyer.name'}))[0]['buyer'], {'name': self.buyer.name})
+
+        row = self.rows(self.client.get(self.url, {'omit': 'buyer,daily_profit'}))[0]
+        self.assertNotIn('buyer', row)
+        self.assertNotIn('daily_profit', row)
+        self.assertIn('cashup_main_balance', row)
+
+    def test_unknown_fields_are_rejected(self):
+        for params in [{'fields': 'id,nope'}, {'omit': 'buyer.nope'}, {'fields': 'id.name'}]:
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('fields', response.json())
+
+    def test_queryset_reads_only_the_selected_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url, {'fields': 'id,cashup_main_balance'})
+        sql = [query['sql'] for query in queries if 'myapi_cashupdeposit' in query['sql']][-1]
+        self.assertNotIn('myapi_buyer', sql)
+        self.assertNotIn('daily_profit', sql)
+
+        serializer = CashupDepositSerializer(fields={'id', 'buyer.name'})
+        queryset = narrow_queryset(CashupDeposit.objects.select_related('buyer'), serializer)
+        self.assertEqual(queryset.query.select_related, {'buyer': {}})
+        self.assertEqual(queryset.query.deferred_loading, ({'id', 'buyer', 'buyer__id', 'buyer__name'}, False))
+
+    def test_writes_ignore_the_query_string(self):
+        response = self.client.patch(f'/api/buyers/{self.buyer.pk}/?fields=id', {'name': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('main_balance', response.json())
+
+
+class PortfolioTests(CatalogTestCase):
+    url = '/api/portfolio/'
+
+    def test_amounts_are_decimal_strings(self):
+        ledger.move(self.buyer.pk, Decimal('10.50'), ledger.DEPOSIT)
+        CashupDeposit.objects.create(buyer=self.buyer, cashup_main_balance=Decimal('100.10'))
+
+        data = self.client.get(self.url).json()
+
+        self.assertEqual(data['main_balance'], '10.50')
+        self.assertEqual((data['deposits']['count'], data['deposits']['balance']), (1, '100.10'))
+        self.assertEqual(data['profit']['daily_profit'], '0.00')
+
+    def rollups(self, period):
+        rows = ProfitRollup.objects.filter(buyer=self.buyer, period=period).order_by('start')
+        return [(row.start, row.profit, row.compounding_profit) for row in rows]
+
+    def test_catch_up_is_credited_to_the_days_it_covers(self):
+        deposit = CashupDeposit.objects.create(buyer=self.buyer, cashup_main_balance=Decimal('1000.00'))
+        CashupDeposit.objects.filter(pk=deposit.pk).update(
+            created_at=timezone.now().replace(year=2025), profit_accrued_on=date(2026, 1, 29),
+        )
+
+        # Friday 30 January to Tuesday 3 February, across a month and a week boundary
+        accrue_chunk('cashup', deposit.pk, deposit.pk + 1, date(2026, 2, 3))
+
+        days = self.rollups('day')
+        self.assertEqual([start for start, _, _ in days], [date(2026, 1, 30) + timedelta(days=n) for n in range(5)])
+        self.assertEqual({profit for _, profit, _ in days}, {Decimal('1.00')})
+        compounding = [compounding for _, _, compounding in days]
+        self.assertEqual(sum(compounding), CashupDeposit.objects.get(pk=deposit.pk).compounding_profit)
+
+        self.assertEqual(self.rollups('month'), [
+            (date(2026, 1, 1), Decimal('2.00'), sum(compounding[:2])),
+            (date(2026, 2, 1), Decimal('3.00'), sum(compounding[2:])),
+        ])
+        self.assertEqual(self.rollups('week'), [
+            (date(2026, 1, 26), Decimal('3.00'), sum(compounding[:3])),
+            (date(2026, 2, 2), Decimal('2.00'), sum(compounding[3:])),
+        ])
+        self.assertEqual(ProfitSnapshot.objects.get(day=date(2026, 2, 3)).total_compounding_profit, sum(compounding))
+
+        incremental = {period: self.rollups(period) for period in ('day', 'week', 'month')}
+        rebuild_profit_rollups()
+        self.assertEqual({period: self.rollups(period) for period in incremental}, incremental)
+
+        data = self.client.get('/api/portfolio/profit/', {'period': 'month', 'start': '2026-01-01', 'end': '2026-03-01'}).json()
+        self.assertEqual([row['profit'] for row in data['rows']], ['2.00', '3.00'])
+
+    def test_unchanged_wallet_is_not_modified(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first['ETag'], '"%s"' % hashlib.md5(first.content).hexdigest())
+
+        again = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual((again.status_code, again.content), (304, b''))
+
+        ledger.move(self.buyer.pk, Decimal('1.00'), ledger.DEPOSIT)
+        changed = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+
+
+class ItemFilterTests(CatalogTestCase):
+    def test_non_finite_prices_are_rejected(self):
+        for value in ['NaN', 'Infinity', '-inf', 'sNaN', 'abc']:
+            with self.subTest(value=value):
+                response = self.client.get('/api/items/', {'min_price': value})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('min_price', response.data)
+
+    def test_finite_prices_filter(self):
+        response = self.client.get('/api/items/', {'min_price': '50', 'max_price': '1e3'})
+        self.assertEqual(response.status_code, 200)
+
+
+SCAN_RE = re.compile(r'SCAN (?P<table>\S+)(?: USING (?:COVERING )?INDEX (?P<index>\S+))?')
+
+
+class QueryPlanMixin:
+    """
+    Fail when a request reads a whole table, going by SQLite's EXPLAIN QUERY PLAN.
+    Scanning a partial index only reads the rows it covers, so that does not count.
+    """
+
+    def is_partial_index(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'index' AND name = %s", [name])
+            row = cursor.fetchone()
+        return bool(row and row[0] and ' WHERE ' in row[0])
+
+    def full_scans(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            details = [row[3] for row in cursor.fetchall()]
+        return [
+            detail for detail in details
+            if (match := SCAN_RE.match(detail)) and not (match['index'] and self.is_partial_index(match['index']))
+        ]
+
+    def assertNoFullScans(self, request):
+        """Run `request()` and check the plan of every SELECT it made."""
+        with CaptureQueriesContext(connection) as queries:
+            response = request()
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertLess(response.status_code, 400)
+
+        selects = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('SELECT')]
+        self.assertTrue(selects)
+        for sql in selects:
+            scans = self.full_scans(sql)
+            self.assertFalse(scans, f"{scans} in {sql}")
+
+
+class FastListTests(CatalogTestCase):
+    """The `.values()` list must render exactly what the serializer renders."""
+
+    def setUp(self):
+        super().setUp()
+        Item.objects.filter(pk=self.items[0].pk).update(
+            item_image='item_images/ab/laptop.png', item_image_variants={
+                'source': 'item_images/ab/laptop.png',
+                'variants': [{'width': 320, 'src': 'item_images/variants/laptop_320w.png', 'webp': 'item_images/variants/laptop_320w.webp'}],
+            },
+        )
+        Item.objects.create(name='Loose item', price=Decimal('9.99'), discount_rate=Decimal('12.5'), description='')
+        self.add_purchases(3)
+        self.add_purchases(2, confirmed=False)
+        Purchase.objects.create(item=None, buyer=self.buyer, quantity=2, confirmed=True, total_price=Decimal('3.30'))
+
+    def assertSameAsSerializer(self, view, url, params=None):
+        catalog_cache.bump_version()  # Item pages are cached
+        with mock.patch.object(RowPlan, 'rows', autospec=True, side_effect=RowPlan.rows) as rows:
+            fast = self.client.get(url, params)
+        self.assertTrue(rows.called, 'the fast path was not used')
+
+        catalog_cache.bump_version()
+        with mock.patch.object(view, 'fast_list', False):
+            slow = self.client.get(url, params)
+
+        self.assertEqual(fast.status_code, 200)
+        self.assertEqual(fast.content, slow.content)
+
+    def test_items(self):
+        for params in [None, {'fields': 'id,name,price,discount_rate'}, {'omit': 'description'}, {'fields': 'id,item_image'}]:
+            with self.subTest(params=params):
+                self.assertSameAsSerializer(ItemView, '/api/items/', params)
+
+    def test_purchases(self):
+        for view, url in [(ConfirmedProductsList, '/api/confirmed-products/'), (CartedProductsList, '/api/carted-products/')]:
+            for params in [None, {'fields': 'id,item,buyer,item_image'}, {'omit': 'item_image'}]:
+                with self.subTest(url=url, params=params):
+                    self.assertSameAsSerializer(view, url, params)
+
+
+@skipUnless(connection.vendor == 'sqlite', "Reads SQLite query plans")
+class PurchaseQueryPlanTests(QueryPlanMixin, CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_purchases(3)
+        self.add_purchases(2, paid=True)
+        self.add_purchases(2, confirmed=False)
+
+    def test_purchase_lists_use_an_index(self):
+        for url in [
+            '/api/confirmed-products/',
+            '/api/carted-products/',
+            '/api/buyer-purchases/',
+            '/api/confirmed-buyers/',
+            '/api/confirmed-buyersforproduct/',
+        ]:
+            with self.subTest(url=url):
+                self.assertNoFullScans(lambda: self.client.get(url))
+
+    def test_cart_checkout_uses_an_index(self):
+        self.buyer.balance_entries.create(amount=Decimal('1000.00'), kind='deposit')
+        type(self.buyer).objects.filter(pk=self.buyer.pk).update(main_balance=Decimal('1000.00'))
+        self.assertNoFullScans(lambda: self.client.post('/api/cart/checkout/', {}, format='json'))
+
+
+class BuyerSaveTests(CatalogTestCase):
+    def test_save_updates_only_the_changed_fields(self):
+        buyer = Buyer.objects.get(pk=self.buyer.pk)
+        buyer.address = 'Dhaka'
+
+        with CaptureQueriesContext(connection) as queries:
+            buyer.save()
+
+        self.assertEqual(len(queries), 1)
+        self.assertIn('"address"', queries[0]['sql'])
+        self.assertNotIn('"main_balance"', queries[0]['sql'])
+        self.assertEqual(Buyer.objects.get(pk=buyer.pk).address, 'Dhaka')
+
+    def test_unchanged_save_runs_no_query(self):
+        buyer = Buyer.objects.get(pk=self.buyer.pk)
+        with self.assertNumQueries(0):
+            buyer.save()
+
+    def test_profile_update_query_count(self):
+        # The buyer lookup and one UPDATE
+        with self.assertNumQueries(2):
+            response = self.client.patch('/api/buyer/', {'address': 'Dhaka'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_owing_total_follows_owing_deposits(self):
+        deposit = CashupOwingDeposit.objects.create(buyer=self.buyer, cashup_owing_main_balance=Decimal('50.00'))
+        CashupOwingDeposit.objects.create(buyer=self.buyer, cashup_owing_main_balance=Decimal('20.00'))
+        deposit.cashup_owing_main_balance = Decimal('30.00')
+        deposit.save()
+        self.buyer.refresh_from_db()
+        self.assertEqual(self.buyer.owing_total, Decimal('50.00'))
+
+        deposit.delete()
+        self.buyer.refresh_from_db()
+        self.assertEqual(self.buyer.owing_total, Decimal('20.00'))
+
+    def transfer_to_owing(self, amount):
+        return self.client.post('/api/transfer-to-cashup-owing-deposit/', {'amount': amount}, format='json')
+
+    def test_owing_transfer_without_funds_moves_nothing(self):
+        ledger.move(self.buyer.pk, Decimal('20.00'), ledger.DEPOSIT)
+
+        response = self.transfer_to_owing('20.01')
+
+        self.assertEqual(response.status_code, 400)
+        buyer = Buyer.objects.get(pk=self.buyer.pk)
+        self.assertEqual((buyer.main_balance, buyer.owing_total), (Decimal('20.00'), Decimal('0.00')))
+        self.assertFalse(CashupOwingDeposit.objects.filter(buyer=buyer).exists())
+        self.assertFalse(buyer.balance_entries.filter(kind=ledger.CASHUP_OWING_DEPOSIT).exists())
+
+    def test_repeated_owing_transfers_add_up_on_one_deposit(self):
+        ledger.move(self.buyer.pk, Decimal('100.00'), ledger.DEPOSIT)
+
+        statuses = [self.transfer_to_owing('30.00').status_code for _ in range(4)]
+
+        self.assertEqual(statuses, [200, 200, 200, 400])
+        buyer = Buyer.objects.get(pk=self.buyer.pk)
+        self.assertEqual((buyer.main_balance, buyer.owing_total), (Decimal('10.00'), Decimal('90.00')))
+        self.assertEqual(
+            list(CashupOwingDeposit.objects.filter(buyer=buyer).values_list('cashup_owing_main_balance', flat=True)),
+            [Decimal('90.00')],
+        )
+        self.assertEqual(buyer.balance_entries.filter(kind=ledger.CASHUP_OWING_DEPOSIT).count(), 3)
+
+
+class OwingTransferConcurrencyTests(TransactionTestCase):
+    """Transfers racing on their own connections, as concurrent requests would."""
+
+    def test_concurrent_transfers_never_overdraw(self):
+        buyer = User.objects.create_user('01700000000', password='secret').buyer
+        ledger.move(buyer.pk, Decimal('100.00'), ledger.DEPOSIT)
+        barrier = threading.Barrier(10)
+        results, errors = [], []
+
+        def transfer():
+            try:
+                barrier.wait()
+                results.append(transfer_to_owing(buyer.pk, Decimal('15.00')))
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=transfer) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sum(result is not None for result in results), 6)
+        buyer.refresh_from_db()
+        self.assertEqual((buyer.main_balance, buyer.owing_total), (Decimal('10.00'), Decimal('90.00')))
+        self.assertEqual(
+            list(CashupOwingDeposit.objects.filter(buyer=buyer).values_list('cashup_owing_main_balance', flat=True)),
+            [Decimal('90.00')],
+        )
+
+
+
+class PurchaseProductTests(CatalogTestCase):
+    url = '/purchase/'
+
+    def setUp(self):
+        super().setUp()
+        self.item = self.items[0]
+        Item.objects.filter(pk=self.item.pk).update(discount_rate=Decimal('10.00'))
+        self.fund(Decimal('100.00'))
+
+    def fund(self, amount):
+        ledger.move(self.buyer.pk, amount, ledger.DEPOSIT)
+
+    def balance(self):
+        return Buyer.objects.values_list('main_balance', flat=True).get(pk=self.buyer.pk)
+
+    def buy(self, key=None, **data):
+        data.setdefault('item', self.item.pk)
+        data.setdefault('buyer', self.buyer.pk)
+        headers = {'HTTP_IDEMPOTENCY_KEY': key} if key else {}
+        return self.client.post(self.url, data, format='json', **headers)
+
+    def test_charges_the_items_discount_not_the_clients(self):
+        response = self.buy(discount_rate='500', quantity=1)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['purchase']['discount_total_price'], '90.00')
+        self.assertEqual(response.data['purchase']['discount_rate'], '10.00')
+        self.assertEqual(self.balance(), Decimal('10.00'))
+
+    def test_half_cent_is_charged_as_the_item_shows_it(self):
+        item = Item.objects.create(name='Half cent', price=Decimal('10.05'), discount_rate=Decimal('10.00'))
+        self.assertEqual(item.discount_price, Decimal('9.05'))
+
+        response = self.buy(item=item.pk, quantity=1)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Decimal(response.data['purchase']['discount_total_price']), item.discount_price)
+        buyer = Buyer.objects.get(pk=self.buyer.pk)
+        self.assertEqual((buyer.main_balance, buyer.purchases_total), (Decimal('90.95'), Decimal('9.05')))
+
+    def test_charges_the_signed_in_buyer(self):
+        other = User.objects.create_user('01700000001', password='secret').buyer
+        ledger.move(other.pk, Decimal('100.00'), ledger.DEPOSIT)
+
+        self.assertEqual(self.buy(buyer=other.pk, quantity=1).status_code, 201)
+
+        self.assertEqual(self.balance(), Decimal('10.00'))
+        self.assertEqual(Buyer.objects.get(pk=other.pk).main_balance, Decimal('100.00'))
+
+    def test_insufficient_balance_charges_nothing(self):
+        response = self.buy(quantity=2)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.balance(), Decimal('100.00'))
+        self.assertFalse(Purchase.objects.filter(buyer=self.buyer).exists())
+        self.assertFalse(self.buyer.balance_entries.filter(kind=ledger.PURCHASE).exists())
+
+    def test_nothing_to_charge_is_rejected(self):
+        Item.objects.filter(pk=self.item.pk).update(discount_rate=Decimal('100.00'))
+
+        self.assertEqual(self.buy(quantity=1).status_code, 400)
+        self.assertEqual(self.balance(), Decimal('100.00'))
+        self.assertFalse(Purchase.objects.filter(buyer=self.buyer).exists())
+
+    def test_retry_with_the_same_key_charges_once(self):
+        first = self.buy(key='retry-1', quantity=1)
+        second = self.buy(key='retry-1', quantity=1)
+
+        self.assertEqual((first.status_code, second.status_code), (201, 200))
+        self.assertEqual(first.data['purchase']['id'], second.data['purchase']['id'])
+        self.assertEqual(self.balance(), Decimal('10.00'))
+        self.assertEqual(self.buyer.balance_entries.filter(kind=ledger.PURCHASE).count(), 1)
+
+    def test_key_reused_for_a_different_purchase_conflicts(self):
+        self.fund(Decimal('100.00'))
+        self.assertEqual(self.buy(key='retry-2', quantity=1).status_code, 201)
+
+        self.assertEqual(self.buy(key='retry-2', quantity=2).status_code, 409)
+        self.assertEqual(self.buy(key='retry-2', item=self.items[1].pk, quantity=1).status_code, 409)
+        self.assertEqual(self.balance(), Decimal('110.00'))
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.buy(quantity=1).status_code, 401)
+
+    def test_carted_lines_cannot_be_confirmed_by_writing_them(self):
+        line = Purchase.objects.create(item=self.item, buyer=self.buyer, quantity=1, confirmed=False)
+        url = f'/api/purchase/{line.pk}/'
+        change = {'item': self.item.pk, 'buyer': self.buyer.pk, 'quantity': 1, 'confirmed': True}
+
+        self.assertEqual(APIClient().put(url, change, format='json').status_code, 401)
+        self.assertEqual(self.client.put(url, change, format='json').status_code, 200)
+
+        line.refresh_from_db()
+        self.assertFalse(line.confirmed)
+        self.assertEqual(self.balance(), Decimal('100.00'))
+
+    def test_ledger_refuses_a_credit_as_a_funded_debit(self):
+        with self.assertRaises(ValueError):
+            ledger.move(self.buyer.pk, Decimal('5.00'), ledger.PURCHASE, require_funds=True)
+        with self.assertRaises(ValueError):
+            ledger.move(self.buyer.pk, Decimal('0.00'), ledger.PURCHASE, require_funds=True)
+        self.assertEqual(self.balance(), Decimal('100.00'))
+
+
+
+class CartCheckoutTests(CatalogTestCase):
+    url = '/api/cart/checkout/'
+
+    def setUp(self):
+        super().setUp()
+        ledger.move(self.buyer.pk, Decimal('250.00'), ledger.DEPOSIT)
+
+    def cart(self, item, buyer=None, **fields):
+        return Purchase.objects.create(item=item, buyer=buyer or self.buyer, quantity=1, confirmed=False, **fields)
+
+    def checkout(self, **data):
+        response = self.client.post(self.url, data, format='json')
+        statuses = {line['id']: line['status'] for line in response.data.get('lines', [])}
+        return response, statuses
+
+    def test_lines_are_priced_at_the_items_discount(self):
+        Item.objects.filter(pk=self.items[0].pk).update(discount_rate=Decimal('10.00'))
+        # Carted with a discount the item does not give
+        line = self.cart(self.items[0], discount_rate=Decimal('500.00'))
+        self.cart(self.items[1])
+
+        response, _ = self.checkout()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['charged'], '190.00')
+        self.assertEqual(Buyer.objects.get(pk=self.buyer.pk).main_balance, Decimal('60.00'))
+        line.refresh_from_db()
+        self.assertEqual((line.discount_rate, line.discount_total_price), (Decimal('10.00'), Decimal('90.00')))
+
+    def test_insufficient_funds_leaves_the_whole_cart(self):
+        lines = [self.cart(item) for item in self.items]
+
+        response, _ = self.checkout()
+
+        self.assertEqual(response.status_code, 400)
+        buyer = Buyer.objects.get(pk=self.buyer.pk)
+        self.assertEqual((buyer.main_balance, buyer.purchases_total), (Decimal('250.00'), Decimal('0.00')))
+        self.assertFalse(Purchase.objects.filter(pk__in=[line.pk for line in lines], confirmed=True).exists())
+        self.assertFalse(buyer.balance_entries.filter(kind=ledger.PURCHASE).exists())
+
+    def test_unpayable_lines_stay_in_the_cart(self):
+        Item.objects.filter(pk=self.items[1].pk).update(is_available=False)
+        Item.objects.filter(pk=self.items[2].pk).update(discount_rate=Decimal('100.00'))
+        paid, unavailable, free = (self.cart(item) for item in self.items)
+
+        response, statuses = self.checkout()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(statuses, {paid.pk: 'confirmed', unavailable.pk: 'unavailable', free.pk: 'nothing_to_charge'})
+        self.assertEqual(response.data['charged'], '100.00')
+        self.assertEqual(set(Purchase.objects.filter(confirmed=False).values_list('pk', flat=True)), {unavailable.pk, free.pk})
+
+    def test_lines_outside_the_cart_are_not_in_cart(self):
+        line = self.cart(self.items[0])
+        other = User.objects.create_user('01700000001', password='secret').buyer
+        theirs = self.cart(self.items[1], buyer=other)
+
+        response, statuses = self.checkout(purchases=[line.pk, theirs.pk, 999999])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(statuses, {line.pk: 'confirmed', theirs.pk: 'not_in_cart', 999999: 'not_in_cart'})
+        theirs.refresh_from_db()
+        self.assertFalse(theirs.confirmed)
+
+
+
+class StockTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.item = Item.objects.create(name='Tracked laptop', sku='TRACKED-1', price=Decimal('100.00'), stock=2)
+
+    def reload(self):
+        return Item.objects.get(pk=self.item.pk)
+
+    def test_expired_reservations_are_released(self):
+        line = add_to_cart(self.buyer.pk, self.reload(), quantity=2)
+        self.assertEqual((self.reload().stock, self.reload().is_available), (0, False))
+
+        call_command('release_reservations', stdout=io.StringIO())
+        self.assertEqual(self.reload().stock, 0)
+
+        Purchase.objects.filter(pk=line.pk).update(reserved_until=timezone.now() - timedelta(seconds=1))
+        call_command('release_reservations', stdout=io.StringIO())
+
+        item, line = self.reload(), Purchase.objects.get(pk=line.pk)
+        self.assertEqual((item.stock, item.is_available), (2, True))
+        self.assertEqual((line.reserved_quantity, line.reserved_until, line.confirmed), (0, None, False))
+
+    def test_carting_reserves_for_the_signed_in_buyer_only(self):
+        other = User.objects.create_user('01700000001', password='secret').buyer
+        cart = {'item': self.item.pk, 'buyer': other.pk, 'quantity': 1}
+
+        self.assertEqual(APIClient().post('/api/purchase/', cart, format='json').status_code, 401)
+        self.assertEqual(self.reload().stock, 2)
+
+        response = self.client.post('/api/purchase/', cart, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Purchase.objects.get(pk=response.data['id']).buyer_id, self.buyer.pk)
+        self.assertEqual(self.reload().stock, 1)
+
+    def test_carting_rejects_quantities_out_of_range(self):
+        for quantity in [0, -1, MAX_QUANTITY + 1]:
+            with self.subTest(quantity=quantity):
+                response = self.client.post('/api/purchase/', {'item': self.item.pk, 'quantity': quantity}, format='json')
+                self.assertEqual(response.status_code, 400)
+        with self.assertRaises(InvalidQuantity):
+            add_to_cart(self.buyer.pk, self.reload(), quantity=0)
+        self.assertEqual(self.reload().stock, 2)
+
+    def test_saving_an_item_loaded_before_a_reservation_fails(self):
+        stale = self.reload()
+        add_to_cart(self.buyer.pk, self.reload(), quantity=1)
+
+        stale.name = 'Renamed'
+        with self.assertRaises(StaleItem):
+            stale.save()
+        self.assertEqual((self.reload().stock, self.reload().name), (1, 'Tracked laptop'))
+
+    def test_saving_an_item_loaded_before_a_reprice_fails(self):
+        stale = self.reload()
+        reprice_items(Item.objects.filter(pk=self.item.pk), discount_rate=Decimal('20'))
+
+        with self.assertRaises(StaleItem):
+            stale.save()
+        self.assertEqual(self.reload().discount_price, Decimal('80.00'))
+
+    def test_saving_an_item_loaded_before_its_image_variants_fails(self):
+        Item.objects.filter(pk=self.item.pk).update(item_image='items/laptop.jpg')
+        stale = self.reload()
+
+        store_variants(Item, self.item.pk, 'item_image', {'source': 'items/laptop.jpg', 'src': []})
+
+        with self.assertRaises(StaleItem):
+            stale.save()
+        self.assertEqual(self.reload().item_image_variants['source'], 'items/laptop.jpg')
+
+    def test_backfilled_variants_bump_every_item_sharing_the_image(self):
+        other = Item.objects.create(name='Same photo', price=Decimal('1.00'))
+        Item.objects.filter(pk__in=[self.item.pk, other.pk]).update(item_image='items/laptop.jpg')
+        stale = self.reload()
+        version = catalog_cache.version()
+
+        updated = store_variants(Item, None, 'item_image', {'source': 'items/laptop.jpg', 'src': []})
+
+        self.assertEqual(updated, 2)
+        self.assertEqual(Item.objects.get(pk=other.pk).item_image_variants['source'], 'items/laptop.jpg')
+        self.assertNotEqual(catalog_cache.version(), version)
+        with self.assertRaises(StaleItem):
+            stale.save()
+
+    def test_deduplicated_images_bump_the_item_and_the_cache(self):
+        with tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media):
+            os.makedirs(os.path.join(media, 'items'))
+            with open(os.path.join(media, 'items', 'laptop.jpg'), 'wb') as image:
+                image.write(b'not really a jpeg')
+            Item.objects.filter(pk=self.item.pk).update(
+                item_image='items/laptop.jpg', item_image_variants={'source': 'items/laptop.jpg'},
+            )
+            stale = self.reload()
+            version = catalog_cache.version()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command('dedupe_media', stdout=io.StringIO())
+
+        item = self.reload()
+        self.assertTrue(is_hashed_name(item.item_image.name))
+        self.assertEqual(item.item_image_variants['source'], item.item_image.name)
+        self.assertNotEqual(catalog_cache.version(), version)
+        with self.assertRaises(StaleItem):
+            stale.save()
+
+    def test_import_bumps_the_version_and_follows_stock(self):
+        stale = self.reload()
+        Item.objects.filter(pk=self.item.pk).update(stock=0, is_available=False)
+        row = {'sku': 'TRACKED-1', 'name': 'Imported laptop', 'price': '90.00', 'is_available': 'true'}
+
+        import_items([row])
+
+        item = self.reload()
+        self.assertEqual((item.name, item.is_available), ('Imported laptop', False))
+        with self.assertRaises(StaleItem):
+            stale.save()
+
+        Item.objects.filter(pk=self.item.pk).update(stock=None)
+        import_items([{**row, 'is_available': 'false'}, {**row, 'sku': 'NEW-1'}])
+        self.assertFalse(self.reload().is_available)
+        self.assertTrue(Item.objects.get(sku='NEW-1').is_available)
+
+
+
+class CategorySummaryTests(CatalogTestCase):
+    def summaries(self):
+        return {
+            row['category_id']: row for row in
+            CategorySummary.objects.values('category_id', 'item_count', 'available_count', 'min_price', 'max_price')
+        }
+
+    def assertMatchesRebuild(self):
+        incremental = self.summaries()
+        self.assertEqual(rebuild_summaries(), 0)
+        self.assertEqual(self.summaries(), incremental)
+
+    def test_bounds_shrink_when_their_item_leaves(self):
+        laptops, phones = self.items[0].category, Category.objects.create(name='Phones')
+        cheap = Item.objects.create(name='Cheap', price=Decimal('10.00'), category=laptops)
+        self.assertEqual(self.summaries()[laptops.pk]['min_price'], Decimal('10.00'))
+
+        cheap.category = phones
+        cheap.save()
+        self.assertEqual(self.summaries()[laptops.pk]['min_price'], Decimal('100.00'))
+        self.assertEqual(self.summaries()[phones.pk]['item_count'], 1)
+
+        cheap.delete()
+        self.assertEqual(self.summaries()[phones.pk], {
+            'category_id': phones.pk, 'item_count': 0, 'available_count': 0, 'min_price': None, 'max_price': None,
+        })
+        self.assertMatchesRebuild()
+
+    def test_random_writes_match_a_rebuild(self):
+        rng = random.Random(7)
+        categories = [self.items[0].category] + [Category.objects.create(name=f'Category {i}') for i in range(3)]
+        items = list(self.items)
+        for step in range(300):
+            action = rng.choice(['create', 'price', 'available', 'stock', 'move', 'delete'])
+            if action == 'create' or not items:
+                items.append(Item.objects.create(
+                    name=f'Item {step}', price=Decimal(rng.randint(1, 50)), is_available=rng.random() < 0.7,
+                    category=rng.choice(categories + [None]),
+                ))
+                continue
+
+            item = rng.choice(items)
+            if action == 'delete':
+                items.remove(item)
+                item.delete()
+                continue
+            if action == 'price':
+                item.price = Decimal(rng.randint(1, 50))
+            elif action == 'available':
+                item.is_available = not item.is_available
+            elif action == 'stock':
+                item.stock = rng.choice([None, 0, 3])
+            else:
+                item.category = rng.choice(categories + [None])
+            item.save()
+
+        self.assertMatchesRebuild()
+
+    def test_rebuild_repairs_a_wrong_summary(self):
+        category = self.items[0].category
+        CategorySummary.objects.filter(pk=category.pk).update(item_count=99, min_price=None)
+
+        self.assertEqual(rebuild_summaries(), 1)
+        self.assertEqual(self.summaries()[category.pk]['item_count'], 3)
+        self.assertEqual(self.summaries()[category.pk]['min_price'], Decimal('100.00'))
+
+
+class SearchTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.mouse = Item.objects.create(name='Wireless mouse', description='Quiet clicks', price=Decimal('20.00'))
+        self.pad = Item.objects.create(name='Desk pad', description='Fits a wireless mouse', price=Decimal('15.00'))
+        catalog_cache.bump_version()  # Search pages are cached
+
+    def found(self, query):
+        return [item_id for item_id, _, _ in search_items(query, 10)]
+
+    @skipUnless(connection.vendor == 'sqlite', "FTS5 is SQLite only")
+    def test_index_follows_writes(self):
+        self.assertEqual(self.found('wireless mou'), [self.mouse.pk, self.pad.pk])
+
+        self.mouse.name = 'Trackball'
+        self.mouse.save()
+        self.assertEqual(self.found('wireless'), [self.pad.pk])
+        self.assertEqual(self.found('trackb'), [self.mouse.pk])
+
+        Item.objects.filter(pk=self.pad.pk).update(description='Felt')
+        self.assertEqual(self.found('wireless'), [])
+
+        self.mouse.delete()
+        self.assertEqual(self.found('trackball'), [])
+
+    @skipUnless(connection.vendor == 'sqlite', "FTS5 is SQLite only")
+    def test_missing_trigger_is_restored_and_the_index_rebuilt(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER myapi_item_fts_ai")
+        keyboard = Item.objects.create(name='Keyboard', price=Decimal('30.00'))
+        self.assertEqual(self.found('keyboard'), [])
+
+        ensure_triggers()
+
+        self.assertEqual(self.found('keyboard'), [keyboard.pk])
+        monitor = Item.objects.create(name='Monitor', price=Decimal('90.00'))
+        self.assertEqual(self.found('monitor'), [monitor.pk])
+
+    @skipUnless(connection.vendor == 'sqlite', "FTS5 is SQLite only")
+    def test_endpoint_ranks_name_matches_first(self):
+        data = self.client.get('/api/items/search/', {'q': 'mouse'}).json()
+
+        self.assertEqual([row['id'] for row in data['results']], [self.mouse.pk, self.pad.pk])
+        self.assertLess(data['results'][0]['rank'], data['results'][1]['rank'])
+        self.assertIn('<b>mouse</b>', data['results'][0]['snippet'].lower())
+        self.assertEqual(self.client.get('/api/items/search/', {'q': 'OR "*'}).status_code, 200)
+
+    def test_other_databases_fall_back_to_like(self):
+        with mock.patch.object(connection, 'vendor', 'postgresql'):
+            self.assertEqual(self.found('WIRELESS mou'), [self.mouse.pk, self.pad.pk])
+            self.assertEqual(self.found('desk'), [self.pad.pk])
+            response = self.client.get('/api/items/search/', {'q': 'mouse', 'page_size': 1})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data['results']], [self.mouse.pk])
+        self.assertIsNone(response.data['results'][0]['snippet'])
+        self.assertIsNotNone(response.data['next'])
+
+
+class SalesRollupTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        ledger.move(self.buyer.pk, Decimal('10000.00'), ledger.DEPOSIT)
+        self.phone = Item.objects.create(name='Phone', price=Decimal('50.00'), discount_rate=Decimal('10'),
+                                         category=Category.objects.create(name='Phones'))
+        self.loose = Item.objects.create(name='Loose', price=Decimal('5.00'))
+
+    def rollups(self):
+        return (
+            sorted(DailyItemSales.objects.exclude(quantity=0, revenue=0).values_list('day', 'item_id', 'quantity', 'revenue')),
+            sorted(DailyCategorySales.objects.exclude(quantity=0, revenue=0).values_list('day', 'category_id', 'quantity', 'revenue')),
+        )
+
+    def assertMatchesRebuild(self):
+        incremental = self.rollups()
+        call_command('rebuild_sales_rollups', stdout=io.StringIO())
+        self.assertEqual(self.rollups(), incremental)
+        return incremental
+
+    def test_incremental_rollups_match_a_rebuild(self):
+        today = timezone.localdate()
+        purchase_item(self.buyer.pk, self.items[0], quantity=2)
+        purchase_item(self.buyer.pk, self.loose)
+        add_to_cart(self.buyer.pk, self.phone, quantity=3)
+        add_to_cart(self.buyer.pk, self.items[1])
+        checkout_cart(self.buyer.pk)
+        add_to_cart(self.buyer.pk, self.items[2])  # Carted only: not a sale
+
+        items, categories = self.assertMatchesRebuild()
+        self.assertEqual(items, sorted([
+            (today, self.items[0].pk, 2, Decimal('200.00')), (today, self.items[1].pk, 1, Decimal('100.00')),
+            (today, self.phone.pk, 3, Decimal('135.00')), (today, self.loose.pk, 1, Decimal('5.00')),
+        ]))
+        self.assertEqual(categories, sorted([
+            (today, self.items[0].category_id, 3, Decimal('300.00')), (today, self.phone.category_id, 3, Decimal('135.00')),
+        ]))
+
+        # Edits: more units, a sale moved to another day, a sale taken back
+        line = Purchase.objects.get(item=self.items[0])
+        line.quantity = 4
+        line.save()
+        moved = Purchase.objects.get(item=self.phone)
+        moved.confirmed_at -= timedelta(days=3)
+        moved.save()
+        refunded = Purchase.objects.get(item=self.loose)
+        refunded.confirmed = False
+        refunded.save()
+        self.assertMatchesRebuild()
+
+        Purchase.objects.get(item=self.items[1]).delete()
+        Purchase.objects.filter(item=self.phone).delete()
+        items, categories = self.assertMatchesRebuild()
+        self.assertEqual(items, [(today, self.items[0].pk, 4, Decimal('400.00'))])
+
+    def test_report(self):
+        purchase_item(self.buyer.pk, self.items[0], quantity=2)
+        purchase_item(self.buyer.pk, self.phone)
+        self.client.force_authenticate(User.objects.create_user('admin', is_staff=True))
+        today = timezone.localdate()
+
+        data = self.client.get('/api/reports/sales/').json()
+        self.assertEqual(data['totals'], {'quantity': 3, 'revenue': '245.00'})
+        self.assertEqual(
+            [(row['category'], row['quantity'], row['revenue']) for row in data['rows']],
+            sorted([(self.items[0].category_id, 2, '200.00'), (self.phone.category_id, 1, '45.00')]),
+        )
+
+        data = self.client.get('/api/reports/sales/', {'group': 'item', 'category': self.phone.category_id}).json()
+        self.assertEqual([(row['item'], row['revenue']) for row in data['rows']], [(self.phone.pk, '45.00')])
+
+        tomorrow = (today + timedelta(days=1)).isoformat()
+        data = self.client.get('/api/reports/sales/', {'start': tomorrow, 'end': (today + timedelta(days=2)).isoformat()}).json()
+        self.assertEqual((data['rows'], data['totals']['revenue']), ([], None))
+
+        self.assertEqual(self.client.get('/api/reports/sales/', {'item': self.items[0].pk}).status_code, 400)
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get('/api/reports/sales/').status_code, 403)
+
+
+class ExportTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = User.objects.create_user('01800000000').buyer
+        self.add_purchases(2)
+        Purchase.objects.create(item=self.items[0], buyer=self.other, quantity=2)
+        Purchase.objects.filter(pk__in=Purchase.objects.order_by('id').values('pk')[:1]).update(
+            created_at=timezone.make_aware(timezone.datetime(2025, 1, 15)),
+        )
+        Purchase.objects.filter(buyer=self.other).update(created_at=None)  # From before timestamps
+        self.client.force_authenticate(User.objects.create_user('admin', is_staff=True))
+
+    def export(self, path, params=None):
+        response = self.client.get(f'/api/exports/{path}', params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv(self):
+        rows = list(csv.reader(io.StringIO(self.export('purchases.csv'))))
+
+        self.assertEqual(rows[0][:3], ['id', 'buyer_id', 'buyer__phone_number'])
+        self.assertEqual([row[1] for row in rows[1:]], [str(self.buyer.pk)] * 2 + [str(self.other.pk)])
+        self.assertEqual(rows[3][rows[0].index('total_price')], '200.00')
+        self.assertEqual(rows[3][rows[0].index('created_at')], '')
+
+    def test_jsonl(self):
+        lines = [json.loads(line) for line in self.export('purchases.jsonl', {'buyer': self.other.pk}).splitlines()]
+
+        self.assertEqual(len(lines), 1)
+        self.assertEqual((lines[0]['buyer__phone_number'], lines[0]['total_price']), (self.other.phone_number, '200.00'))
+
+    def test_date_filters(self):
+        def ids(params):
+            return [json.loads(line)['id'] for line in self.export('purchases.jsonl', params).splitlines()]
+
+        first, second = Purchase.objects.filter(buyer=self.buyer).order_by('id').values_list('id', flat=True)
+        self.assertEqual(ids({'end': '2025-02-01T00:00:00Z'}), [first])
+        self.assertEqual(ids({'start': '2025-02-01T00:00:00Z'}), [second])
+        self.assertEqual(ids({'start': '2025-01-15T00:00:00Z', 'end': '2025-01-15T00:00:00Z'}), [])
+
+        CashupDeposit.objects.create(buyer=self.buyer, cashup_main_balance=Decimal('5.00'))
+        self.assertEqual(len(self.export('cashup-deposits.csv', {'start': '2025-01-01T00:00:00Z'}).splitlines()), 2)
+        self.assertEqual(len(self.export('cashup-deposits.csv', {'end': '2025-01-01T00:00:00Z'}).splitlines()), 1)
+
+    def test_bad_requests(self):
+        for path, params in [
+            ('sales.csv', None), ('purchases.xml', None), ('purchases.csv', {'start': 'yesterday'}),
+            ('purchases.csv', {'buyer': 0}),
+        ]:
+            with self.subTest(path=path, params=params):
+                self.assertEqual(self.client.get(f'/api/exports/{path}', params).status_code, 400)
+
+    def test_admin_only(self):
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get('/api/exports/purchases.csv').status_code, 403)
+        self.client.force_authenticate(None)
+        self.assertIn(self.client.get('/api/exports/purchases.csv').status_code, (401, 403))
+
+    def test_command_matches_the_endpoint(self):
+        with tempfile.NamedTemporaryFile(suffix='.jsonl') as output:
+            call_command('export_data', 'purchases', '--format', 'jsonl', '--buyer', str(self.buyer.pk), '-o', output.name)
+            written = open(output.name, encoding='utf-8').read()
+        self.assertEqual(written, self.export('purchases.jsonl', {'buyer': self.buyer.pk}))
+
+
+class ImportTests(CatalogTestCase):
+    def test_bad_amounts_are_reported_not_raised(self):
+        rows = [
+            {'sku': 'NAN', 'name': 'Nan', 'price': 'NaN'},
+            {'sku': 'INF', 'name': 'Inf', 'price': 'Infinity'},
+            {'sku': 'NEG', 'name': 'Neg', 'price': '-1.00'},
+            {'sku': 'BIG', 'name': 'Big', 'price': '123456789.00'},
+            {'sku': 'EXP', 'name': 'Exp', 'price': '1E+40'},
+            {'sku': 'RATE', 'name': 'Rate', 'price': '10.00', 'discount_rate': '150'},
+            {'sku': 'OK', 'name': 'Ok', 'price': '99999999.99', 'discount_rate': '12.345'},
+        ]
+
+        result = import_items(rows)
+
+        self.assertEqual((result.rows, result.skipped), (1, 6))
+        self.assertEqual([error['row'] for error in result.errors], [1, 2, 3, 4, 5, 6])
+        item = Item.objects.get(sku='OK')
+        self.assertEqual((item.price, item.discount_rate), (Decimal('99999999.99'), Decimal('12.35')))
+
+    def test_endpoint_reports_bad_rows(self):
+        self.client.force_authenticate(User.objects.create_user('admin', is_staff=True))
+        upload = io.BytesIO(b'sku,name,price\nA-1,Chair,25.00\nA-2,Desk,1e400\n')
+        upload.name = 'items.csv'
+
+        response = self.client.post('/api/items/import/', {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['rows'], response.data['skipped']), (1, 1))
+        self.assertEqual(response.data['errors'][0]['row'], 2)
+
+    def test_import_requires_admin(self):
+        upload = io.BytesIO(b'sku,name,price\nA-1,Chair,25.00\n')
+        upload.name = 'items.csv'
+        response = self.client.post('/api/items/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 403)
+
+
+class RepriceTests(CatalogTestCase):
+    def test_bulk_reprice_and_save_round_half_cents_alike(self):
+        # 10.05 at 10% off is 9.045: both must store 9.05
+        bulk = Item.objects.create(name='Bulk', price=Decimal('10.05'))
+        saved = Item.objects.create(name='Saved', price=Decimal('10.05'))
+
+        reprice_items(Item.objects.filter(pk=bulk.pk), discount_rate=Decimal('10'))
+        saved.discount_rate = Decimal('10')
+        saved.save()
+
+        self.assertEqual(Item.objects.get(pk=bulk.pk).discount_price, Decimal('9.05'))
+        self.assertEqual(Item.objects.get(pk=saved.pk).discount_price, Decimal('9.05'))
+
+    def test_reprice_command(self):
+        call_command('reprice_items', '--price-change-percent', '10', stdout=io.StringIO())
+        self.assertEqual(Item.objects.get(pk=self.items[0].pk).price, Decimal('110.00'))
+
+
+class CatalogCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = CatalogCache()
+        self.cache.backend.clear()
+
+    def test_lost_version_does_not_revive_old_entries(self):
+        self.cache.bump_version()
+        self.assertEqual(self.cache.get_or_set('page', lambda: 'old'), 'old')
+
+        # Evicted, then bumped back up by another write: no earlier version may come back
+        self.cache.backend.delete(VERSION_KEY)
+        self.cache.version()
+        self.cache.backend.delete(VERSION_KEY)
+        self.cache.bump_version()
+
+        self.assertEqual(self.cache.get_or_set('page', lambda: 'new'), 'new')
+
+    def test_bump_invalidates(self):
+        self.assertEqual(self.cache.get_or_set('page', lambda: 'old'), 'old')
+        self.cache.bump_version()
+        self.assertEqual(self.cache.get_or_set('page', lambda: 'new'), 'new')
+
+
+class AccrualRunTests(CatalogTestCase):
+    day = date(2026, 3, 10)
+
+    def setUp(self):
+        super().setUp()
+        past = timezone.now().replace(year=2025)
+        for model, balance_field in [(CashupDeposit, 'cashup_main_balance'), (CashupOwingDeposit, 'cashup_owing_main_balance')]:
+            deposits = [
+                model.objects.create(buyer=self.buyer if n % 4 else None, **{balance_field: Decimal(100 * n + 1)})
+                for n in range(1, 12)
+            ]
+            deposits[4].delete()  # A gap in the primary keys
+            model.objects.update(created_at=past, profit_accrued_on=self.day - timedelta(days=2))
+            model.objects.create(buyer=self.buyer, **{balance_field: Decimal('50.00')})  # Made today: not due
+
+    def state(self):
+        fields = ['pk', 'profit_accrued_on', 'daily_profit', 'monthly_profit', 'compounding_profit', 'monthly_compounding_profit']
+        return (
+            list(CashupDeposit.objects.order_by('pk').values_list(*fields)),
+            list(CashupOwingDeposit.objects.order_by('pk').values_list(*fields)),
+            list(ProfitSnapshot.objects.order_by('kind', 'deposit_id', 'day').values_list(
+                'kind', 'deposit_id', 'day', 'profit', 'compounding_profit', 'total_compounding_profit',
+            )),
+            list(ProfitRollup.objects.order_by('period', 'start').values_list('period', 'start', 'profit', 'compounding_profit')),
+        )
+
+    def run_accrual(self, chunk_size):
+        call_command('accrue_profits', '--date', self.day.isoformat(), '--workers', '1',
+                     '--chunk-size', str(chunk_size), stdout=io.StringIO())
+
+    def test_same_day_rerun_changes_nothing(self):
+        self.run_accrual(1000)
+        accrued = self.state()
+        self.assertEqual(CashupDeposit.objects.filter(profit_accrued_on=self.day).count(), 10)
+        self.assertEqual(len(accrued[2]), 2 * 8 * 2)  # Deposits with a buyer, two kinds, two days each
+
+        self.run_accrual(1000)
+        self.assertEqual(self.state(), accrued)
+        self.assertEqual(chunks('cashup', self.day), [])
+
+    def test_chunk_boundaries_neither_skip_nor_repeat(self):
+        due = list(CashupDeposit.objects.filter(created_at__year=2025).order_by('pk').values_list('pk', flat=True))
+        low, end = due[0], due[-1] + 1
+        self.assertEqual(chunks('cashup', self.day, 3), [(start, min(start + 3, end)) for start in range(low, end, 3)])
+
+        self.run_accrual(1000)
+        expected = self.state()
+        for chunk_size in (1, 2, 3):
+            with self.subTest(chunk_size=chunk_size):
+                for model in (CashupDeposit, CashupOwingDeposit):
+                    model.objects.filter(created_at__year=2025).update(
+                        profit_accrued_on=self.day - timedelta(days=2), daily_profit=0, monthly_profit=0,
+                        compounding_profit=0, monthly_compounding_profit=0, daily_compounding_profit=0,
+                    )
+                ProfitSnapshot.objects.all().delete()
+                ProfitRollup.objects.all().delete()
+
+                self.run_accrual(chunk_size)
+
+                self.assertEqual(self.state(), expected)
+
+
+def compound_daily(base, rate, days, rounded=False):
+    """Reference: compound one day at a time, optionally rounding each day to the cent."""
+    profit = last_day_profit = Decimal('0')
+    with localcontext(PRECISION):
+        for _ in range(days):
+            last_day_profit = (base + profit) * rate
+            if rounded:
+                last_day_profit = cents(last_day_profit)
+            profit += last_day_profit
+    return profit, last_day_profit
+
+
+class CompoundingTests(SimpleTestCase):
+    """Properties of the closed-form catch-up, checked on seeded random deposits."""
+
+    def cases(self, count=200):
+        rng = random.Random(22)
+        for _ in range(count):
+            base = Decimal(rng.randint(1, 10 ** 8)) / 100
+            rate = Decimal(rng.randint(0, 1000)) / 10 ** rng.randint(4, 6)
+            yield base, rate, rng.randint(1, 400)
+
+    def test_matches_exact_daily_compounding(self):
+        for base, rate, days in self.cases():
+            with self.subTest(base=base, rate=rate, days=days):
+                profit, last_day_profit = compound_daily(base, rate, days)
+                self.assertEqual(compound(base, rate, days), (cents(profit), cents(last_day_profit)))
+
+    def test_daily_rounding_drift_stays_within_half_a_cent_a_day(self):
+        for base, rate, days in self.cases():
+            with self.subTest(base=base, rate=rate, days=days):
+                rounded, _ = compound_daily(base, rate, days, rounded=True)
+                bound = Decimal('0.005') * days * (1 + rate) ** days + Decimal('0.005')
+                self.assertLessEqual(abs(compound(base, rate, days).profit - rounded), bound)
+
+    def test_catch_up_fills_the_profit_columns(self):
+        rng = random.Random(2022)
+        rates = (Decimal('0.001'), Decimal('0.0015'))
+        for _ in range(100):
+            day = date(2026, rng.randint(1, 12), rng.randint(1, 28))
+            accrued_on = day - timedelta(days=rng.randint(1, 90))
+            deposit = CashupDeposit(
+                cashup_main_balance=Decimal(rng.randint(100, 10 ** 7)) / 100,
+                compounding_profit=Decimal(rng.randint(0, 10 ** 5)) / 100,
+                compounding_withdraw=Decimal(rng.randint(0, 10 ** 3)) / 100,
+                monthly_profit=Decimal('1.00'), monthly_compounding_profit=Decimal('1.00'),
+                profit_accrued_on=accrued_on,
+            )
+            before = deposit.compounding_profit
+            base = deposit.cashup_main_balance + before - deposit.compounding_withdraw
+            days = (day - accrued_on).days
+            this_month = min(days, day.day)
+
+            with self.subTest(day=day, accrued_on=accrued_on, base=base):
+                earned = accrue(deposit, deposit.cashup_main_balance, day, rates)
+                profit, last_day_profit = compound_daily(base, rates[1], days)
+                earlier, _ = compound_daily(base, rates[1], days - this_month)
+                carried = Decimal('1.00') if (accrued_on.year, accrued_on.month) == (day.year, day.month) else 0
+
+                self.assertEqual(deposit.profit_accrued_on, day)
+                self.assertEqual(deposit.daily_profit, cents(deposit.cashup_main_balance * rates[0]))
+                self.assertEqual(deposit.monthly_profit, carried + deposit.daily_profit * this_month)
+                self.assertEqual(deposit.compounding_profit, before + cents(profit))
+                self.assertEqual(deposit.daily_compounding_profit, cents(last_day_profit))
+                self.assertEqual(deposit.monthly_compounding_profit, carried + cents(profit) - cents(earlier))
+
+                # Split into its days, which add up to the whole catch-up
+                self.assertEqual([earned_on for earned_on, _, _ in earned.by_day],
+                                 [accrued_on + timedelta(days=n) for n in range(1, days + 1)])
+                self.assertEqual(sum(profit for _, profit, _ in earned.by_day), earned.profit)
+                self.assertEqual(sum(compounding for _, _, compounding in earned.by_day), cents(profit))
+                self.assertTrue(all(compounding >= 0 for _, _, compounding in earned.by_day))
+
+                # Running it again for the same day changes nothing
+                accrue(deposit, deposit.cashup_main_balance, day, rates)
+                self.assertEqual(deposit.compounding_profit, before + cents(profit))
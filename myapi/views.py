@@ -1,6 +1,6 @@
 from rest_framework import viewsets , generics , mixins
-from .models import Purchase, Buyer ,Item , CashupOwingDeposit ,CashupDeposit
-from .serializers import PurchaseSerializer,ItemSerializer, LoginSerializer,BuyerTransactionSerializer,TransferSerializer,CashupDepositSerializer,DepositSerializer ,BuyerSerializer , CashupOwingDepositSerializer ,DepositSerializer
+from .models import Purchase, Buyer ,Item , CashupOwingDeposit ,CashupDeposit, Category, DailyItemSales, DailyCategorySales, ProfitRollup
+from .serializers import PurchaseSerializer,ItemSerializer, LoginSerializer,BuyerTransactionSerializer,TransferSerializer,CashupDepositSerializer,DepositSerializer ,BuyerSerializer , CashupOwingDepositSerializer ,DepositSerializer, CategorySerializer, RepriceSerializer, CheckoutSerializer, BalanceEntrySerializer, StatementRangeSerializer, ExportFilterSerializer, SalesReportSerializer, PortfolioSerializer, ProfitHistorySerializer
 from django.db.models import Prefetch
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -9,45 +9,190 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from .serializers import UpdateBuyerProfileSerializer
+from .serializers import UpdateBuyerProfileSerializer, money
 from django.shortcuts import get_object_or_404
-from django.db import transaction 
+from django.db import transaction
+from django.http import Http404, StreamingHttpResponse
+from rest_framework.permissions import IsAdminUser
+import hashlib
+from .cache import catalog_cache
+from .filters import filter_items
+from .pagination import BalanceEntryPagination, DepositPagination, ItemCursorPagination, ProfitRollupPagination, PurchaseLinePagination, SalesRollupPagination
+from .search import search_items
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+import csv
+import io
+from .importers import import_items, read_rows
+from .pricing import reprice_items
+from .fieldsets import SparseQuerysetMixin
+from .fastpath import FastListMixin
+from .streaming import json_array
+from .exports import ExportError, encode, export_rows
+from . import ledger
+from .deposits import transfer_to_owing
+from .portfolio import deposit_model, portfolio
+from rest_framework.renderers import JSONRenderer
+from django.utils.http import parse_etags, quote_etag
+from .purchases import IdempotencyConflict, InsufficientBalance, NothingToCharge, OutOfStock, checkout_cart, purchase_item, purchase_lines
+from rest_framework.utils.urls import replace_query_param
+
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
 
 
 
 # Create your views here.
-class ProductView(viewsets.ModelViewSet):
+class ProductView(SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     This viewset automatically provides `list`, `retrieve`, `create`, `update`, and `destroy` actions.
     """
+    permission_classes = [IsAuthenticated]
     queryset = Purchase.objects.all()
     serializer_class = PurchaseSerializer
 
-class BuyerView(viewsets.ModelViewSet):
+    def perform_create(self, serializer):
+        # Lines are carted, and their stock reserved, for the signed-in buyer only
+        serializer.save(buyer=get_object_or_404(Buyer, user=self.request.user))
+
+class BuyerView(SparseQuerysetMixin, viewsets.ModelViewSet):
     permission_classes=[IsAuthenticated]
     """
     This viewset automatically provides `list`, `retrieve`, `create`, `update`, and `destroy` actions.
     """
     queryset = Buyer.objects.all()
     serializer_class = BuyerSerializer
-class ItemView(viewsets.ModelViewSet):
+
+
+class CachedItemMixin:
+    """
+    Serve GET lookups of a single Item from the catalog cache.
+    """
+    def get_object(self):
+        if self.request.method != 'GET':
+            return super().get_object()
+
+        pk = str(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        item = catalog_cache.get_item(int(pk)) if pk.isdigit() else None
+        if item is None:
+            raise Http404
+        self.check_object_permissions(self.request, item)
+        return item
+
+
+class ItemView(CachedItemMixin, SparseQuerysetMixin, FastListMixin, viewsets.ModelViewSet):
     """
     This viewset automatically provides `list`, `retrieve`, `create`, `update`, and `destroy` actions.
+
+    The list is cursor paginated and can be filtered with `category`, `is_available`,
+    `min_price` and `max_price`. `?fields=` / `?omit=` select the fields returned.
     """
     queryset = Item.objects.all()
     serializer_class = ItemSerializer
+    pagination_class = ItemCursorPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            queryset = filter_items(queryset, self.request.query_params)
+        return queryset
+
+    def cached_page(self, request, producer):
+        # The absolute URL covers filters, cursor and the host used for image URLs
+        url = request.build_absolute_uri()
+        return catalog_cache.get_or_set('items:page:' + hashlib.md5(url.encode()).hexdigest(), producer)
+
+    def list(self, request, *args, **kwargs):
+        data = self.cached_page(request, lambda: super(ItemView, self).list(request, *args, **kwargs).data)
+        return Response(data)
 
+    @action(detail=False, url_path='search')
+    def search(self, request):
+        """
+        Ranked full-text search over item name and description: `?q=<text>&page=<n>&page_size=<n>`.
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'q': 'This query parameter is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            page = max(int(request.query_params.get('page', 1)), 1)
+            page_size = min(max(int(request.query_params.get('page_size', SEARCH_PAGE_SIZE)), 1), SEARCH_MAX_PAGE_SIZE)
+        except ValueError:
+            return Response({'detail': 'page and page_size must be integers.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        def run_search():
+            # Fetch one extra row to know whether there is a next page without a COUNT(*)
+            rows = search_items(query, page_size + 1, (page - 1) * page_size)
+            has_next = len(rows) > page_size
+            rows = rows[:page_size]
+
+            items = Item.objects.in_bulk([item_id for item_id, _, _ in rows])
+            results = []
+            for item_id, rank, snippet in rows:
+                if item_id not in items:
+                    continue
+                data = ItemSerializer(items[item_id], context={'request': request}).data
+                data['rank'] = rank
+                data['snippet'] = snippet
+                results.append(data)
+
+            url = request.build_absolute_uri()
+            return {
+                'next': replace_query_param(url, 'page', page + 1) if has_next else None,
+                'previous': replace_query_param(url, 'page', page - 1) if page > 1 else None,
+                'results': results,
+            }
+
+        return Response(self.cached_page(request, run_search))
+
+    @action(detail=False, methods=['post'], url_path='import',
+            permission_classes=[IsAdminUser], parser_classes=[MultiPartParser])
+    def bulk_import(self, request):
+        """
+        Upsert items keyed on `sku` from an uploaded CSV or JSON Lines `file`.
 
-class ConfirmedProductsList(generics.ListAPIView):
-    queryset = Purchase.objects.filter(confirmed=True)
+        Rows are committed chunk by chunk; a malformed file stops the import at the
+        chunk that failed.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'file': 'A CSV or JSON Lines file is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        fmt = request.data.get('format') or ('jsonl' if upload.name.endswith(('.jsonl', '.ndjson')) else 'csv')
+        if fmt not in ('csv', 'jsonl'):
+            return Response({'format': 'Must be csv or jsonl.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8', newline='')
+        try:
+            result = import_items(read_rows(stream, fmt))
+        except (ValueError, csv.Error) as exc:
+            return Response({'detail': f'Could not read the file: {exc}'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result.as_dict(), status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='reprice', permission_classes=[IsAdminUser])
+    def reprice(self, request):
+        """
+        Apply `discount_rate` and/or `price_change_percent` to every item matching the
+        catalog filters in the query string (all items when none are given).
+        """
+        serializer = RepriceSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        queryset = filter_items(Item.objects.all(), request.query_params)
+        updated = reprice_items(queryset, **serializer.validated_data)
+        return Response({'updated': updated}, status=status.HTTP_200_OK)
+
+
+class ConfirmedProductsList(SparseQuerysetMixin, FastListMixin, generics.ListAPIView):
+    queryset = Purchase.objects.filter(confirmed=True).order_by('id')
     serializer_class = PurchaseSerializer
 
-class CartedProductsList(generics.ListAPIView):
+class CartedProductsList(SparseQuerysetMixin, FastListMixin, generics.ListAPIView):
     permission_classes=[IsAuthenticated]
-    queryset = Purchase.objects.filter(confirmed=False)
+    queryset = Purchase.objects.filter(confirmed=False).order_by('id')
     serializer_class = PurchaseSerializer
 
-class ProductDetail(generics.RetrieveUpdateDestroyAPIView,mixins.RetrieveModelMixin,
+class ProductDetail(CachedItemMixin, generics.RetrieveUpdateDestroyAPIView,mixins.RetrieveModelMixin,
                     mixins.UpdateModelMixin,
                     mixins.DestroyModelMixin,
                     generics.GenericAPIView):
@@ -80,12 +225,13 @@ class BuyerDetail(generics.RetrieveUpdateDestroyAPIView,mixins.RetrieveModelMixi
         return buyer
     
 
-class ConfirmedBuyerView(generics.ListAPIView):
+class ConfirmedBuyerView(SparseQuerysetMixin, generics.ListAPIView):
     permission_classes=[IsAuthenticated]
     """
     This viewset provides `list`, `retrieve`, `create`, `update`, and `destroy` actions for confirmed buyers.
     """
-    queryset = Buyer.objects.filter(purchase__confirmed=True).distinct()
+    # A semi-join on the purchase index rather than DISTINCT over a buyer/purchase join
+    queryset = Buyer.objects.filter(pk__in=Purchase.objects.filter(confirmed=True).values('buyer')).order_by('id')
     serializer_class = BuyerSerializer
 
 
@@ -94,72 +240,63 @@ class ConfirmedBuyersForProducts(APIView):
     permission_classes=[IsAuthenticated]
     """
     This view provides a list of all products with their confirmed buyers.
+
+    The list is streamed from one joined query read in chunks, so neither the query count
+    nor memory grows with the number of purchases.
     """
+    chunk_size = 500
+
     def get(self, request):
-        # Fetch confirmed purchases and prefetch related buyers
-        purchases = Purchase.objects.filter(confirmed=True).select_related('buyer')
-
-        data = []
-        for purchase in purchases:
-            # Serialize the product (purchase)
-            product_serializer = PurchaseSerializer(purchase)
-
-            # Serialize the buyer (if exists) and exclude unwanted fields
-            buyer_data = None
-            if purchase.buyer:
-                buyer_serializer = BuyerSerializer(purchase.buyer)
-                buyer_data = buyer_serializer.data
-
-                # Remove unwanted fields from the buyer data
-                unwanted_fields = ['date_of_birth', 'gender']
-                for field in unwanted_fields:
-                    buyer_data.pop(field, None)  # Remove the field if it exists
-
-            data.append({
-                'product': product_serializer.data,
-                'confirmed_buyer': buyer_data
-            })
+        purchases = Purchase.objects.filter(confirmed=True).select_related('item', 'buyer').order_by('id')
 
-        return Response(data)
+        # One serializer of each kind for the whole stream instead of two per row
+        product_serializer = PurchaseSerializer()
+        buyer_serializer = BuyerSerializer(omit={'date_of_birth', 'gender'})
+
+        def rows():
+            for purchase in purchases.iterator(chunk_size=self.chunk_size):
+                yield {
+                    'product': product_serializer.to_representation(purchase),
+                    'confirmed_buyer': buyer_serializer.to_representation(purchase.buyer) if purchase.buyer else None,
+                }
+
+        return StreamingHttpResponse(json_array(rows()), content_type='application/json')
 
 class BuyerPurchasesAPIView(APIView):
     permission_classes=[IsAuthenticated]
 
     """
     This view provides the purchased products for a specific buyer and calculates the discount prices and total cost.
+
+    Line prices are computed by the database, lines are cursor paginated (`next`/`previous`),
+    and `total_cost` is the buyer's running total, so the cost does not grow with history.
     """
     def get(self, request, *args, **kwargs):
-        buyer_id = kwargs.get('buyer_id')
-        buyer = get_object_or_404(Buyer, id=request.user.id)
-        products = Purchase.objects.filter(buyer=buyer, confirmed=True,paid=True)
-        
-        total_cost = 0
-        product_list = []
-        
-        for product in products:
-            original_price = product.total_price
-            discount_rate = product.discount_rate
-            quantity = product.quantity
-            
-            discount_price = original_price - (discount_rate * original_price / 100)
-            total_cost += discount_price * quantity
-            
-            product_data = {
-                'quantity': quantity,
-                'product': PurchaseSerializer(product).data,
-                'original_price': original_price,
-                'discount_rate': discount_rate,
-                'discount_price': discount_price,
-                'total_cost': discount_price * quantity
+        buyer = get_object_or_404(Buyer, user=request.user)
+        paginator = PurchaseLinePagination()
+        products = paginator.paginate_queryset(purchase_lines(buyer), request, view=self)
+
+        product_serializer = PurchaseSerializer()
+        product_list = [
+            {
+                'quantity': product.quantity,
+                'product': product_serializer.to_representation(product),
+                'original_price': money(product.total_price),
+                'discount_rate': money(product.discount_rate),
+                'discount_price': money(product.discount_price),
+                'total_cost': money(product.line_total),
             }
-            product_list.append(product_data)
-        
+            for product in products
+        ]
+
         response_data = {
             'buyer': BuyerSerializer(buyer).data,
             'products': product_list,
-            'total_cost': total_cost
+            'total_cost': money(buyer.purchases_total),
+            'next': paginator.get_next_link(),
+            'previous': paginator.get_previous_link(),
         }
-        
+
         return Response(response_data)
 from django.db.models import Prefetch
 from rest_framework import generics
@@ -211,7 +348,7 @@ class BuyerTransactionCreateView(APIView):
 
     
 
-class CashupOwingDepositByBuyerAPIView(generics.ListAPIView):
+class CashupOwingDepositByBuyerAPIView(SparseQuerysetMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated]  # Ensure only authenticated users can access this view
     serializer_class = CashupOwingDepositSerializer
 
@@ -227,7 +364,7 @@ class CashupOwingDepositByBuyerAPIView(generics.ListAPIView):
         return CashupOwingDeposit.objects.filter(buyer=buyer).select_related('buyer')
     
 
-class CashupDepositByBuyerAPIView(generics.ListAPIView):
+class CashupDepositByBuyerAPIView(SparseQuerysetMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated]  # Ensure only authenticated users can access this view
     serializer_class = CashupDepositSerializer
 
@@ -238,6 +375,8 @@ class CashupDepositByBuyerAPIView(generics.ListAPIView):
         # Retrieve the Buyer instance associated with the authenticated user
         buyer = get_object_or_404(Buyer, user=user)
 
+        return CashupDeposit.objects.filter(buyer=buyer).select_related('buyer')
+
 
 
 from django.db import IntegrityError
@@ -354,7 +493,7 @@ class DepositToMainBalance(APIView):
 
     def post(self, request):
         # Get the buyer associated with the authenticated user
-        buyer = get_object_or_404(Buyer, id=request.user.id)
+        buyer = get_object_or_404(Buyer, user=request.user)
         
         # Validate the incoming data using the DepositSerializer
         serializer = DepositSerializer(data=request.data)
@@ -363,12 +502,9 @@ class DepositToMainBalance(APIView):
             # Convert the amount to Decimal
             amount = Decimal(serializer.validated_data['amount'])
 
-            # Update the buyer's main balance
-            buyer.main_balance += amount
-            buyer.save()
-
-            # Print the updated main balance for debugging
-            print(f"New main balance: {buyer.main_balance}")
+            # Credit the buyer's main balance through the ledger
+            ledger.move(buyer.pk, amount, ledger.DEPOSIT)
+            buyer.refresh_from_db(fields=['main_balance'])
 
             # Return a success response
             return Response(
@@ -385,22 +521,20 @@ class DepositToMainBalance(APIView):
 class TransferToCashupDeposit(APIView):
     permission_classes = [IsAuthenticated]
     def post(self, request):
-        buyer = get_object_or_404(Buyer, id=request.user.id)
+        buyer = get_object_or_404(Buyer, user=request.user)
         serializer = TransferSerializer(data=request.data)
 
         if serializer.is_valid():
             amount = serializer.validated_data['amount']
 
-            if buyer.main_balance < amount:
-                return Response({"error": "Insufficient funds"}, status=status.HTTP_400_BAD_REQUEST)
-
-            buyer.main_balance -= amount
-            buyer.save()
-
-            CashupDeposit.objects.create(
-                cashup_main_balance=amount,
-                buyer=buyer,
-            )
+            with transaction.atomic():
+                if not ledger.move(buyer.pk, -amount, ledger.CASHUP_DEPOSIT, require_funds=True):
+                    return Response({"error": "Insufficient funds"}, status=status.HTTP_400_BAD_REQUEST)
+                CashupDeposit.objects.create(
+                    cashup_main_balance=amount,
+                    buyer=buyer,
+                )
+            buyer.refresh_from_db(fields=['main_balance'])
 
             return Response({"message": f"Transferred {amount} to Cashup Deposit", "new_balance": buyer.main_balance}, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -415,32 +549,18 @@ from django.shortcuts import get_object_or_404
 class TransferToCashupOwingDeposit(APIView):
     permission_classes = [IsAuthenticated]
     def post(self, request):
-        buyer = get_object_or_404(Buyer, id=request.user.id)
+        buyer = get_object_or_404(Buyer, user=request.user)
         serializer = TransferSerializer(data=request.data)
 
         if serializer.is_valid():
             amount = serializer.validated_data['amount']
-            
-            with transaction.atomic():
-                # Retrieve all CashupOwingDeposit instances for the buyer
-                cashup_owing_deposits = CashupOwingDeposit.objects.filter(buyer=buyer)
-
-                total_cashup_owing_main_balance = 0
-                if cashup_owing_deposits.exists():
-                    # Update the cashup_owing_main_balance for existing instances
-                    for deposit in cashup_owing_deposits:
-                        deposit.cashup_owing_main_balance = deposit.cashup_owing_main_balance + amount
-                        deposit.save()
-                        total_cashup_owing_main_balance = deposit.cashup_owing_main_balance
-                else:
-                    # Create a new CashupOwingDeposit instance if none exist
-                    cashup_owing_deposit = CashupOwingDeposit.objects.create(
-                        cashup_owing_main_balance=amount,
-                        buyer=buyer,
-                    )
-                    total_cashup_owing_main_balance = cashup_owing_deposit.cashup_owing_main_balance
-
-            return Response({"message": f"Transferred {amount} to Cashup Owing Deposit", "cashup_owing_main_balance": total_cashup_owing_main_balance}, status=status.HTTP_200_OK)
+
+            # Debits the main balance and credits one deposit row, see myapi.deposits
+            cashup_owing_main_balance = transfer_to_owing(buyer.pk, amount)
+            if cashup_owing_main_balance is None:
+                return Response({"error": "Insufficient funds"}, status=status.HTTP_400_BAD_REQUEST)
+
+            return Response({"message": f"Transferred {amount} to Cashup Owing Deposit", "cashup_owing_main_balance": cashup_owing_main_balance}, status=status.HTTP_200_OK)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -450,12 +570,36 @@ class TransferToCashupOwingDeposit(APIView):
 from .serializers import PurchaseSerializer
 
 class PurchaseProduct(APIView):
+    """Buy an item outright, charging the signed-in buyer at the item's discount."""
+    permission_classes = [IsAuthenticated]
+
     def post(self, request):
+        # Whatever buyer the body names, the signed-in one pays
+        buyer = get_object_or_404(Buyer, user=request.user)
         serializer = PurchaseSerializer(data=request.data, context={'request': request})
 
+        idempotency_key = request.headers.get('Idempotency-Key')
+        if idempotency_key and len(idempotency_key) > 64:
+            return Response({"error": "Idempotency-Key must be at most 64 characters."}, status=status.HTTP_400_BAD_REQUEST)
+
         if serializer.is_valid():
-            serializer.save()
-            return Response({"message": "Purchase successful", "purchase": serializer.data}, status=status.HTTP_201_CREATED)
+            data = serializer.validated_data
+            try:
+                purchase, created = purchase_item(
+                    buyer.pk,
+                    data['item'],
+                    quantity=data.get('quantity', 1),
+                    idempotency_key=idempotency_key,
+                )
+            except (InsufficientBalance, NothingToCharge) as exc:
+                return Response({"non_field_errors": [str(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+            except (IdempotencyConflict, OutOfStock) as exc:
+                return Response({"error": str(exc)}, status=status.HTTP_409_CONFLICT)
+            data = PurchaseSerializer(purchase, context={'request': request}).data
+            return Response(
+                {"message": "Purchase successful", "purchase": data},
+                status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+            )
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 # views.py
 import random
@@ -545,4 +689,217 @@ class ProfileView(APIView):
             "buyer": buyer_serializer.data,
         }
 
-        return Response(response_data, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(response_data, status=status.HTTP_200_OK)
+
+
+class CatalogCacheStatsView(APIView):
+    """
+    Hit/miss counters of the catalog cache for the process serving the request.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(catalog_cache.stats(), status=status.HTTP_200_OK)
+
+
+class CategoryListView(generics.ListAPIView):
+    """
+    Categories with their item counts and price range, read from the summary table.
+    """
+    queryset = Category.objects.select_related('summary').order_by('name', 'id')
+    serializer_class = CategorySerializer
+
+
+class CartCheckoutView(APIView):
+    """
+    Confirm and pay for the buyer's cart in one request: one balance debit and one
+    bulk update of the purchase rows, with a result for every line (`confirmed`,
+    `unavailable`, `nothing_to_charge`, `out_of_stock` or `not_in_cart`).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = CheckoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        buyer = get_object_or_404(Buyer, user=request.user)
+
+        try:
+            lines, charged = checkout_cart(buyer.pk, serializer.validated_data.get('purchases'))
+        except InsufficientBalance as exc:
+            return Response({"non_field_errors": [str(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+
+        buyer.refresh_from_db(fields=['main_balance'])
+        return Response({
+            "message": "Checkout complete",
+            "charged": money(charged),
+            "main_balance": money(buyer.main_balance),
+            "lines": [{**line, 'charged': money(line['charged'])} for line in lines],
+        }, status=status.HTTP_200_OK)
+
+
+class BalanceStatementView(APIView):
+    """
+    The buyer's main balance ledger between `start` and `end`: opening and closing balances
+    and the entries in between, cursor paginated oldest first.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        buyer = get_object_or_404(Buyer, user=request.user)
+        period = StatementRangeSerializer(data=request.query_params)
+        period.is_valid(raise_exception=True)
+        start, end = period.validated_data['start'], period.validated_data['end']
+
+        paginator = BalanceEntryPagination()
+        entries = paginator.paginate_queryset(ledger.statement(buyer.pk, start, end), request, view=self)
+        return Response({
+            "start": start,
+            "end": end,
+            "opening_balance": money(ledger.balance_at(buyer.pk, start)),
+            "closing_balance": money(ledger.balance_at(buyer.pk, end)),
+            "entries": BalanceEntrySerializer(entries, many=True).data,
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
+        })
+
+
+class ExportView(APIView):
+    """
+    Stream an export (`purchases`, `cashup-deposits`, `cashup-owing-deposits`) as CSV or
+    JSON lines, e.g. `/api/exports/purchases.csv?buyer=12&start=2025-01-01`. `start`/`end`
+    filter on `created_at`.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, name, export_format):
+        filters = ExportFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        try:
+            columns, rows = export_rows(
+                name,
+                start=filters.validated_data.get('start'),
+                end=filters.validated_data.get('end'),
+                buyer_id=filters.validated_data.get('buyer'),
+            )
+            chunks, content_type = encode(export_format, columns, rows)
+        except ExportError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{name}.{export_format}"'
+        return response
+
+
+class SalesReportView(APIView):
+    """
+    Daily quantity and revenue per category (or per item with `group=item`) over
+    `[start, end)`, read from the pre-aggregated rollups in myapi.sales.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        params = SalesReportSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
+
+        model, key = (DailyItemSales, 'item_id') if params['group'] == 'item' else (DailyCategorySales, 'category_id')
+        rows = model.objects.filter(day__gte=params['start'], day__lt=params['end'])
+        if 'item' in params:
+            rows = rows.filter(item_id=params['item'])
+        if 'category' in params:
+            rows = rows.filter(**{'item__category_id' if key == 'item_id' else 'category_id': params['category']})
+
+        paginator = SalesRollupPagination()
+        page = paginator.paginate_queryset(rows, request, view=self)
+        totals = rows.aggregate(quantity=Sum('quantity'), revenue=Sum('revenue'))
+        return Response({
+            "group": params['group'],
+            "start": params['start'],
+            "end": params['end'],
+            "totals": {"quantity": totals['quantity'], "revenue": money(totals['revenue'])},
+            "rows": [
+                {"day": row.day, params['group']: getattr(row, key), "quantity": row.quantity, "revenue": money(row.revenue)}
+                for row in page
+            ],
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
+        })
+
+
+class PortfolioView(APIView):
+    """
+    The buyer's wallet: balances, the totals of their Cashup deposits and Cashup owing
+    deposits and the profit over both, read in one query (see myapi.portfolio). `rows=deposits`
+    or `rows=owing_deposits` adds a page of those deposits, newest first.
+
+    The response carries an ETag of its content; a request whose `If-None-Match` matches
+    it gets an empty 304, so a client polling an unchanged wallet downloads nothing.
+    """
+    permission_classes = [IsAuthenticated]
+    row_serializers = {
+        'deposits': CashupDepositSerializer,
+        'owing_deposits': CashupOwingDepositSerializer,
+    }
+
+    def get(self, request):
+        params = PortfolioSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        found = portfolio(user=request.user)
+        if found is None:
+            raise Http404
+        buyer_id, summary = found
+        # Amounts as the decimal strings the serializers give; counts stay numbers
+        data = {
+            name: {field: amount if field == 'count' else money(amount) for field, amount in value.items()}
+            if isinstance(value, dict) else money(value)
+            for name, value in summary.items()
+        }
+
+        key = params.validated_data.get('rows')
+        if key:
+            paginator = DepositPagination()
+            page = paginator.paginate_queryset(deposit_model(key).objects.filter(buyer_id=buyer_id), request, view=self)
+            data["rows"] = self.row_serializers[key](page, many=True, omit={'buyer'}).data
+            data["next"] = paginator.get_next_link()
+            data["previous"] = paginator.get_previous_link()
+
+        # Over the body as it is sent, so equal responses always share a tag
+        etag = quote_etag(hashlib.md5(JSONRenderer().render(data)).hexdigest())
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+        response['ETag'] = etag
+        # Private to the buyer, and revalidated on every use
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
+class ProfitHistoryView(APIView):
+    """
+    The buyer's profit per day, week (the default) or month over `[start, end)`, read from
+    the rollups in myapi.profits: two years is 730 daily, 105 weekly or 24 monthly rows.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        params = ProfitHistorySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
+
+        rows = ProfitRollup.objects.filter(
+            buyer__user=request.user, period=params['period'], start__gte=params['start'], start__lt=params['end'],
+        )
+        paginator = ProfitRollupPagination()
+        page = paginator.paginate_queryset(rows, request, view=self)
+        return Response({
+            "period": params['period'],
+            "start": params['start'],
+            "end": params['end'],
+            "rows": [
+                {"start": row.start, "profit": money(row.profit), "compounding_profit": money(row.compounding_profit)}
+                for row in page
+            ],
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
+        })
\ No newline at end of file
@@ -98,9 +98,42 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Take the write lock when a transaction starts, so concurrent purchases queue
+            # for it instead of failing with "database is locked" when they upgrade
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+        # On disk rather than in memory, where SQLite's shared cache locks whole tables and
+        # ignores the timeout, so the tests can race transactions on separate connections
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
+
+# Caches
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Shared backend for catalog reads; point this at Redis/Memcached in production
+    'catalog': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'catalog',
+        'TIMEOUT': 60 * 15,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+CATALOG_CACHE_ALIAS = 'catalog'
+CATALOG_CACHE_LRU_SIZE = 1024  # In-process entries kept in front of the backend
+
+# Daily profit on Cashup deposits, as a fraction of the balance (see myapi.accrual)
+CASHUP_DAILY_PROFIT_RATE = '0.001'
+CASHUP_COMPOUNDING_DAILY_RATE = '0.001'
+
 # settings.py
 
 
@@ -169,3 +202,13 @@ import os
 
 MEDIA_URL = '/media/'  # URL prefix for media files
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')  # Directory where media files are stored
+
+# Uploads are named by content hash, so duplicates share one file and media URLs are immutable
+STORAGES = {
+    'default': {
+        'BACKEND': 'myapi.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
@@ -2,9 +2,12 @@
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from myapi.views import ProductView, ItemView, ProfileView , BuyerView,RegisterView,LoginAPIView,SendOTPToBuyer,VerifyBuyerOTP,BuyerDetail,BuyerTransactionCreateView, UpdateBuyerProfileAPIView, DepositToMainBalance, TransferToCashupDeposit, TransferToCashupOwingDeposit, PurchaseProduct,ConfirmedProductsList,CashupOwingDepositByBuyerAPIView,CashupDepositByBuyerAPIView,ConfirmedBuyersForProducts,BuyerPurchasesAPIView , ConfirmedBuyerView,ProductDetail, CartedProductsList
+from myapi.views import ProductView, ItemView, ProfileView , BuyerView,RegisterView,LoginAPIView,SendOTPToBuyer,VerifyBuyerOTP,BuyerDetail,BuyerTransactionCreateView, UpdateBuyerProfileAPIView, DepositToMainBalance, TransferToCashupDeposit, TransferToCashupOwingDeposit, PurchaseProduct,ConfirmedProductsList,CashupOwingDepositByBuyerAPIView,CashupDepositByBuyerAPIView,ConfirmedBuyersForProducts,BuyerPurchasesAPIView , ConfirmedBuyerView,ProductDetail, CartedProductsList, CatalogCacheStatsView, CategoryListView, CartCheckoutView, BalanceStatementView, ExportView, SalesReportView, PortfolioView, ProfitHistoryView
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView 
 from django.contrib.auth.models import User
+from django.conf import settings
+from django.urls import re_path
+from myapi.storage import serve_media
 
 admin.site.site_header= 'CashUp'
 admin.site.index_title='Welcome to Cashup'
@@ -44,9 +47,20 @@ urlpatterns = [
     path('send-otp/', SendOTPToBuyer.as_view(), name='send-otp'),
     path('verify-otp/', VerifyBuyerOTP.as_view(), name='verify-otp'),
     path('api/me/', ProfileView.as_view(), name='profile'),
+    path('api/cache-stats/', CatalogCacheStatsView.as_view(), name='cache-stats'),
+    path('api/categories/', CategoryListView.as_view(), name='categories'),
+    path('api/cart/checkout/', CartCheckoutView.as_view(), name='cart-checkout'),
+    path('api/balance/statement/', BalanceStatementView.as_view(), name='balance-statement'),
+    path('api/exports/<str:name>.<str:export_format>', ExportView.as_view(), name='export'),
+    path('api/reports/sales/', SalesReportView.as_view(), name='sales-report'),
+    path('api/portfolio/', PortfolioView.as_view(), name='portfolio'),
+    path('api/portfolio/profit/', ProfitHistoryView.as_view(), name='profit-history'),
 
      
     
 ]
-     
 
+if settings.DEBUG:
+    urlpatterns += [
+        re_path(r'^media/(?P<path>.*)$', serve_media, {'document_root': settings.MEDIA_ROOT}),
+    ]